@@ -1 +1 @@
-__all__ = ["db"]
+__all__ = ["db", "sim"]
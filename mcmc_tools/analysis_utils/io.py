@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import Optional, Sequence
 import pandas as pd
 from sqlalchemy import select
 from mcmc_tools.db.connection import get_session
-from mcmc_tools.db.models import Result, Simulation, Statistic
+from mcmc_tools.db.models import Replica, Result, Simulation, Statistic
 import os
 from typing import List
 import pandas as pd
@@ -25,6 +25,37 @@ def load_results(model: str, T: Optional[float] = None) -> pd.DataFrame:
         rows = s.execute(stmt).mappings().all()
     return pd.DataFrame(rows)
 
+def load_results_for_simulations(simulation_ids: Sequence[int], chunk_size: int = 500) -> pd.DataFrame:
+    """Lädt Roh-Ergebnisse nur für die angegebenen Simulationen (IN-Listen in Chunks)."""
+    ids = [int(i) for i in simulation_ids]
+    frames = []
+    with get_session() as s:
+        for k in range(0, len(ids), chunk_size):
+            stmt = select(
+                Result.id, Result.simulation_id, Result.step,
+                Result.energy, Result.magnetization, Result.energy_squared, Result.magnetization_squared,
+                Simulation.model, Simulation.temperature, Simulation.lattice_size, Simulation.steps
+            ).join(Simulation, Simulation.id == Result.simulation_id) \
+             .where(Result.simulation_id.in_(ids[k:k + chunk_size]))
+            rows = s.execute(stmt).mappings().all()
+            if rows:
+                frames.append(pd.DataFrame(rows))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def load_replica_results(batch_id: int) -> pd.DataFrame:
+    """Lädt die Roh-Ergebnisse aller Replikas eines --replicas-Laufs (Spalten wie load_results + replica)."""
+    with get_session() as s:
+        stmt = select(
+            Result.id, Result.simulation_id, Result.step,
+            Result.energy, Result.magnetization, Result.energy_squared, Result.magnetization_squared,
+            Simulation.model, Simulation.temperature, Simulation.lattice_size, Simulation.steps,
+            Replica.batch_id, Replica.replica
+        ).join(Simulation, Simulation.id == Result.simulation_id) \
+         .join(Replica, Replica.simulation_id == Result.simulation_id) \
+         .where(Replica.batch_id == int(batch_id))
+        rows = s.execute(stmt).mappings().all()
+    return pd.DataFrame(rows)
+
 # from typing import Optional, Sequence
 # import pandas as pd
 # from sqlalchemy import select
@@ -10,7 +10,9 @@ from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import streamlit as st
 import plotly.graph_objects as go
-from mcmc_tools.analysis_utils.io import _fetch_last_k_stats_for_model, _to_py_floats
+import numpy as np
+from mcmc_tools.analysis_utils.io import _fetch_last_k_stats_for_model, _to_py_floats, load_results
+from mcmc_tools.analysis_utils.reweighting import multi_histogram
 
 # def plot_with_errorbars(models: List[str], L: int, steps: int, temperatures: List[float]):
 #     """
@@ -146,6 +148,69 @@ def plot_with_errorbars(models: List[str], L: int, steps: int, temperatures: Lis
                 st.markdown(f"#### {label}")
                 st.plotly_chart(fig, use_container_width=True)
 
+def _latest_runs(model: str, L: int, temperatures: List[float]) -> pd.DataFrame:
+    """Roh-Ergebnisse der jeweils neuesten Simulation pro T (auf 2 Nachkommastellen) für (model, L)."""
+    df = load_results(model)
+    if df.empty:
+        return df
+    df = df[df["lattice_size"] == L]
+    df = df[df["temperature"].round(2).isin(_to_py_floats(temperatures))]
+    if df.empty:
+        return df
+    latest = df.groupby(df["temperature"].round(2))["simulation_id"].max()
+    return df[df["simulation_id"].isin(latest)]
+
+
+def plot_reweighted(models: List[str], L: int, temperatures: List[float], n_points: int = 200):
+    """
+    Multi-Histogram-Reweighting der gespeicherten Läufe auf ein dichtes T-Gitter
+    (n_points Werte zwischen min und max der simulierten T) – Linie mit Jackknife-Band,
+    simulierte Temperaturen als Marker.
+    """
+    if not models:
+        st.warning("⚠️ No models selected.")
+        return
+
+    for model in models:
+        runs = _latest_runs(model, L, temperatures)
+        if runs.empty:
+            st.warning(f"⚠️ No results for {model} (L={L}) at {_to_py_floats(temperatures)}.")
+            continue
+
+        simulated = sorted(runs["temperature"].unique())
+        dense = np.linspace(min(simulated), max(simulated), n_points)
+        with st.spinner(f"Reweighting {model} ({len(simulated)} runs → {n_points} temperatures)…"):
+            rw = multi_histogram(runs, dense)
+            at_sim = multi_histogram(runs, simulated)
+
+        st.subheader(f"📈 {model} – Reweighted Observables (L={L})")
+        plots = [
+            ("energy_per_spin", "error_energy", r"$\langle E \rangle$/spin"),
+            ("magnetization_per_spin", "error_magnetization", r"$\langle m \rangle$/spin"),
+            ("heat_capacity", "error_cv", r"Heat Capacity"),
+            ("susceptibility", "error_chi", r"Susceptibility"),
+        ]
+
+        cols = st.columns(2)
+        for i, (y, yerr, label) in enumerate(plots):
+            fig = go.Figure()
+            band_x = np.concatenate([rw["temperature"], rw["temperature"][::-1]])
+            band_y = np.concatenate([rw[y] + rw[yerr], (rw[y] - rw[yerr])[::-1]])
+            fig.add_trace(go.Scatter(x=band_x, y=band_y, fill="toself", line=dict(width=0),
+                                     opacity=0.3, hoverinfo="skip", showlegend=False))
+            fig.add_trace(go.Scatter(x=rw["temperature"], y=rw[y], mode="lines", name="reweighted"))
+            fig.add_trace(go.Scatter(x=at_sim["temperature"], y=at_sim[y], mode="markers",
+                                     error_y=dict(type="data", array=at_sim[yerr]), name="simulated T"))
+            fig.update_layout(
+                height=400,
+                margin=dict(l=40, r=10, t=40, b=40),
+                xaxis=dict(title="Temperature T"),
+                yaxis=dict(title=label, nticks=5),
+            )
+            with cols[i % 2]:
+                st.markdown(f"#### {label}")
+                st.plotly_chart(fig, use_container_width=True)
+
 # def _line_with_error(x, y, yerr, name):
 #     fig = go.Figure()
 #     fig.add_trace(go.Scatter(
@@ -0,0 +1,153 @@
+# mcmc_tools/analysis_utils/reweighting.py
+"""
+Histogramm-Reweighting der gespeicherten E/M-Messreihen auf ein beliebig dichtes T-Gitter.
+
+- single_histogram: ein Lauf bei T0 → Nachbartemperaturen (Ferrenberg–Swendsen 1988)
+- multi_histogram:  alle Läufe eines Sweeps gemeinsam (WHAM, Ferrenberg–Swendsen 1989)
+
+Rechnet direkt auf den Einzelmessungen (kein Binning in E) und in log-Raum (logsumexp),
+damit auch große Gitter nicht überlaufen. Fehler: Block-Jackknife, bei WHAM wird Block b
+aus jeder Reihe gleichzeitig weggelassen. Ausgabe-Spalten wie compute_statistics.
+
+Alle Modelle und Update-Verfahren tasten exp(-E/T) ab; gewichtet wird mit exp(-βE).
+Außerhalb des abgetasteten Energiebereichs ist das Ergebnis nicht belastbar.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_OUT_COLUMNS = ["energy_per_spin", "magnetization_per_spin", "heat_capacity", "susceptibility"]
+_ERR_COLUMNS = ["error_energy", "error_magnetization", "error_cv", "error_chi"]
+
+
+def _logsumexp(a: np.ndarray, axis: int = -1) -> np.ndarray:
+    m = np.max(a, axis=axis, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0.0)
+    return np.squeeze(m, axis=axis) + np.log(np.sum(np.exp(a - m), axis=axis))
+
+
+def _wham_free_energies(E: np.ndarray, run: np.ndarray, betas: np.ndarray,
+                        f0: Optional[np.ndarray] = None, tol: float = 1e-10, max_iter: int = 10_000) -> np.ndarray:
+    """
+    Selbstkonsistente f_k = -ln Z_k (f_0 = 0) für Energie-Samples E aus Lauf run[i].
+        Z_k = sum_i exp(-beta_k E_i) / sum_j n_j exp(f_j - beta_j E_i)
+    """
+    K = betas.size
+    log_n = np.log(np.bincount(run, minlength=K).astype(float))
+    f = np.zeros(K) if f0 is None else f0.copy()
+    if K == 1:
+        return f
+    A = -betas[:, None] * E[None, :]  # (K, n)
+    for _ in range(max_iter):
+        log_denom = _logsumexp(log_n[:, None] + f[:, None] + A, axis=0)
+        f_new = -_logsumexp(A - log_denom[None, :], axis=1)
+        f_new -= f_new[0]
+        if np.max(np.abs(f_new - f)) < tol:
+            return f_new
+        f = f_new
+    return f
+
+
+def _log_denominator(E: np.ndarray, run: np.ndarray, betas: np.ndarray, f: np.ndarray) -> np.ndarray:
+    log_n = np.log(np.bincount(run, minlength=betas.size).astype(float))
+    return _logsumexp(log_n[:, None] + f[:, None] - betas[:, None] * E[None, :], axis=0)
+
+
+def _observables(E: np.ndarray, M: np.ndarray, log_denom: np.ndarray,
+                 temperatures: np.ndarray, N: float, use_abs_magnetization: bool) -> np.ndarray:
+    """(4, n_T): e, m, c_v, chi an jeder Ziel-Temperatur aus den gewichteten Samples."""
+    out = np.empty((4, temperatures.size))
+    M_src = np.abs(M) if use_abs_magnetization else M
+    for t, T in enumerate(temperatures):
+        log_w = -E / T - log_denom
+        w = np.exp(log_w - _logsumexp(log_w))
+        E_mean, E2_mean = w @ E, w @ (E * E)
+        M_mean, M2_mean = w @ M, w @ (M * M)
+        out[0, t] = E_mean / N
+        out[1, t] = (w @ M_src) / N
+        out[2, t] = (E2_mean - E_mean ** 2) / (N * T ** 2)
+        out[3, t] = (M2_mean - M_mean ** 2) / (N * T)  # immer M, wie compute_statistics
+    return out
+
+
+def _block_labels(run: np.ndarray, n_blocks: int) -> np.ndarray:
+    """Block-Index je Sample: jede Reihe wird in n_blocks zusammenhängende Blöcke geteilt."""
+    labels = np.empty(run.size, dtype=int)
+    for k in np.unique(run):
+        idx = np.flatnonzero(run == k)
+        labels[idx] = (np.arange(idx.size) * n_blocks) // idx.size
+    return labels
+
+
+def _reweight(series: List[Tuple[float, np.ndarray, np.ndarray]], temperatures: Sequence[float], N: float,
+              n_blocks: int, use_abs_magnetization: bool) -> pd.DataFrame:
+    series = [(float(T), np.asarray(E, dtype=float), np.asarray(M, dtype=float)) for T, E, M in series if len(E)]
+    if not series:
+        raise ValueError("reweighting: keine Messreihen")
+    temps = np.asarray(temperatures, dtype=float)
+
+    betas = np.array([1.0 / T for T, _, _ in series])
+    E = np.concatenate([e for _, e, _ in series])
+    M = np.concatenate([m for _, _, m in series])
+    run = np.concatenate([np.full(e.size, k) for k, (_, e, _) in enumerate(series)])
+
+    f = _wham_free_energies(E, run, betas)
+    values = _observables(E, M, _log_denominator(E, run, betas, f), temps, N, use_abs_magnetization)
+
+    n_min = min(e.size for _, e, _ in series)
+    g = min(n_blocks, n_min)
+    errors = np.full_like(values, np.nan)
+    if g > 1:
+        labels = _block_labels(run, g)
+        jk = np.empty((g,) + values.shape)
+        for b in range(g):
+            keep = labels != b
+            Eb, rb = E[keep], run[keep]
+            fb = _wham_free_energies(Eb, rb, betas, f0=f)
+            jk[b] = _observables(Eb, M[keep], _log_denominator(Eb, rb, betas, fb),
+                                 temps, N, use_abs_magnetization)
+        errors = np.sqrt((g - 1) / g * np.sum((jk - jk.mean(axis=0)) ** 2, axis=0))
+
+    out = pd.DataFrame({"temperature": temps})
+    for c, v in zip(_OUT_COLUMNS, values):
+        out[c] = v
+    for c, v in zip(_ERR_COLUMNS, errors):
+        out[c] = v
+    return out
+
+
+def single_histogram(energy: Sequence[float], magnetization: Sequence[float], T0: float,
+                     temperatures: Sequence[float], lattice_size: int, n_blocks: int = 20, use_abs_magnetization: bool = True) -> pd.DataFrame:
+    """
+    Single-Histogram-Reweighting einer Messreihe (Gesamt-E/M pro Messung, gemessen bei T0)
+    auf 'temperatures'. Zuverlässig nur innerhalb ~ der Energie-Fluktuationsbreite um T0.
+    """
+    return _reweight([(T0, energy, magnetization)], temperatures, float(lattice_size) ** 2,
+                     n_blocks, use_abs_magnetization)
+
+
+def multi_histogram(df: pd.DataFrame, temperatures: Sequence[float], n_blocks: int = 20,
+                    use_abs_magnetization: bool = True) -> pd.DataFrame:
+    """
+    Multi-Histogram-Reweighting (WHAM) über alle Läufe in df – Spalten wie load_results:
+    temperature, lattice_size, energy, magnetization (+ optional simulation_id, step).
+    Jede simulation_id (sonst jede Temperatur) ist eine eigene Reihe; alle mit gleichem L.
+    """
+    needed = {"temperature", "lattice_size", "energy", "magnetization"}
+    missing = needed - set(df.columns)
+    if missing:
+        raise ValueError(f"multi_histogram: missing columns: {sorted(missing)}")
+    sizes = df["lattice_size"].unique()
+    if sizes.size != 1:
+        raise ValueError(f"multi_histogram: genau eine Gittergröße erwartet, gefunden {sorted(sizes)}")
+
+    key = "simulation_id" if "simulation_id" in df.columns else "temperature"
+    series = []
+    for _, sub in df.groupby(key, sort=True):
+        if "step" in sub.columns:
+            sub = sub.sort_values("step")
+        series.append((float(sub["temperature"].iloc[0]), sub["energy"].to_numpy(), sub["magnetization"].to_numpy()))
+    return _reweight(series, temperatures, float(sizes[0]) ** 2, n_blocks, use_abs_magnetization)
@@ -1,9 +1,15 @@
-from typing import Optional
+from typing import List, Optional
 import pandas as pd
-from mcmc_tools.analysis_utils.io import load_results
+from sqlalchemy import delete, func, insert, or_, select
+from mcmc_tools.analysis_utils.io import load_results, load_results_for_simulations
 from mcmc_tools.analysis_utils.stats import compute_statistics
 from mcmc_tools.db.connection import get_session
-from mcmc_tools.db.models import Statistic
+from mcmc_tools.db.models import Result, Statistic, Simulation
+
+STAT_FIELDS = (
+    "temperature", "energy_per_spin", "magnetization_per_spin", "heat_capacity", "susceptibility",
+    "error_energy", "error_magnetization", "error_cv", "error_chi",
+)
 
 def analyze_and_store_latest_statistics(n_simulations: Optional[int] = None,
                                         use_abs_magnetization: bool = True) -> int:
@@ -40,3 +46,73 @@ def analyze_and_store_latest_statistics(n_simulations: Optional[int] = None,
             s.add(obj)
             inserted += 1
     return inserted
+
+
+def find_pending_simulation_ids(include_stale: bool = True) -> List[int]:
+    """
+    Simulationen mit Results, aber ohne 'statistics'-Zeile (Anti-Join) – optional auch solche,
+    deren Statistik nicht alle Results abdeckt: eine Result-Zeile mit größerer id als
+    last_result_id (veraltet, z.B. nachgeladene Messungen). Statistiken ohne last_result_id
+    (vor Einführung der Spalte geschrieben) gelten nicht als veraltet. Simulationen ohne
+    Results sind nie offen (es gibt nichts auszuwerten).
+    """
+    results = (
+        select(Result.simulation_id, func.max(Result.id).label("last_result"))
+        .group_by(Result.simulation_id)
+        .subquery()
+    )
+    latest = (
+        select(Statistic.simulation_id, func.max(Statistic.last_result_id).label("last_stat"))
+        .group_by(Statistic.simulation_id)
+        .subquery()
+    )
+    cond = latest.c.simulation_id.is_(None)
+    if include_stale:
+        cond = or_(cond, latest.c.last_stat < results.c.last_result)
+
+    stmt = (
+        select(Simulation.id)
+        .join(results, results.c.simulation_id == Simulation.id)
+        .outerjoin(latest, latest.c.simulation_id == Simulation.id)
+        .where(cond)
+        .order_by(Simulation.id)
+    )
+    with get_session() as s:
+        return [int(r[0]) for r in s.execute(stmt).all()]
+
+
+def analyze_and_store_pending_statistics(include_stale: bool = True,
+                                         use_abs_magnetization: bool = True,
+                                         chunk_size: int = 500) -> int:
+    """
+    Inkrementell: lädt nur Results der noch nicht (oder veraltet) ausgewerteten Simulationen,
+    berechnet deren Kennzahlen und schreibt sie gesammelt in einem Insert nach 'statistics'.
+    Veraltete Zeilen derselben Simulationen werden in derselben Transaktion gelöscht, pro
+    Simulation bleibt also genau eine Statistik. Aufwand skaliert mit dem neuen Sweep, nicht
+    mit der gesamten Historie.
+    Rückgabe: Anzahl geschriebener Zeilen.
+    """
+    sim_ids = find_pending_simulation_ids(include_stale=include_stale)
+    if not sim_ids:
+        return 0
+
+    df = load_results_for_simulations(sim_ids)
+    if df.empty:
+        return 0
+
+    last_ids = df.groupby("simulation_id")["id"].max()
+    stats_df: pd.DataFrame = compute_statistics(df, use_abs_magnetization=use_abs_magnetization)
+    rows = [
+        dict(simulation_id=int(r["simulation_id"]), last_result_id=int(last_ids[int(r["simulation_id"])]),
+             **{k: float(r[k]) for k in STAT_FIELDS})
+        for r in stats_df.to_dict(orient="records")
+    ]
+    if not rows:
+        return 0
+
+    done = [r["simulation_id"] for r in rows]
+    with get_session() as s:
+        for k in range(0, len(done), chunk_size):
+            s.execute(delete(Statistic).where(Statistic.simulation_id.in_(done[k:k + chunk_size])))
+        s.execute(insert(Statistic), rows)
+    return len(rows)
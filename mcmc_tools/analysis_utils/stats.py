@@ -1,130 +1,176 @@
+from typing import Sequence
+
 import numpy as np
 import pandas as pd
 
-def _block_indices(n, block_size):
-    """Erzeuge Liste von (start, end)-Indices für Blöcke der Länge block_size."""
-    blocks = []
-    i = 0
-    while i < n:
-        j = min(n, i + block_size)
-        blocks.append((i, j))
-        i = j
-    return blocks
-
-def _block_jackknife_errors_for_sim(sub: pd.DataFrame, L: int, T: float, use_abs_magnetization: bool=True):
+_SERIES_COLUMNS = ["energy", "magnetization", "energy_squared", "magnetization_squared"]
+_GROUP_KEYS = ["simulation_id", "model", "temperature", "lattice_size"]
+
+
+def _sq(x):
+    """x**2 wie bei Python-/NumPy-Skalaren (libm pow); arr**2 rechnet x*x und weicht im letzten Bit ab."""
+    return np.float_power(x, 2)
+
+
+def _jk_std_rows(vals: np.ndarray) -> np.ndarray:
+    """Jackknife-Std je Zeile von vals (g, n_blocks): sqrt((g-1)/g * Σ(v - mean)²) für alle Simulationen."""
+    g = vals.shape[1]
+    if g <= 1:
+        return np.full(vals.shape[0], np.nan)
+    m = vals.mean(axis=1)
+    return np.sqrt((g - 1) / g * np.sum((vals - m[:, None]) ** 2, axis=1))
+
+
+def _batch_statistics(X: np.ndarray, N: np.ndarray, T: np.ndarray, use_abs_magnetization: bool):
     """
-    Schätzt Std-Fehler für e_bar, m_bar, c_v, chi innerhalb EINER Simulation
-    via Leave-One-Block-Out Jackknife über die Zeitreihe (Steps).
+    Kennzahlen + Block-Jackknife-Fehler für g Simulationen gleicher Länge n auf einmal.
+    X: (4, g, n) mit E, M, E2, M2 (nach step sortiert); N, T: (g,).
+    Blocksummen kommen aus einem (g, n_blocks, block_size)-Reshape; die Leave-one-out-Summen
+    sind Gesamtsumme minus Blocksumme. Summiert wird in derselben Reihenfolge wie in der
+    Schleifen-Referenz (tests/test_stats.py), damit die Ergebnisse bitgleich bleiben.
     """
-    sub = sub.sort_values("step")[["energy", "magnetization", "energy_squared", "magnetization_squared"]].to_numpy()
-    n = sub.shape[0]
-    if n <= 1:
-        return (float("nan"),)*4
-
-    N = float(L * L)
-    E = sub[:,0]; M = sub[:,1]; E2 = sub[:,2]; M2 = sub[:,3]
+    E, M, E2, M2 = X
     AbsM = np.abs(M)
+    n = E.shape[1]
+    series = (E, M, E2, M2, AbsM)
+
+    totals = [x.sum(axis=1) for x in series]
+    E_mean, M_mean, E2_mean, M2_mean, AbsM_mean = (t / n for t in totals)
 
+    e_bar = E_mean / N
+    m_bar = (AbsM_mean / N) if use_abs_magnetization else (M_mean / N)
+    cv    = (E2_mean - _sq(E_mean)) / (N * _sq(T))
+    chi   = (M2_mean - _sq(M_mean)) / (N * T)  # immer M
+
+    if n <= 1:
+        nan = np.full(E.shape[0], np.nan)
+        return (e_bar, m_bar, cv, chi), (nan, nan, nan, nan)
+
+    # n >= 2 → block_size <= n/20 < n → immer mindestens 2 Blöcke (kein Ein-Block-Fallback nötig)
     block_size = max(1, n // 20)
-    blocks = _block_indices(n, block_size)
-    if len(blocks) <= 1:
-        e_err  = float(np.std(E / N, ddof=1) / np.sqrt(max(1, n)))
-        m_src  = AbsM / N if use_abs_magnetization else M / N
-        m_err  = float(np.std(m_src, ddof=1) / np.sqrt(max(1, n)))
-        cv_s   = (E2 - E**2) / (N * (T**2))
-        chi_s  = (M2 - M**2) / (N * T)  # immer M, nicht AbsM!
-        cv_err = float(np.std(cv_s, ddof=1) / np.sqrt(max(1, n)))
-        chi_err= float(np.std(chi_s, ddof=1) / np.sqrt(max(1, n)))
-        return e_err, m_err, cv_err, chi_err
-
-    S_E, S_M, S_E2, S_M2, S_AbsM = E.sum(), M.sum(), E2.sum(), M2.sum(), AbsM.sum()
-
-    jk_e, jk_m, jk_cv, jk_chi = [], [], [], []
-    for a, b in blocks:
-        n_k = n - (b - a)
-        if n_k <= 0:
-            continue
-
-        sE   = S_E   - E[a:b].sum()
-        sM   = S_M   - M[a:b].sum()
-        sE2  = S_E2  - E2[a:b].sum()
-        sM2  = S_M2  - M2[a:b].sum()
-        sAbs = S_AbsM - AbsM[a:b].sum()
-
-        E_mean  = sE / n_k
-        M_mean  = sM / n_k
-        E2_mean = sE2 / n_k
-        M2_mean = sM2 / n_k
-        AbsM_mean = sAbs / n_k
-
-        e_bar = E_mean / N
-        m_bar = (AbsM_mean / N) if use_abs_magnetization else (M_mean / N)
-        cv    = (E2_mean - E_mean**2) / (N * (T**2))
-        chi   = (M2_mean - M_mean**2) / (N * T)  # immer M
-
-        jk_e.append(e_bar)
-        jk_m.append(m_bar)
-        jk_cv.append(cv)
-        jk_chi.append(chi)
-
-    def jk_std(vals):
-        vals = np.asarray(vals, dtype=float)
-        g = len(vals)
-        if g <= 1:
-            return float("nan")
-        m = vals.mean()
-        return float(np.sqrt((g - 1) / g * np.sum((vals - m) ** 2)))
-
-    return jk_std(jk_e), jk_std(jk_m), jk_std(jk_cv), jk_std(jk_chi)
+    n_full = n // block_size
+    rest = n - n_full * block_size
+
+    n_k = [n - block_size] * n_full
+    if rest:
+        n_k.append(n - rest)
+    n_k = np.asarray(n_k, dtype=float)
+
+    loo_means = []
+    for x, S in zip(series, totals):
+        g = x.shape[0]
+        block_sums = x[:, :n_full * block_size].reshape(g, n_full, block_size).sum(axis=2)
+        if rest:
+            block_sums = np.concatenate([block_sums, x[:, n_full * block_size:].sum(axis=1)[:, None]], axis=1)
+        loo_means.append((S[:, None] - block_sums) / n_k)
+    jE, jM, jE2, jM2, jAbs = loo_means
+
+    Nc, Tc = N[:, None], T[:, None]
+    jk_e   = jE / Nc
+    jk_m   = (jAbs / Nc) if use_abs_magnetization else (jM / Nc)
+    jk_cv  = (jE2 - _sq(jE)) / (Nc * _sq(Tc))
+    jk_chi = (jM2 - _sq(jM)) / (Nc * Tc)
+
+    errors = tuple(_jk_std_rows(v) for v in (jk_e, jk_m, jk_cv, jk_chi))
+    return (e_bar, m_bar, cv, chi), errors
 
 
 def compute_statistics(df: pd.DataFrame, use_abs_magnetization: bool = True) -> pd.DataFrame:
     """
-    Gibt jetzt **pro simulation_id** eine Zeile mit Kennzahlen **und Fehlern** zurück.
+    Gibt **pro simulation_id** eine Zeile mit Kennzahlen **und Fehlern** zurück.
     Fehler werden innerhalb der Simulation über Steps (Block-Jackknife) geschätzt.
+    Alle Simulationen werden einmal gemeinsam sortiert und je Serienlänge in einem
+    (g, n)-Block vektorisiert ausgewertet (keine Python-Schleife pro Simulation/Block).
     """
     if df.empty:
         return df
 
-    needed = {"simulation_id","model","temperature","lattice_size","step",
-              "energy","magnetization","energy_squared","magnetization_squared"}
+    needed = set(_GROUP_KEYS) | {"step"} | set(_SERIES_COLUMNS)
     missing = needed - set(df.columns)
     if missing:
         raise ValueError(f"compute_statistics: missing columns: {sorted(missing)}")
 
-    out_rows = []
-    for (sim_id, model, T, L), sub in df.groupby(["simulation_id","model","temperature","lattice_size"]):
-        sub = sub.sort_values("step")
-        N = float(L*L)
-
-        E_mean  = sub["energy"].mean()
-        M_mean  = sub["magnetization"].mean()
-        E2_mean = sub["energy_squared"].mean()
-        M2_mean = sub["magnetization_squared"].mean()
-        AbsM_mean = np.abs(sub["magnetization"]).mean()
-
-        e_bar = E_mean / N
-        m_bar = (AbsM_mean / N) if use_abs_magnetization else (M_mean / N)
-        cv    = (E2_mean - E_mean**2) / (N * (T**2))
-        chi   = (M2_mean - M_mean**2) / (N * T)  # immer M
-
-        e_err, m_err, cv_err, chi_err = _block_jackknife_errors_for_sim(
-            sub, L=int(L), T=float(T), use_abs_magnetization=use_abs_magnetization
-        )
-
-        out_rows.append(dict(
-            simulation_id=int(sim_id),
-            model=model,
-            temperature=float(T),
-            lattice_size=int(L),
-            energy_per_spin=float(e_bar),
-            magnetization_per_spin=float(m_bar),
-            heat_capacity=float(cv),
-            susceptibility=float(chi),
-            error_energy=float(e_err),
-            error_magnetization=float(m_err),
-            error_cv=float(cv_err),
-            error_chi=float(chi_err),
-        ))
-
-    return pd.DataFrame(out_rows).sort_values(["model","temperature","simulation_id"]).reset_index(drop=True)
+    # Gruppen-ID je Zeile (wie groupby: sortierte Keys, NaN-Keys fallen weg)
+    gid = df.groupby(_GROUP_KEYS, sort=True).ngroup().to_numpy()
+    keep = gid >= 0
+    gid = gid[keep]
+    if gid.size == 0:
+        return pd.DataFrame()
+
+    steps = df["step"].to_numpy()[keep]
+    order = np.lexsort((steps, gid))
+    gid = gid[order]
+    values = df[_SERIES_COLUMNS].to_numpy(dtype=float)[keep][order].T.copy()  # (4, rows)
+
+    starts = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+    lengths = np.diff(np.r_[starts, gid.size])
+
+    keys = df.loc[keep, _GROUP_KEYS].iloc[order].iloc[starts]
+    sim_ids = keys["simulation_id"].to_numpy()
+    Ls = keys["lattice_size"].to_numpy()
+    Ts = keys["temperature"].to_numpy(dtype=float)
+    Ns = (Ls * Ls).astype(float)
+
+    n_groups = starts.size
+    means = np.empty((4, n_groups))
+    errors = np.empty((4, n_groups))
+    for n in np.unique(lengths):
+        idx = np.flatnonzero(lengths == n)
+        rows = starts[idx][:, None] + np.arange(n)  # (g, n)
+        m, e = _batch_statistics(values[:, rows], Ns[idx], Ts[idx], use_abs_magnetization)
+        means[:, idx] = m
+        errors[:, idx] = e
+
+    out = pd.DataFrame(dict(
+        simulation_id=sim_ids.astype(int),
+        model=keys["model"].tolist(),
+        temperature=Ts,
+        lattice_size=Ls.astype(int),
+        energy_per_spin=means[0],
+        magnetization_per_spin=means[1],
+        heat_capacity=means[2],
+        susceptibility=means[3],
+        error_energy=errors[0],
+        error_magnetization=errors[1],
+        error_cv=errors[2],
+        error_chi=errors[3],
+    ))
+    return out.sort_values(["model","temperature","simulation_id"]).reset_index(drop=True)
+
+
+_ESTIMATES = [
+    ("energy_per_spin", "error_energy"),
+    ("magnetization_per_spin", "error_magnetization"),
+    ("heat_capacity", "error_cv"),
+    ("susceptibility", "error_chi"),
+]
+
+
+def replica_statistics(stats: pd.DataFrame, by: Sequence[str] = ("model", "temperature", "lattice_size")) -> pd.DataFrame:
+    """
+    Fasst unabhängige Replikas (eine Zeile pro Replika aus compute_statistics) zusammen.
+    Kennzahl = Mittel über die Replikas, Fehler = Std(ddof=1) / sqrt(R) zwischen den Replikas –
+    unabhängig von der Autokorrelation innerhalb einer Kette.
+    Zusätzlich: n_replicas und within_error_* = mittlerer Jackknife-Fehler innerhalb der Ketten / sqrt(R)
+    (zum Vergleich: deutlich kleiner als error_* → Jackknife-Blöcke zu kurz für die Autokorrelation).
+    """
+    if stats.empty:
+        return stats
+    by = list(by)
+    missing = (set(by) | {v for pair in _ESTIMATES for v in pair}) - set(stats.columns)
+    if missing:
+        raise ValueError(f"replica_statistics: missing columns: {sorted(missing)}")
+
+    rows = []
+    for key, sub in stats.groupby(by, sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        R = len(sub)
+        row = dict(zip(by, key))
+        row["n_replicas"] = R
+        for value, error in _ESTIMATES:
+            x = sub[value].to_numpy(dtype=float)
+            row[value] = float(x.mean())
+            row[error] = float(x.std(ddof=1) / np.sqrt(R)) if R > 1 else float("nan")
+            row[f"within_{error}"] = float(sub[error].mean()) / np.sqrt(R)
+        rows.append(row)
+    return pd.DataFrame(rows)
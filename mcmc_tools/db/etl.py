@@ -4,6 +4,7 @@ from __future__ import annotations
 import os
 import re
 import io
+import time
 import base64
 from typing import List, Tuple, Optional, Sequence, Set
 
@@ -11,17 +12,18 @@ import numpy as np
 import pandas as pd
 
 from mcmc_tools.db.connection import get_session 
-from mcmc_tools.db.models import Simulation, Result, Lattice
+from mcmc_tools.db.models import Simulation, Result, Lattice, Replica
+from mcmc_tools.sim.binary_io import BINARY_EXTENSIONS, open_lattices, read_meta, results_frame
 
 
 # -------- Helpers --------
 
 def parse_filename(filename: str) -> Tuple[str, int, float]:
     """
-    Erwartet: results_<MODEL>_L<L>_T<temp>.csv
+    Erwartet: results_<MODEL>_L<L>_T<temp>.<csv|npy|bin> (bzw. replicas_... aus --replicas)
     Beispiel: results_Ising_L16_T2.50.csv
     """
-    pattern = r"^results_(\w+)_L(\d+)_T([\d.]+)\.csv$"
+    pattern = r"^(?:results|replicas)_(\w+)_L(\d+)_T([\d.]+)\.(?:csv|npy|bin)$"
     m = re.search(pattern, filename)
     if not m:
         raise ValueError(f"❌ Ungültiger Dateiname: {filename}")
@@ -35,19 +37,177 @@ def array_to_base64(arr: np.ndarray) -> str:
     return base64.b64encode(buf.getvalue()).decode("utf-8")
 
 
+# -------- Bulk-Ingest (results) --------
+
+RESULT_COLUMNS = ("step", "energy", "magnetization", "energy_squared", "magnetization_squared")
+
+
+def _copy_results_postgres(raw_conn, simulation_id: int, df: pd.DataFrame) -> None:
+    """Streamt die Messreihe per COPY FROM STDIN (CSV) in 'results'."""
+    out = df.loc[:, list(RESULT_COLUMNS)].copy()
+    out.insert(0, "simulation_id", int(simulation_id))
+    out["step"] = out["step"].astype("int64")
+
+    buf = io.StringIO()
+    out.to_csv(buf, header=False, index=False)
+    buf.seek(0)
+
+    cols = ", ".join(("simulation_id",) + RESULT_COLUMNS)
+    cur = raw_conn.cursor()
+    try:
+        cur.copy_expert(f"COPY results ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cur.close()
+
+
+def _executemany_results(raw_conn, simulation_id: int, df: pd.DataFrame) -> None:
+    """Spaltenweises executemany (SQLite & Co.) ohne ORM-Objekte pro Zeile."""
+    n = len(df)
+    columns = [[int(simulation_id)] * n, df["step"].astype("int64").tolist()]
+    columns += [df[c].astype("float64").tolist() for c in RESULT_COLUMNS[1:]]
+
+    cols = ", ".join(("simulation_id",) + RESULT_COLUMNS)
+    marks = ", ".join("?" * len(columns))
+    cur = raw_conn.cursor()
+    try:
+        cur.executemany(f"INSERT INTO results ({cols}) VALUES ({marks})", zip(*columns))
+    finally:
+        cur.close()
+
+
+def bulk_insert_results(session, simulation_id: int, df: pd.DataFrame) -> Tuple[int, float]:
+    """
+    Schreibt alle Zeilen aus df (Spalten wie RESULT_COLUMNS) für simulation_id in 'results'.
+    Postgres: COPY FROM STDIN, SQLite: executemany, sonst SQLAlchemy-Core insert.
+    Läuft in der Transaktion der Session. Rückgabe: (Zeilen, Zeilen/Sekunde).
+    """
+    n = int(len(df))
+    if n == 0:
+        return 0, 0.0
+
+    dialect = session.get_bind().dialect.name
+    t0 = time.perf_counter()
+    if dialect == "postgresql":
+        method = "COPY"
+        _copy_results_postgres(session.connection().connection, simulation_id, df)
+    elif dialect == "sqlite":
+        method = "executemany"
+        _executemany_results(session.connection().connection, simulation_id, df)
+    else:
+        method = "insert"
+        records = df.loc[:, list(RESULT_COLUMNS)].to_dict(orient="records")
+        for r in records:
+            r["simulation_id"] = int(simulation_id)
+        session.execute(Result.__table__.insert(), records)
+    dt = max(time.perf_counter() - t0, 1e-9)
+
+    rate = n / dt
+    print(f"⚡ Results: {n} Zeilen in {dt:.3f}s ({rate:,.0f} rows/s, {method})")
+    return n, rate
+
+
 # -------- Single-file import --------
 
+def import_lattices(session, simulation_id: int, model: str, L: int, T: float, lattice_dir: str, ext: str) -> int:
+    """
+    Hängt die Lattice-Snapshots zu (model, L, T) aus lattice_dir an eine Simulation an:
+    CSV eine Datei pro Step, npy/bin ein Stapel. Gibt die Anzahl importierter Snapshots zurück.
+    """
+    t_str = f"{T:.2f}"
+
+    # (label, step, loader) je Snapshot – CSV: eine Datei pro Step, npy/bin: ein Stapel
+    frames = []
+    if ext in BINARY_EXTENSIONS:
+        stack = os.path.join(lattice_dir, f"lattice_{model}_L{int(L)}_T{t_str}{ext}")
+        if os.path.exists(stack):
+            stack_steps, stack_lattices = open_lattices(stack)
+            for idx, step in enumerate(stack_steps.tolist()):
+                frames.append((f"{os.path.basename(stack)}[{idx}]", int(step),
+                               lambda idx=idx: np.array(stack_lattices[idx], dtype=float)))
+        print(f"🧭 Lattice-Stapel: {os.path.basename(stack)} | Frames gefunden: {len(frames)}")
+    else:
+        # Neues Muster (mit L)
+        pattern_new = rf"lattice_{re.escape(model)}_L{int(L)}_T{re.escape(t_str)}_\d+\.csv"
+        lattice_files = sorted(f for f in os.listdir(lattice_dir) if re.fullmatch(pattern_new, f))
+
+        # Fallback: altes Muster (ohne L), falls nichts gefunden
+        used_pattern = "new"
+        if not lattice_files:
+            pattern_old = rf"lattice_{re.escape(model)}_T{re.escape(t_str)}_\d+\.csv"
+            lattice_files = sorted(f for f in os.listdir(lattice_dir) if re.fullmatch(pattern_old, f))
+            used_pattern = "old"
+        print(f"🧭 Lattice-Muster benutzt: {used_pattern} | Dateien gefunden: {len(lattice_files)}")
+
+        for lf in lattice_files:
+            m = re.search(r"_(\d+)\.csv$", lf)
+            if not m:
+                continue
+            full = os.path.join(lattice_dir, lf)
+            frames.append((lf, int(m.group(1)), lambda full=full: np.loadtxt(full, delimiter=",")))
+
+    # Vorhandene Steps in dieser Simulation (Duplikate vermeiden)
+    existing_steps = set(
+        r[0] for r in session.query(Lattice.step)
+                             .filter(Lattice.simulation_id == simulation_id)
+                             .all()
+    )
+
+    total_lattices = 0
+    skipped_shape = 0
+    skipped_dupe = 0
+    read_errors = 0
+
+    for lf, step, load in frames:
+        if step in existing_steps:
+            skipped_dupe += 1
+            continue
+
+        try:
+            data = load()
+        except Exception as e:
+            print(f"⚠️  skip {lf}: read error: {e}")
+            read_errors += 1
+            continue
+
+        # SHAPE-GUARD: nur (L, L) akzeptieren
+        if not (isinstance(data, np.ndarray) and data.ndim == 2 and data.shape == (L, L)):
+            print(f"⚠️  skip {lf}: shape {getattr(data, 'shape', None)} != ({L}, {L})")
+            skipped_shape += 1
+            continue
+
+        encoded = array_to_base64(data)
+        session.add(
+            Lattice(
+                simulation_id=simulation_id,
+                model=model,
+                temperature=float(T),
+                step=step,
+                data=encoded,
+            )
+        )
+        existing_steps.add(step)
+        total_lattices += 1
+
+    print(
+        f"🧩 Lattices: imported={total_lattices}, "
+        f"skipped_shape={skipped_shape}, skipped_dupe={skipped_dupe}, read_errors={read_errors}"
+    )
+    return total_lattices
+
+
 def import_simulation_with_lattices(filepath: str) -> int:
     """
-    Liest eine CSV (results_...csv) + passende lattice_...csv Dateien und schreibt 1 Simulation.
+    Liest eine results_...csv (+ lattice_..._<step>.csv Dateien) bzw. results_...npy/.bin
+    (+ gestapelte lattice_...npy/.bin) und schreibt 1 Simulation.
     Gibt die neue Simulation-ID zurück (oder -1 bei Fehler).
     """
     print(f"\n🔍 Verarbeite Datei: {filepath}")
     fname = os.path.basename(filepath)
-    model, L, T = parse_filename(fname)  # erwartet results_<MODEL>_L<L>_T<temp>.csv
+    model, L, T = parse_filename(fname)  # erwartet results_<MODEL>_L<L>_T<temp>.<csv|npy|bin>
+    ext = os.path.splitext(fname)[1]
 
-    # Results einlesen
-    df = pd.read_csv(filepath)
+    # Results einlesen (Binärformat: memmap, kein Text-Parsing)
+    df = results_frame(filepath) if ext in BINARY_EXTENSIONS else pd.read_csv(filepath)
     if "step" not in df.columns:
         raise ValueError("results CSV fehlt 'step' Spalte.")
     df = df.sort_values("step").drop_duplicates(subset=["step"])
@@ -86,92 +246,57 @@ def import_simulation_with_lattices(filepath: str) -> int:
         session.add(sim)
         session.flush()  # sim.id verfügbar
         print(f"➡️ Neue Simulation: ID={sim.id}, Model={model}, T={T:.2f}, L={L}, Steps={len(df)}")
+        meta = read_meta(filepath)
+        if "tau_int_energy" in meta:
+            print(f"⏱️ tau_int (Sweeps): E={meta['tau_int_energy']:.3g}, "
+                  f"|M|={meta['tau_int_magnetization']:.3g}, thin={meta['thin']:.3g}")
 
-        # Results speichern
-        res_rows: List[Result] = [
-            Result(
-                simulation_id=sim.id,
-                step=int(r["step"]),
-                energy=float(r["energy"]),
-                magnetization=float(r["magnetization"]),
-                energy_squared=float(r["energy_squared"]),
-                magnetization_squared=float(r["magnetization_squared"]),
-            )
-            for _, r in df.iterrows()
-        ]
-        session.add_all(res_rows)
+        # Results speichern (Bulk, ohne ORM-Objekt pro Zeile)
+        bulk_insert_results(session, sim.id, df)
 
-        # -------- Lattice-Dateien importieren --------
-        lattice_dir = os.path.dirname(filepath)
-        t_str = f"{T:.2f}"
+        import_lattices(session, sim.id, model, L, T, os.path.dirname(filepath), ext)
 
-        # Neues Muster (mit L)
-        pattern_new = rf"lattice_{re.escape(model)}_L{int(L)}_T{re.escape(t_str)}_\d+\.csv"
-        lattice_files = sorted(f for f in os.listdir(lattice_dir) if re.fullmatch(pattern_new, f))
-
-        # Fallback: altes Muster (ohne L), falls nichts gefunden
-        used_pattern = "new"
-        if not lattice_files:
-            pattern_old = rf"lattice_{re.escape(model)}_T{re.escape(t_str)}_\d+\.csv"
-            lattice_files = sorted(f for f in os.listdir(lattice_dir) if re.fullmatch(pattern_old, f))
-            used_pattern = "old"
-        print(f"🧭 Lattice-Muster benutzt: {used_pattern} | Dateien gefunden: {len(lattice_files)}")
-
-        # Vorhandene Steps in dieser Simulation (Duplikate vermeiden)
-        existing_steps = set(
-            r[0] for r in session.query(Lattice.step)
-                                 .filter(Lattice.simulation_id == sim.id)
-                                 .all()
-        )
-
-        total_lattices = 0
-        skipped_shape = 0
-        skipped_dupe = 0
-        read_errors = 0
+        # Commit durch Context-Manager
+        return sim.id
 
-        for lf in lattice_files:
-            m = re.search(r"_(\d+)\.csv$", lf)
-            if not m:
-                continue
-            step = int(m.group(1))
-            if step in existing_steps:
-                skipped_dupe += 1
-                continue
 
-            full = os.path.join(lattice_dir, lf)
-            try:
-                data = np.loadtxt(full, delimiter=",")
-            except Exception as e:
-                print(f"⚠️  skip {lf}: read error: {e}")
-                read_errors += 1
-                continue
+def import_replicas_file(filepath: str) -> List[int]:
+    """
+    Liest eine replicas_<MODEL>_L<L>_T<temp>.<csv|npy|bin> (mcmc --replicas) und schreibt
+    eine Simulation pro Replika. Alle Replikas eines Laufs teilen sich die batch_id
+    (= simulation_id von Replika 0); Lattices hängen an Replika 0.
+    Gibt die neuen Simulation-IDs zurück (Reihenfolge = Replika-Index).
+    """
+    print(f"\n🔍 Verarbeite Replika-Datei: {filepath}")
+    fname = os.path.basename(filepath)
+    model, L, T = parse_filename(fname)
+    ext = os.path.splitext(fname)[1]
 
-            # SHAPE-GUARD: nur (L, L) akzeptieren
-            if not (isinstance(data, np.ndarray) and data.ndim == 2 and data.shape == (L, L)):
-                print(f"⚠️  skip {lf}: shape {getattr(data, 'shape', None)} != ({L}, {L})")
-                skipped_shape += 1
-                continue
+    df = results_frame(filepath) if ext in BINARY_EXTENSIONS else pd.read_csv(filepath)
+    if not {"replica", "step"} <= set(df.columns):
+        raise ValueError("replicas-Datei braucht 'replica'- und 'step'-Spalten.")
 
-            encoded = array_to_base64(data)
-            session.add(
-                Lattice(
-                    simulation_id=sim.id,
-                    model=model,
-                    temperature=float(T),
-                    step=step,
-                    data=encoded,
-                )
+    sim_ids: List[int] = []
+    with get_session() as session:
+        batch_id = None
+        for r, sub in df.groupby("replica", sort=True):
+            sub = sub.drop(columns="replica").sort_values("step").drop_duplicates(subset=["step"])
+            sim = Simulation(
+                model=model,
+                temperature=float(T),
+                steps=int(len(sub)),
+                lattice_size=int(L),
             )
-            existing_steps.add(step)
-            total_lattices += 1
-
-        print(
-            f"🧩 Lattices: imported={total_lattices}, "
-            f"skipped_shape={skipped_shape}, skipped_dupe={skipped_dupe}, read_errors={read_errors}"
-        )
-
-        # Commit durch Context-Manager
-        return sim.id
+            session.add(sim)
+            session.flush()
+            if batch_id is None:
+                batch_id = sim.id
+                import_lattices(session, sim.id, model, L, T, os.path.dirname(filepath), ext)
+            session.add(Replica(simulation_id=sim.id, batch_id=batch_id, replica=int(r)))
+            bulk_insert_results(session, sim.id, sub)
+            sim_ids.append(sim.id)
+        print(f"➡️ Replika-Batch {batch_id}: {len(sim_ids)} Simulationen, Model={model}, T={T:.2f}, L={L}")
+    return sim_ids
 
 
 
@@ -184,7 +309,7 @@ def import_all_from_results_folder(
     temperatures: Optional[Sequence[float]] = None,
 ) -> int:
     """
-    Sucht im Ordner nach 'results_*.csv' und importiert nur Dateien,
+    Sucht im Ordner nach 'results_*.csv|npy|bin' (und 'replicas_*' aus --replicas) und importiert nur Dateien,
     die zu den optionalen Filtern (models, L, temperatures) passen.
     """
     print(f"\n📂 Durchsuche Ordner: {folder}")
@@ -192,9 +317,12 @@ def import_all_from_results_folder(
         print("⚠️ Ordner nicht gefunden.")
         return 0
 
-    files = sorted(f for f in os.listdir(folder) if f.startswith("results_") and f.endswith(".csv"))
+    files = sorted(
+        f for f in os.listdir(folder)
+        if f.startswith(("results_", "replicas_")) and f.endswith((".csv",) + BINARY_EXTENSIONS)
+    )
     if not files:
-        print("⚠️ Keine results_*.csv gefunden.")
+        print("⚠️ Keine results_*/replicas_*.csv|npy|bin gefunden.")
         return 0
 
     # Filter vorbereiten (auf 2 Nachkommastellen runden wie bei deinen Filenamen)
@@ -225,6 +353,9 @@ def import_all_from_results_folder(
     count = 0
     for fname in selected:
         try:
+            if fname.startswith("replicas_"):
+                count += len(import_replicas_file(os.path.join(folder, fname)))
+                continue
             sim_id = import_simulation_with_lattices(os.path.join(folder, fname))
             if sim_id != -1:
                 count += 1
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Text, inspect, text
 from sqlalchemy.sql import func
 
 Base = declarative_base()
@@ -44,6 +44,7 @@ class Statistic(Base):
     error_magnetization = Column(Float)
     error_cv = Column(Float)
     error_chi = Column(Float)
+    last_result_id = Column(Integer)  # größte ausgewertete results.id → neuere Zeilen = veraltet
     created_at = Column(DateTime, server_default=func.now())
 
 class Lattice(Base):
@@ -54,3 +55,34 @@ class Lattice(Base):
     temperature = Column(Float)
     step = Column(Integer)
     data = Column(Text)  # z.B. Base64-encoded NumPy array
+
+class Replica(Base):
+    __tablename__ = "replicas"
+    id = Column(Integer, primary_key=True)
+    simulation_id = Column(Integer, ForeignKey("simulations.id", ondelete="CASCADE"))
+    batch_id = Column(Integer)  # simulation_id der Replika 0 desselben Laufs
+    replica = Column(Integer)
+
+
+def add_missing_columns(engine) -> list:
+    """
+    Ergänzt Spalten, die im Modell stehen, in bestehenden Tabellen aber fehlen (create_all legt
+    nur neue Tabellen an). Nur für nullable Spalten ohne Server-Default gedacht, z.B.
+    statistics.last_result_id; das ALTER TABLE funktioniert so auf Postgres und SQLite.
+    Rückgabe: ergänzte Spalten als 'tabelle.spalte'.
+    """
+    insp = inspect(engine)
+    tables = set(insp.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            have = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in have or not col.nullable or col.server_default is not None:
+                    continue
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+                added.append(f"{table.name}.{col.name}")
+    return added
@@ -0,0 +1 @@
+from .binary_io import open_results, open_lattices, results_frame, read_bin_header, read_meta
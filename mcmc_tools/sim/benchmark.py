@@ -0,0 +1,341 @@
+# mcmc_tools/sim/benchmark.py
+"""
+Durchsatz-Benchmarks der nativen Modelle mit gespeicherten Baselines.
+
+Jeder BenchCase ist eine Konfiguration (model, L, T, algorithm, sweep, threads). Gemessen wird
+in C++ (src/include/benchmark.hpp), entweder über die Bindings (Model.benchmark(), Standard)
+oder über das Executable (mcmc --bench, --backend cli). Beide liefern dieselben Kennzahlen:
+  sweeps_per_sec / updates_per_sec  schnellster von --repeats Blöcken (Cluster: Sweep-Äquivalente)
+  measure_ns                        eine Messung (E, M, tau_int-Schätzer) wie in der Messphase
+  snapshot_us                       ein Gitter-Snapshot (get_lattice-Kopie)
+  memory_bytes                      Modellzustand (Gitter, Tabellen, Workspaces)
+  peak_rss_kb                       Spitzen-RSS des Prozesses (nur informativ)
+
+Baselines sind JSON-Dateien (Ergebnisse pro Case + Rechnerangaben). compare() meldet jede
+Kennzahl, die um mehr als threshold (relativ) schlechter ist als die Baseline. Standardmäßig
+werden sweeps_per_sec und memory_bytes verglichen; measure_ns und snapshot_us (Operationen im
+ns/µs-Bereich) schwanken auf geteilten Rechnern um ±50 % und zählen nur mit --metrics.
+Baselines sind rechnerspezifisch: nur auf derselben Maschine vergleichen.
+
+CLI:
+    # Baseline anlegen
+    python -m mcmc_tools.sim.benchmark --quick --save benchmarks/baseline.json
+    # später: vergleichen (Exit-Code 1 bei Regression)
+    python -m mcmc_tools.sim.benchmark --quick --compare benchmarks/baseline.json --threshold 0.2
+    # dieselben Cases über das Executable
+    python -m mcmc_tools.sim.benchmark --backend cli --bin ./build/mcmc --quick
+
+benchmarks/baseline.json ist eine Referenz-Baseline der --quick-Matrix (Rechner siehe "machine"),
+gedacht für --compare auf vergleichbarer Hardware. pytest vergleicht nur auf Wunsch:
+MCMC_BENCH_BASELINE=<datei> schaltet tests/test_benchmark.py::test_no_regression_against_stored_baseline
+ein, MCMC_BENCH_THRESHOLD setzt die Schwelle (Standard 0.3; auffällige Cases werden einmal nachgemessen).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+MODELS = ("Ising", "Clock", "XY")
+ALGORITHMS = {
+    "Ising": ("metropolis", "wolff", "sw"),
+    "Clock": ("metropolis", "heatbath", "wolff", "sw"),
+    "XY": ("metropolis", "wolff", "sw"),
+}
+# geordnet / nahe am Übergang / ungeordnet (Cluster-Größen und Akzeptanzraten hängen an T)
+TEMPERATURES = {
+    "Ising": (1.5, 2.27, 3.5),
+    "Clock": (0.5, 0.9, 1.5),
+    "XY": (0.5, 0.9, 1.5),
+}
+CLOCK_STATES = 6  # wie das mcmc-Executable
+
+# Kennzahl → True, wenn größer besser ist
+METRICS = {
+    "sweeps_per_sec": True,
+    "measure_ns": False,
+    "snapshot_us": False,
+    "memory_bytes": False,
+}
+GATE_METRICS = ("sweeps_per_sec", "memory_bytes")  # stabil genug für eine feste Schwelle
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    model: str
+    L: int
+    T: float
+    algorithm: str = "metropolis"
+    sweep: str = "random"          # random | checkerboard | msc (nur Ising, L Vielfaches von 64)
+    threads: int = 1               # Checkerboard-Threads
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}/L{self.L}/T{self.T:g}/{self.algorithm}/{self.sweep}/t{self.threads}"
+
+    def command(self, mcmc_path: str, sweeps: int, warmup: int, repeats: int, seed: int = 1) -> List[str]:
+        return [
+            str(mcmc_path), "--bench",
+            "--model", self.model, "--L", str(self.L), "--T", repr(self.T),
+            "--algorithm", self.algorithm, "--sweep", self.sweep, "--threads", str(self.threads),
+            "--steps", str(sweeps), "--burnin", str(warmup), "--bench-repeats", str(repeats),
+            "--seed", str(seed),
+        ]
+
+
+@dataclass
+class BenchResult:
+    case: BenchCase
+    sweeps: int
+    seconds: float
+    sweeps_per_sec: float
+    updates_per_sec: float
+    measure_ns: float
+    snapshot_us: float
+    memory_bytes: int
+    peak_rss_kb: int = -1
+
+    def metrics(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out.pop("case")
+        return out
+
+
+@dataclass(frozen=True)
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative Verschlechterung (0.25 = 25 % schlechter)."""
+        if METRICS[self.metric]:
+            return 1.0 - self.current / self.baseline
+        return self.current / self.baseline - 1.0
+
+
+def default_matrix(
+    models: Sequence[str] = MODELS,
+    sizes: Sequence[int] = (32, 128),
+    algorithms: Optional[Sequence[str]] = None,
+    threads: Sequence[int] = (1,),
+    quick: bool = False,
+) -> List[BenchCase]:
+    """
+    models × L × T × Algorithmus × Threads. threads > 1 nur für Metropolis mit Checkerboard
+    (die Cluster-Updates laufen seriell); Ising zusätzlich msc für L Vielfaches von 64.
+    quick: nur die Temperatur nahe am Übergang (für pytest / schnelle Vergleiche).
+    """
+    cases: List[BenchCase] = []
+    for model in models:
+        temps = TEMPERATURES[model][1:2] if quick else TEMPERATURES[model]
+        algs = [a for a in (algorithms or ALGORITHMS[model]) if a in ALGORITHMS[model]]
+        for L in sizes:
+            for T in temps:
+                for alg in algs:
+                    cases.append(BenchCase(model, L, T, alg))
+                    if alg != "metropolis":
+                        continue
+                    for n in threads:
+                        if n > 1:
+                            cases.append(BenchCase(model, L, T, alg, "checkerboard", n))
+                    if model == "Ising" and L % 64 == 0:
+                        cases.append(BenchCase(model, L, T, alg, "msc"))
+    return cases
+
+
+def _make_model(case: BenchCase, seed: int):
+    if case.model == "Ising":
+        import ising
+        sim = ising.MultiSpinIsingModel(case.L, case.T, 1.0) if case.sweep == "msc" else ising.IsingModel(case.L, case.T, 1.0)
+    elif case.model == "Clock":
+        import clock
+        sim = clock.ClockModel(case.L, CLOCK_STATES, case.T, 1.0)
+    elif case.model == "XY":
+        import xy
+        sim = xy.XYModel(case.L, case.T, 1.0)
+    else:
+        raise ValueError(f"Unbekanntes Modell: {case.model}")
+    sim.set_seed(seed)
+    sim.randomize_lattice()
+    if case.sweep != "msc":
+        sim.set_sweep_mode(case.sweep)
+        sim.set_algorithm(case.algorithm)
+    elif case.algorithm != "metropolis":
+        raise ValueError("msc unterstützt nur metropolis")
+    sim.set_threads(case.threads)
+    return sim
+
+
+def _result(case: BenchCase, data: Dict[str, Any]) -> BenchResult:
+    return BenchResult(
+        case=case,
+        sweeps=int(data["sweeps"]),
+        seconds=float(data["seconds"]),
+        sweeps_per_sec=float(data["sweeps_per_sec"]),
+        updates_per_sec=float(data["updates_per_sec"]),
+        measure_ns=float(data["measure_ns"]),
+        snapshot_us=float(data["snapshot_us"]),
+        memory_bytes=int(data["memory_bytes"]),
+        peak_rss_kb=int(data.get("peak_rss_kb", -1)),
+    )
+
+
+def run_case(case: BenchCase, sweeps: int = 2000, warmup: int = 100, repeats: int = 3, seed: int = 1) -> BenchResult:
+    """Ein Case über die Bindings (Modell im laufenden Prozess, GIL freigegeben)."""
+    sim = _make_model(case, seed)
+    return _result(case, sim.benchmark(sweeps=sweeps, warmup=warmup, repeats=repeats))
+
+
+def parse_bench_line(stdout: str) -> Dict[str, Any]:
+    """Die {"event": "bench", ...}-Zeile aus der Ausgabe von mcmc --bench."""
+    for line in stdout.splitlines():
+        line = line.strip()
+        if line.startswith("{"):
+            data = json.loads(line)
+            if data.get("event") == "bench":
+                return data
+    raise ValueError("Keine Benchmark-Zeile in der mcmc-Ausgabe")
+
+
+def run_case_cli(case: BenchCase, mcmc_path: str, sweeps: int = 2000, warmup: int = 100, repeats: int = 3,
+                 seed: int = 1, cwd: Optional[str] = None) -> BenchResult:
+    """Ein Case über das Executable (eigener Prozess → peak_rss_kb gehört nur zu diesem Case)."""
+    proc = subprocess.run(case.command(mcmc_path, sweeps, warmup, repeats, seed),
+                          capture_output=True, text=True, cwd=cwd)
+    if proc.returncode != 0:
+        raise RuntimeError(f"mcmc --bench fehlgeschlagen ({case.key}): {proc.stderr.strip()}")
+    return _result(case, parse_bench_line(proc.stdout))
+
+
+def run_matrix(cases: Iterable[BenchCase], backend: str = "bindings", mcmc_path: str = "mcmc",
+               sweeps: int = 2000, warmup: int = 100, repeats: int = 3, on_result=None) -> List[BenchResult]:
+    """Cases nacheinander (parallele Läufe würden sich gegenseitig ausbremsen)."""
+    results = []
+    for case in cases:
+        if backend == "cli":
+            res = run_case_cli(case, mcmc_path, sweeps, warmup, repeats)
+        else:
+            res = run_case(case, sweeps, warmup, repeats)
+        results.append(res)
+        if on_result is not None:
+            on_result(res)
+    return results
+
+
+# -------- Baselines --------
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def save_baseline(path: str, results: Sequence[BenchResult], **info: Any) -> None:
+    data = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        **info,
+        "results": {r.case.key: {**asdict(r.case), **r.metrics()} for r in results},
+    }
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """key → Kennzahlen."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(
+    results: Sequence[BenchResult],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.2,
+    metrics: Sequence[str] = GATE_METRICS,
+) -> List[Regression]:
+    """Kennzahlen, die um mehr als threshold schlechter sind; Cases ohne Baseline werden übersprungen."""
+    regressions = []
+    for res in results:
+        ref = baseline.get(res.case.key)
+        if ref is None:
+            continue
+        current = res.metrics()
+        for metric in metrics:
+            base = ref.get(metric)
+            if not base or base <= 0:
+                continue
+            reg = Regression(res.case.key, metric, float(base), float(current[metric]))
+            if reg.change > threshold:
+                regressions.append(reg)
+    return regressions
+
+
+# -------- CLI --------
+
+def _print_result(res: BenchResult) -> None:
+    print(f"⏱️  {res.case.key:<40} {res.sweeps_per_sec:>10.1f} sweeps/s  {res.updates_per_sec / 1e6:>8.2f} M upd/s  "
+          f"mess {res.measure_ns:>6.1f} ns  snap {res.snapshot_us:>8.2f} µs  {res.memory_bytes / 1024:>8.1f} KiB")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Durchsatz-Benchmarks der MCMC-Modelle")
+    p.add_argument("--backend", choices=["bindings", "cli"], default="bindings")
+    p.add_argument("--bin", default=os.getenv("MCMC_PATH", "mcmc"), help="Pfad zum mcmc-Executable (--backend cli)")
+    p.add_argument("--models", nargs="+", default=list(MODELS), choices=list(MODELS))
+    p.add_argument("--L", nargs="+", type=int, default=[32, 128])
+    p.add_argument("--algorithms", nargs="+", default=None,
+                   choices=sorted({a for algs in ALGORITHMS.values() for a in algs}))
+    p.add_argument("--threads", nargs="+", type=int, default=[1],
+                   help="Checkerboard-Threads (Metropolis), z.B. 1 4")
+    p.add_argument("--quick", action="store_true", help="nur T nahe am Übergang")
+    p.add_argument("--sweeps", type=int, default=2000, help="gemessene Sweeps pro Case")
+    p.add_argument("--warmup", type=int, default=100)
+    p.add_argument("--repeats", type=int, default=3, help="Blöcke pro Case, der schnellste zählt")
+    p.add_argument("--save", default=None, help="Ergebnisse als Baseline (JSON) speichern")
+    p.add_argument("--compare", default=None, help="mit dieser Baseline vergleichen")
+    p.add_argument("--threshold", type=float, default=0.2, help="erlaubte relative Verschlechterung")
+    p.add_argument("--metrics", nargs="+", default=list(GATE_METRICS), choices=list(METRICS),
+                   help="verglichene Kennzahlen")
+    args = p.parse_args(argv)
+
+    cases = default_matrix(args.models, args.L, args.algorithms, args.threads, quick=args.quick)
+    print(f"🚀 {len(cases)} Benchmark-Cases ({args.backend})")
+    try:
+        results = run_matrix(cases, args.backend, args.bin, args.sweeps, args.warmup, args.repeats,
+                             on_result=_print_result)
+    except (RuntimeError, FileNotFoundError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.save:
+        save_baseline(args.save, results, backend=args.backend, sweeps=args.sweeps, repeats=args.repeats)
+        print(f"💾 Baseline gespeichert: {args.save}")
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.threshold, args.metrics)
+        for reg in regressions:
+            print(f"❌ {reg.key} {reg.metric}: {reg.baseline:.4g} → {reg.current:.4g} "
+                  f"({reg.change:+.0%} schlechter)")
+        if regressions:
+            return 1
+        print(f"✅ keine Regression über {args.threshold:.0%} gegenüber {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+# mcmc_tools/sim/binary_io.py
+"""
+Memory-mapped Reader für die Binärausgabe des mcmc-Executables (--format npy|bin).
+
+Layout (siehe src/include/output_writer.hpp):
+  results_<MODEL>_L<L>_T<T>.{npy,bin}  float64 (n, 5): step, E, M, E^2, M^2
+  replicas_<MODEL>_L<L>_T<T>.{npy,bin} float64 (n, 6): replica, step, E, M, E^2, M^2 (--replicas)
+  lattice_<MODEL>_L<L>_T<T>.{npy,bin}  Records (k,) aus {step: int64, lattice: (L, L)}
+.bin hat statt des NPY-Headers einen festen 32-Byte-Header ("MCMC", Version, Art, dtype, count, dim).
+Daneben liegt meta_<MODEL>_L<L>_T<T>.json (src/include/run_meta.hpp): Laufparameter, Burn-in,
+Messabstand und tau_int von E und |M| in Sweeps.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+RESULT_COLUMNS = ("step", "energy", "magnetization", "energy_squared", "magnetization_squared")
+REPLICA_COLUMNS = ("replica",) + RESULT_COLUMNS
+BINARY_EXTENSIONS = (".npy", ".bin")
+
+_BIN_HEADER = struct.Struct("<4sBccBQI12x")  # 32 Bytes
+
+
+def read_bin_header(path: str) -> Dict[str, object]:
+    """Liest den 32-Byte-Header einer .bin-Datei."""
+    with open(path, "rb") as f:
+        raw = f.read(_BIN_HEADER.size)
+    if len(raw) < _BIN_HEADER.size:
+        raise ValueError(f"❌ Datei zu kurz für MCMC-Header: {path}")
+    magic, version, kind, dtype, itemsize, count, dim = _BIN_HEADER.unpack(raw)
+    if magic != b"MCMC":
+        raise ValueError(f"❌ Kein MCMC-Binärformat: {path}")
+    if version != 1:
+        raise ValueError(f"❌ Nicht unterstützte Formatversion {version}: {path}")
+    return dict(
+        kind=kind.decode("ascii"),
+        dtype=np.dtype(f"<{dtype.decode('ascii')}{itemsize}"),
+        count=int(count),
+        dim=int(dim),
+        offset=_BIN_HEADER.size,
+    )
+
+
+def open_results(path: str) -> np.ndarray:
+    """Messreihe als read-only memmap (n, 5) bzw. (n, 6) mit replica-Spalte, float64 – ohne Text-Parsing."""
+    ext = os.path.splitext(path)[1]
+    if ext == ".npy":
+        arr = np.load(path, mmap_mode="r")
+    elif ext == ".bin":
+        h = read_bin_header(path)
+        if h["kind"] != "S":
+            raise ValueError(f"❌ Keine Messreihe: {path}")
+        if h["count"] == 0:
+            return np.empty((0, h["dim"]), dtype=h["dtype"])
+        arr = np.memmap(path, dtype=h["dtype"], mode="r", offset=h["offset"], shape=(h["count"], h["dim"]))
+    else:
+        raise ValueError(f"❌ Unbekannte Endung: {path}")
+
+    if arr.ndim != 2 or arr.shape[1] not in (len(RESULT_COLUMNS), len(REPLICA_COLUMNS)):
+        raise ValueError(f"❌ Unerwartete Form {arr.shape} in {path}")
+    return arr
+
+
+def results_frame(path: str) -> pd.DataFrame:
+    """Messreihe als DataFrame mit denselben Spalten wie die CSV-Ausgabe."""
+    arr = open_results(path)
+    columns = REPLICA_COLUMNS if arr.shape[1] == len(REPLICA_COLUMNS) else RESULT_COLUMNS
+    df = pd.DataFrame(np.asarray(arr), columns=list(columns))
+    df["step"] = df["step"].astype("int64")
+    if "replica" in df.columns:
+        df["replica"] = df["replica"].astype("int64")
+    return df
+
+
+def open_lattices(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gestapelte Lattice-Snapshots als memmap.
+    Rückgabe: (steps (k,), lattices (k, L, L)) – beides Views auf die Datei.
+    """
+    ext = os.path.splitext(path)[1]
+    if ext == ".npy":
+        rec = np.load(path, mmap_mode="r")
+    elif ext == ".bin":
+        h = read_bin_header(path)
+        if h["kind"] != "L":
+            raise ValueError(f"❌ Keine Lattice-Datei: {path}")
+        L = h["dim"]
+        dt = np.dtype([("step", "<i8"), ("lattice", h["dtype"], (L, L))])
+        if h["count"] == 0:
+            rec = np.empty((0,), dtype=dt)
+        else:
+            rec = np.memmap(path, dtype=dt, mode="r", offset=h["offset"], shape=(h["count"],))
+    else:
+        raise ValueError(f"❌ Unbekannte Endung: {path}")
+
+    if rec.dtype.names != ("step", "lattice"):
+        raise ValueError(f"❌ Unerwartetes Record-Layout {rec.dtype} in {path}")
+    return rec["step"], rec["lattice"]
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    """
+    Metadaten eines Laufs: path ist die meta_*.json selbst oder eine Ausgabedatei desselben Laufs
+    (results_/replicas_/lattice_*). Leeres dict, wenn keine Metadaten geschrieben wurden.
+    """
+    folder, fname = os.path.split(path)
+    if not fname.endswith(".json"):
+        fname = re.sub(r"^(?:results|replicas|lattice)_", "meta_", os.path.splitext(fname)[0]) + ".json"
+    meta_file = os.path.join(folder, fname)
+    if not os.path.exists(meta_file):
+        return {}
+    with open(meta_file, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,120 @@
+# mcmc_tools/sim/checkpoint.py
+"""
+Checkpoints des mcmc-Executables (--checkpoint-out / --resume-from) und Warmstart aus der DB.
+
+Layout (siehe src/include/checkpoint.hpp):
+  32-Byte-MCMC-Header (Art 'C', Spin-dtype, count 1, dim L) | L*L Spins | Text-Trailer "key=value"
+Vom Executable geschriebene Checkpoints enthalten den RNG-Zustand (rng=...) und setzen die Kette
+exakt fort. Hier geschriebene Checkpoints enthalten nur das Gitter → Warmstart mit kurzem Burn-in.
+"""
+from __future__ import annotations
+
+import base64
+import io
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mcmc_tools.sim.binary_io import _BIN_HEADER, read_bin_header
+
+# Kompakte Gitter-Typen des Executables (lattice_utils.hpp); ältere Checkpoints mit <i4/<f8 liest es weiterhin
+SPIN_DTYPES = {"Ising": np.dtype("<i1"), "Clock": np.dtype("<u1"), "XY": np.dtype("<f4")}
+
+
+def write_checkpoint(path: str, model: str, T: float, lattice: np.ndarray, step: int = 0) -> str:
+    """Schreibt ein (L, L)-Gitter als Warmstart-Checkpoint (ohne RNG-Zustand)."""
+    if model not in SPIN_DTYPES:
+        raise ValueError(f"❌ Unbekanntes Modell: {model}")
+    lattice = np.asarray(lattice)
+    if lattice.ndim != 2 or lattice.shape[0] != lattice.shape[1]:
+        raise ValueError(f"❌ Gitter muss (L, L) sein, nicht {lattice.shape}")
+    dt = SPIN_DTYPES[model]
+    if dt.kind != "f":
+        lattice = np.rint(lattice)
+        info = np.iinfo(dt)
+        if lattice.size and (lattice.min() < info.min or lattice.max() > info.max):
+            raise ValueError(f"❌ Werte außerhalb von {dt} im Gitter für {model}")
+    spins = np.ascontiguousarray(lattice, dtype=dt)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_BIN_HEADER.pack(b"MCMC", 1, b"C", dt.kind.encode("ascii"), dt.itemsize, 1, spins.shape[0]))
+        f.write(spins.tobytes())
+        f.write(f"model={model}\nT={float(T)!r}\nstep={int(step)}\n".encode("utf-8"))
+    return path
+
+
+def read_checkpoint(path: str) -> Dict[str, object]:
+    """Checkpoint als dict: model, T, step, rng (leer bei Warmstarts), lattice (L, L)."""
+    h = read_bin_header(path)
+    if h["kind"] != "C":
+        raise ValueError(f"❌ Kein Checkpoint: {path}")
+    L = h["dim"]
+    with open(path, "rb") as f:
+        f.seek(h["offset"])
+        lattice = np.frombuffer(f.read(L * L * h["dtype"].itemsize), dtype=h["dtype"]).reshape(L, L)
+        trailer = f.read().decode("utf-8")
+    meta = dict(line.split("=", 1) for line in trailer.splitlines() if "=" in line)
+    return dict(
+        model=meta.get("model", ""),
+        T=float(meta.get("T", "nan")),
+        step=int(meta.get("step", 0)),
+        rng=meta.get("rng", ""),
+        lattice=lattice,
+    )
+
+
+def nearest_equilibrated_lattice(model: str, L: int, T: float,
+                                 max_dT: Optional[float] = None) -> Optional[Tuple[float, np.ndarray]]:
+    """
+    Letzter gespeicherter Snapshot (höchster Step der neuesten Simulation) bei der Temperatur,
+    die T am nächsten liegt – (T_quelle, Gitter) oder None, falls nichts innerhalb max_dT liegt.
+    """
+    from sqlalchemy import func, select
+
+    from mcmc_tools.db.connection import get_session
+    from mcmc_tools.db.models import Lattice, Simulation
+
+    with get_session() as s:
+        stmt = (
+            select(Lattice.temperature, Lattice.data)
+            .join(Simulation, Simulation.id == Lattice.simulation_id)
+            .where(Lattice.model == model, Simulation.lattice_size == int(L))
+            .order_by(func.abs(Lattice.temperature - float(T)), Simulation.id.desc(), Lattice.step.desc())
+            .limit(1)
+        )
+        row = s.execute(stmt).first()
+    if row is None or (max_dT is not None and abs(row.temperature - T) > max_dT):
+        return None
+    lattice = np.load(io.BytesIO(base64.b64decode(row.data)))  # Gegenstück zu etl.array_to_base64
+    if lattice.shape != (L, L):
+        return None
+    return float(row.temperature), lattice
+
+
+def warm_start_args(model: str, L: int, T: float, folder: str = "checkpoints",
+                    burnin: int = 200, max_dT: Optional[float] = 0.5) -> Tuple[str, ...]:
+    """
+    mcmc-Argumente für einen Warmstart aus der DB ("--resume-from <ckpt> --burnin <n>"),
+    leer, wenn kein passender Snapshot existiert (→ normaler Kaltstart mit vollem Burn-in).
+    """
+    found = nearest_equilibrated_lattice(model, L, T, max_dT=max_dT)
+    if found is None:
+        return ()
+    T_src, lattice = found
+    path = os.path.join(folder, f"warm_{model}_L{int(L)}_T{T:.2f}.ckpt")
+    write_checkpoint(path, model, T_src, lattice)
+    return ("--resume-from", os.path.abspath(path), "--burnin", str(int(burnin)))
+
+
+def with_warm_starts(jobs: Sequence, folder: str = "checkpoints", burnin: int = 200,
+                     max_dT: Optional[float] = 0.5) -> List:
+    """Hängt an jeden SweepJob die Warmstart-Argumente aus warm_start_args an (falls vorhanden)."""
+    from dataclasses import replace
+
+    out = []
+    for job in jobs:
+        extra = warm_start_args(job.model, job.L, job.T, folder=folder, burnin=burnin, max_dT=max_dT)
+        out.append(replace(job, extra_args=tuple(job.extra_args) + extra) if extra else job)
+    return out
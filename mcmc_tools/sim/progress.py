@@ -0,0 +1,137 @@
+# mcmc_tools/sim/progress.py
+"""
+Live-Fortschritt des mcmc-Executables (--progress jsonl, siehe src/include/progress.hpp).
+
+Das Executable schreibt pro Zeile ein JSON-Objekt auf stdout (oder in --progress-out):
+  start    : model, L, T (eine Kette; --anneal: eine pro Temperatur)
+  progress : phase ("burnin" | "measure"), sweeps/total der Phase, samples/samples_total,
+             sweeps_per_sec, energy, magnetization (laufende Totale), eta_s
+  done     : sweeps, seconds
+Unbekannte Werte (Sweeps bei --burnin auto, Messungen bei --thin auto) kommen als null → None.
+Andere Zeilen auf stdout (z.B. "Continuing ...") werden übersprungen.
+
+stream_progress() startet den Prozess und liefert die Records als async Iterator, zum Schluss
+einen "exit"-Record mit returncode und stderr. aclose() auf dem Iterator beendet den Prozess
+(z.B. weil ein Lauf offensichtlich zu langsam ist):
+
+    records = stream_progress(job.command("mcmc"), every=0.5)
+    async for rec in records:
+        if rec.event == "progress" and rec.eta_s is not None and rec.eta_s > 3600:
+            await records.aclose()  # kill + wait
+            break
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class ProgressRecord:
+    event: str                              # start | progress | done | exit
+    model: Optional[str] = None
+    L: Optional[int] = None
+    T: Optional[float] = None
+    phase: Optional[str] = None             # burnin | measure
+    sweeps: Optional[int] = None            # progress: Sweeps der Phase; done: des ganzen Laufs
+    total: Optional[int] = None             # Sweeps der Phase (None = unbekannt)
+    samples: Optional[int] = None
+    samples_total: Optional[int] = None
+    sweeps_per_sec: Optional[float] = None
+    energy: Optional[float] = None
+    magnetization: Optional[float] = None
+    eta_s: Optional[float] = None
+    seconds: Optional[float] = None         # done
+    returncode: Optional[int] = None        # exit
+    stderr: str = ""                        # exit
+    data: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)  # Rohdaten der Zeile
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Anteil der aktuellen Phase (None, solange die Gesamtzahl unbekannt ist)."""
+        if self.samples_total:
+            return min(1.0, (self.samples or 0) / self.samples_total)
+        if self.total:
+            return min(1.0, (self.sweeps or 0) / self.total)
+        return None
+
+
+_INT_FIELDS = ("L", "sweeps", "total", "samples", "samples_total")
+_FLOAT_FIELDS = ("T", "sweeps_per_sec", "energy", "magnetization", "eta_s", "seconds")
+
+
+def parse_progress_line(line: str) -> Optional[ProgressRecord]:
+    """Eine stdout-Zeile → ProgressRecord, oder None für Zeilen ohne Fortschritts-JSON."""
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or "event" not in data:
+        return None
+    values: Dict[str, Any] = {"event": str(data["event"]), "data": data}
+    if data.get("model") is not None:
+        values["model"] = str(data["model"])
+    if data.get("phase") is not None:
+        values["phase"] = str(data["phase"])
+    for key in _INT_FIELDS:
+        if data.get(key) is not None:
+            values[key] = int(data[key])
+    for key in _FLOAT_FIELDS:
+        if data.get(key) is not None:
+            values[key] = float(data[key])
+    return ProgressRecord(**values)
+
+
+async def iter_progress(stream: asyncio.StreamReader) -> AsyncIterator[ProgressRecord]:
+    """Records aus einem Stream (stdout eines mcmc-Prozesses, Named Pipe) bis EOF."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            return
+        rec = parse_progress_line(line.decode("utf-8", errors="replace"))
+        if rec is not None:
+            yield rec
+
+
+def with_progress_args(command: Sequence[str], every: Optional[float] = None) -> list:
+    """Hängt --progress jsonl (und --progress-every) an, falls noch nicht gesetzt."""
+    cmd = [str(c) for c in command]
+    if "--progress" not in cmd:
+        cmd += ["--progress", "jsonl"]
+    if every is not None and "--progress-every" not in cmd:
+        cmd += ["--progress-every", str(every)]
+    return cmd
+
+
+async def stream_progress(
+    command: Sequence[str],
+    cwd: Optional[str] = None,
+    every: Optional[float] = None,
+) -> AsyncIterator[ProgressRecord]:
+    """
+    Startet command (z.B. SweepJob.command(mcmc_path)) mit --progress jsonl und liefert dessen
+    Records, zuletzt ProgressRecord(event="exit", returncode=..., stderr=...).
+    aclose() vor dem Ende beendet den Prozess (kill) und sammelt ihn ein.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *with_progress_args(command, every),
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, cwd=cwd,
+    )
+    stderr_task = asyncio.ensure_future(proc.stderr.read())  # parallel lesen → kein volles Pipe-Puffer
+    try:
+        async for rec in iter_progress(proc.stdout):
+            yield rec
+        returncode = await proc.wait()
+        stderr = (await stderr_task).decode("utf-8", errors="replace")
+        yield ProgressRecord(event="exit", returncode=returncode, stderr=stderr)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
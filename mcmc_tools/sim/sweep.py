@@ -0,0 +1,287 @@
+# mcmc_tools/sim/sweep.py
+"""
+Paralleler Temperatur/Modell-Sweep über das mcmc-Executable.
+
+Jeder (model, T)-Punkt ist ein eigener mcmc-Prozess. Ein beschränkter Pool
+(Standard: verfügbare Kerne) hält höchstens max_workers Prozesse gleichzeitig
+am Laufen; fertige Jobs werden sofort an einen Progress-Callback gemeldet.
+
+Mit --tempering läuft pro Modell ein einziger mcmc-Prozess im Replica-Exchange-
+Modus über das ganze Temperaturgitter (--T-list); die Replikas teilen sich die
+Kerne innerhalb des Prozesses.
+
+Mit --anneal läuft pro Modell ebenfalls ein einziger Prozess (mcmc --anneal), aber mit nur
+einer Kette, die das Gitter von der höchsten zur niedrigsten Temperatur abkühlt: jede
+Temperatur startet vom Gitter der vorigen und braucht nur --anneal-burnin Sweeps Burn-in.
+Spart Prozessstart und Zufallsstart-Burn-in pro Punkt bei dichten Gittern.
+
+Mit --warm-start startet jeder Job vom letzten gespeicherten Gitter der nächstgelegenen
+Temperatur aus der DB (mcmc_tools.sim.checkpoint) und braucht nur --warm-burnin Sweeps Burn-in.
+
+Mit --replicas R rechnet jeder (model, T)-Job R unabhängige Ketten in einem Prozess
+(replicas_<model>_L<L>_T<T>.*, Fehler zwischen den Replikas: stats.replica_statistics).
+
+Mit --burnin auto endet der Burn-in jedes Jobs, sobald die Energiereihe stationär ist;
+die tatsächlich verwendeten Sweeps stehen in results/meta_<model>_L<L>_T<T>.json.
+--burnin-cold prüft zusätzlich gegen einen Kaltstart (findet metastabile Zustände, doppelte Kosten).
+Mit --thin auto folgt der Messabstand der laufend geschätzten tau_int (ebenfalls in meta_*.json);
+die Messphase bleibt im Sweep-Budget (--max-sweeps, Standard steps × 5), bei großer tau_int
+werden entsprechend weniger Messungen gespeichert.
+
+CLI:
+    python -m mcmc_tools.sim.sweep --bin ./build/mcmc --models Ising XY --L 16 \\
+        --T-min 0.5 --T-max 3.5 --T-step 0.5 --steps 10000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    model: str
+    L: int
+    T: float
+    steps: int
+    extra_args: Sequence[str] = ()
+
+    def command(self, mcmc_path: str) -> List[str]:
+        return [
+            str(mcmc_path),
+            "--model", self.model,
+            "--L", str(self.L),
+            "--T", f"{self.T:.2f}",
+            "--steps", str(self.steps),
+            *self.extra_args,
+        ]
+
+
+@dataclass
+class JobResult:
+    job: SweepJob
+    returncode: int
+    stderr: str = ""
+    stdout: str = ""
+    seconds: float = 0.0
+    error: Optional[str] = field(default=None)  # Startfehler (z.B. Binary fehlt)
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and self.error is None
+
+
+ProgressCallback = Callable[[JobResult, int, int], None]  # (result, fertig, gesamt)
+
+
+def default_workers() -> int:
+    """Anzahl nutzbarer Kerne (respektiert CPU-Affinity/Container-Limits, falls verfügbar)."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def temperature_grid(t_min: float, t_max: float, t_step: float) -> List[float]:
+    """Temperaturen wie in der App: inklusive t_max, auf 2 Nachkommastellen gerundet."""
+    temps = np.arange(t_min, t_max + t_step / 2, t_step)
+    return [round(float(T), 2) for T in temps]
+
+
+def build_jobs(
+    models: Sequence[str],
+    L: int,
+    temperatures: Sequence[float],
+    steps: int,
+    extra_args: Sequence[str] = (),
+) -> List[SweepJob]:
+    return [
+        SweepJob(model=model, L=int(L), T=float(T), steps=int(steps), extra_args=tuple(extra_args))
+        for T in temperatures
+        for model in models
+    ]
+
+
+def build_tempering_jobs(
+    models: Sequence[str],
+    L: int,
+    temperatures: Sequence[float],
+    steps: int,
+    extra_args: Sequence[str] = (),
+    cores: Optional[int] = None,
+) -> List[SweepJob]:
+    """
+    Ein Parallel-Tempering-Job pro Modell; T ist nur die niedrigste Gitter-Temperatur.
+    cores: Kerne für den ganzen Sweep. Gleichzeitig laufende Jobs teilen sie sich
+    (--workers pro Prozess), sonst nimmt jeder Prozess alle Kerne.
+    """
+    t_list = ",".join(f"{float(T):.2f}" for T in sorted(temperatures))
+    cores = cores or default_workers()
+    per_job = max(1, cores // max(1, min(cores, len(models))))
+    return [
+        SweepJob(model=model, L=int(L), T=float(min(temperatures)), steps=int(steps),
+                 extra_args=("--T-list", t_list, "--workers", str(per_job), *extra_args))
+        for model in models
+    ]
+
+
+def build_anneal_jobs(
+    models: Sequence[str],
+    L: int,
+    temperatures: Sequence[float],
+    steps: int,
+    extra_args: Sequence[str] = (),
+) -> List[SweepJob]:
+    """Ein Anneal-Job pro Modell, Temperaturen absteigend (Abkühlen); T ist die Starttemperatur."""
+    t_list = ",".join(f"{float(T):.2f}" for T in sorted(temperatures, reverse=True))
+    return [
+        SweepJob(model=model, L=int(L), T=float(max(temperatures)), steps=int(steps),
+                 extra_args=("--T-list", t_list, "--anneal", *extra_args))
+        for model in models
+    ]
+
+
+def _run_job(mcmc_path: str, job: SweepJob, cwd: Optional[str]) -> JobResult:
+    t0 = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            job.command(mcmc_path), capture_output=True, text=True, cwd=cwd
+        )
+    except OSError as e:
+        return JobResult(job=job, returncode=-1, error=str(e), seconds=time.perf_counter() - t0)
+    return JobResult(
+        job=job,
+        returncode=completed.returncode,
+        stderr=completed.stderr,
+        stdout=completed.stdout,
+        seconds=time.perf_counter() - t0,
+    )
+
+
+def run_sweep(
+    mcmc_path: str,
+    jobs: Sequence[SweepJob],
+    cwd: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    on_complete: Optional[ProgressCallback] = None,
+) -> List[JobResult]:
+    """
+    Führt alle Jobs parallel aus (höchstens max_workers gleichzeitig).
+    on_complete wird im aufrufenden Thread pro fertigem Job aufgerufen (Streamlit-tauglich).
+    Rückgabe: Ergebnisse in der Reihenfolge von jobs.
+    """
+    if not jobs:
+        return []
+    workers = max(1, min(max_workers or default_workers(), len(jobs)))
+
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, str(mcmc_path), job, cwd): i for i, job in enumerate(jobs)}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            res = fut.result()
+            results[futures[fut]] = res
+            if on_complete is not None:
+                on_complete(res, done, len(jobs))
+    return results  # type: ignore[return-value]
+
+
+# -------- CLI --------
+
+def _print_progress(res: JobResult, done: int, total: int) -> None:
+    status = "✅" if res.ok else f"❌ rc={res.returncode}"
+    print(f"[{done}/{total}] {res.job.model} L={res.job.L} T={res.job.T:.2f} {status} ({res.seconds:.1f}s)")
+    if not res.ok:
+        print((res.error or res.stderr).strip(), file=sys.stderr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Parallel MCMC sweep over temperatures and models")
+    p.add_argument("--bin", default=os.getenv("MCMC_PATH", "mcmc"), help="Pfad zum mcmc-Executable")
+    p.add_argument("--models", nargs="+", default=["Ising"], choices=["Ising", "Clock", "XY"])
+    p.add_argument("--L", type=int, default=16)
+    p.add_argument("--T-min", type=float, default=0.5)
+    p.add_argument("--T-max", type=float, default=3.5)
+    p.add_argument("--T-step", type=float, default=0.5)
+    p.add_argument("--steps", type=int, default=10_000)
+    p.add_argument("--workers", type=int, default=None, help="Standard: verfügbare Kerne")
+    p.add_argument("--cwd", default=None, help="Arbeitsverzeichnis (results/ wird darin angelegt)")
+    p.add_argument("--format", choices=["csv", "npy", "bin"], default="csv")
+    p.add_argument("--algorithm", choices=["metropolis", "wolff", "sw", "heatbath"], default="metropolis",
+                   help="Update-Verfahren (Cluster-Updates nahe T_c, heatbath nur Clock)")
+    p.add_argument("--tempering", action="store_true",
+                   help="Replica Exchange: ein Prozess pro Modell über alle Temperaturen")
+    p.add_argument("--swap-every", type=int, default=5, help="Sweeps zwischen Tauschversuchen")
+    p.add_argument("--anneal", action="store_true",
+                   help="eine Kette pro Modell kühlt über alle Temperaturen ab (ein Prozess pro Modell)")
+    p.add_argument("--anneal-burnin", type=int, default=500,
+                   help="Burn-in-Sweeps nach jedem Temperaturschritt bei --anneal")
+    p.add_argument("--warm-start", action="store_true",
+                   help="Startgitter aus der DB (nächste Temperatur) statt Zufallsgitter, kurzer Burn-in")
+    p.add_argument("--warm-burnin", type=int, default=200, help="Burn-in-Sweeps bei Warmstart")
+    p.add_argument("--replicas", type=int, default=0,
+                   help="unabhängige Ketten pro (model, T) in einem Prozess (nicht mit --tempering)")
+    p.add_argument("--burnin", default=None,
+                   help="Burn-in-Sweeps oder 'auto' (adaptiv, Länge steht in results/meta_*.json)")
+    p.add_argument("--burnin-cold", action="store_true",
+                   help="bei --burnin auto zusätzlich gegen einen Kaltstart prüfen (doppelter Burn-in-Aufwand)")
+    p.add_argument("--thin", default=None,
+                   help="Sweeps pro Messung oder 'auto' (Abstand ~ tau_int, nicht mit --tempering)")
+    p.add_argument("--max-sweeps", type=int, default=None,
+                   help="Sweep-Budget der Messphase bei --thin auto (Standard: steps × 5)")
+    args = p.parse_args(argv)
+    if args.replicas and args.tempering:
+        p.error("--replicas und --tempering schließen sich aus")
+    if args.anneal and (args.tempering or args.replicas or args.warm_start):
+        p.error("--anneal schließt --tempering, --replicas und --warm-start aus")
+    if args.thin == "auto" and args.tempering:
+        p.error("--thin auto und --tempering schließen sich aus")
+    if args.algorithm == "heatbath" and set(args.models) != {"Clock"}:
+        p.error("--algorithm heatbath gibt es nur für das Clock-Modell")
+
+    temps = temperature_grid(args.T_min, args.T_max, args.T_step)
+    extra = ("--format", args.format, "--algorithm", args.algorithm)
+    if args.burnin is not None:
+        extra += ("--burnin", args.burnin)
+    if args.burnin_cold:
+        extra += ("--burnin-cold",)
+    if args.thin is not None:
+        extra += ("--thin", args.thin)
+    if args.max_sweeps is not None:
+        extra += ("--max-sweeps", str(args.max_sweeps))
+    if args.anneal:
+        jobs = build_anneal_jobs(args.models, args.L, temps, args.steps,
+                                 extra_args=extra + ("--anneal-burnin", str(args.anneal_burnin)))
+    elif args.tempering:
+        jobs = build_tempering_jobs(args.models, args.L, temps, args.steps,
+                                    extra_args=extra + ("--swap-every", str(args.swap_every)),
+                                    cores=args.workers or default_workers())
+    else:
+        if args.replicas:
+            # Kerne teilen sich die Jobs bereits → ein Replika-Thread pro Prozess
+            extra += ("--replicas", str(args.replicas), "--workers", "1")
+        jobs = build_jobs(args.models, args.L, temps, args.steps, extra_args=extra)
+        if args.warm_start:
+            from mcmc_tools.sim.checkpoint import with_warm_starts
+            folder = os.path.join(args.cwd or ".", "checkpoints")
+            jobs = with_warm_starts(jobs, folder=folder, burnin=args.warm_burnin)
+            print(f"🧭 Warmstart für {sum('--resume-from' in j.extra_args for j in jobs)}/{len(jobs)} Jobs")
+    workers = args.workers or default_workers()
+    print(f"🚀 {len(jobs)} Jobs auf {min(workers, len(jobs))} Worker(n)")
+
+    t0 = time.perf_counter()
+    results = run_sweep(args.bin, jobs, cwd=args.cwd, max_workers=workers, on_complete=_print_progress)
+    n_failed = sum(not r.ok for r in results)
+    print(f"📦 Done in {time.perf_counter() - t0:.1f}s, {len(results) - n_failed} ok, {n_failed} failed.")
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
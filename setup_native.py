@@ -1,31 +1,42 @@
+import sys
 from setuptools import setup
 from pybind11.setup_helpers import Pybind11Extension, build_ext
 
+# OpenMP für die Checkerboard-Threads (Apple-Clang hat kein -fopenmp → ohne Threads bauen)
+openmp = [] if sys.platform in ("darwin", "win32") else ["-fopenmp"]
+
 ext_modules = [
     Pybind11Extension(
         "ising",
-        ["src/bindings/ising_model_bindings.cpp", "src/models/ising_model.cpp"],
+        ["src/bindings/ising_model_bindings.cpp", "src/models/ising_model.cpp",
+         "src/models/multispin_ising.cpp"],
         include_dirs=["src"],
         cxx_std=17,
+        extra_compile_args=openmp,
+        extra_link_args=openmp,
     ),
     Pybind11Extension(
         "clock",
         ["src/bindings/clock_model_bindings.cpp", "src/models/clock_model.cpp"],
         include_dirs=["src"],
         cxx_std=17,
+        extra_compile_args=openmp,
+        extra_link_args=openmp,
     ),
     Pybind11Extension(
         "xy",
         ["src/bindings/xy_model_bindings.cpp", "src/models/xy_model.cpp"],
         include_dirs=["src"],
         cxx_std=17,
+        extra_compile_args=openmp,
+        extra_link_args=openmp,
     ),
 ]
 
 setup(
     name="mcmc_tools",
     version="0.1.0",
-    packages=["mcmc_tools", "mcmc_tools.analysis", "mcmc_tools.analysis_utils", "mcmc_tools.db"],
+    packages=["mcmc_tools", "mcmc_tools.analysis", "mcmc_tools.analysis_utils", "mcmc_tools.db", "mcmc_tools.sim"],
     ext_modules=ext_modules,
     cmdclass={"build_ext": build_ext},
     zip_safe=False,
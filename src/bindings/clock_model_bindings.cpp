@@ -1,18 +1,67 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include "../include/clock_model.hpp"
+#include "numpy_bridge.hpp"
 
 namespace py = pybind11;
 
 PYBIND11_MODULE(clock, m) {
-    py::class_<ClockModel>(m, "ClockModel")
+    py::class_<ClockModel>(m, "ClockModel", py::buffer_protocol())
         .def(py::init<int, int, double, double>())  // L, M, T, J
         .def("compute_energy", &ClockModel::compute_energy)
         .def("compute_magnetization", &ClockModel::compute_magnetization)
+        .def("current_energy", &ClockModel::current_energy)
+        .def("current_magnetization", &ClockModel::current_magnetization)
+        .def("refresh_observables", &ClockModel::refresh_observables)
+        .def("set_check_observables", &ClockModel::set_check_observables)
         .def("metropolis_update", &ClockModel::metropolis_update)
-        .def("set_lattice", &ClockModel::set_lattice)
+        .def_buffer(&lattice_buffer<ClockModel>)
+        .def_property_readonly("lattice", &lattice_view<ClockModel>)
+        .def("get_lattice", &lattice_copy<ClockModel>)
+        .def("set_lattice", &set_lattice_array<ClockModel>)
         .def("metropolis_update_deterministic", &ClockModel::metropolis_update_deterministic)
         .def("set_forced_state", &ClockModel::set_forced_state)
-        .def("set_forced_random", &ClockModel::set_forced_random);
+        .def("set_forced_random", &ClockModel::set_forced_random)
+        .def("set_seed", &ClockModel::set_seed, py::arg("seed"), py::arg("replica") = 0)
+        .def("randomize_lattice", &ClockModel::randomize_lattice)
+        .def("save_checkpoint", [](const ClockModel& self, const std::string& path, long step) {
+            save_checkpoint(path, "Clock", self, step);
+        }, py::arg("path"), py::arg("step") = 0)
+        .def("load_checkpoint", [](ClockModel& self, const std::string& path) {
+            return restore_checkpoint(self, path, "Clock");
+        })
+        .def("metropolis_sweep", &ClockModel::metropolis_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("checkerboard_sweep", &ClockModel::checkerboard_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("heat_bath_sweep", &ClockModel::heat_bath_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("sweep", &ClockModel::sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_sweep_mode", [](ClockModel& self, const std::string& mode) {
+            self.set_sweep_mode(parse_sweep_mode(mode));  // "random" | "checkerboard"
+        })
+        .def("set_threads", &ClockModel::set_threads)
+        .def("equilibrate", &equilibrate_model<ClockModel>, py::arg("min_sweeps") = 100, py::arg("max_sweeps") = 100000,
+             py::arg("cold_start") = false)
+        .def("benchmark", &benchmark_dict<ClockModel>, py::arg("sweeps") = 2000, py::arg("warmup") = 100,
+             py::arg("repeats") = 3)
+        .def("memory_bytes", &ClockModel::memory_bytes)
+        .def("run", &run_model<ClockModel>, py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("measure") = true, py::arg("burnin") = 0, py::arg("lattice_every") = 0)
+        .def("anneal", &anneal_model<ClockModel>, py::arg("temperatures"), py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("burnin") = 0, py::arg("anneal_burnin") = 500, py::arg("lattice_every") = 0)
+        .def("set_temperature", &ClockModel::set_temperature)
+        .def("get_temperature", &ClockModel::get_temperature)
+        .def("wolff_update", &ClockModel::wolff_update, py::call_guard<py::gil_scoped_release>())
+        .def("wolff_sweep", &ClockModel::wolff_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("swendsen_wang_sweep", &ClockModel::swendsen_wang_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_algorithm", [](ClockModel& self, const std::string& algorithm) {
+            self.set_algorithm(parse_algorithm(algorithm));  // "metropolis" | "wolff" | "sw" | "heatbath"
+        });
 
+    m.def("run_replicas", [](int L, int M, double T, double J, int replicas, long sweeps,
+                             int thin, long burnin, int workers, long seed,
+                             const std::string& algorithm, const std::string& sweep_mode) {
+        return run_replicas_model<ClockModel>([=] { return std::make_unique<ClockModel>(L, M, T, J); },
+                                              algorithm, sweep_mode, replicas, sweeps, thin, burnin, workers, seed);
+    }, py::arg("L"), py::arg("M"), py::arg("T"), py::arg("J"), py::arg("replicas"), py::arg("sweeps"),
+       py::arg("thin") = 1, py::arg("burnin") = 0, py::arg("workers") = 0, py::arg("seed") = -1,
+       py::arg("algorithm") = "metropolis", py::arg("sweep_mode") = "random");
 }
@@ -1,21 +1,108 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include "../include/ising_model.hpp"
+#include "../include/multispin_ising.hpp"
+#include "numpy_bridge.hpp"
 #include <pybind11/stl.h>  
 
 namespace py = pybind11;
 
 PYBIND11_MODULE(ising, m) {
-    py::class_<IsingModel>(m, "IsingModel")
+    py::class_<IsingModel>(m, "IsingModel", py::buffer_protocol())
         .def(py::init<int, double, double>())
         .def("compute_energy", &IsingModel::compute_energy)
         .def("compute_magnetization", &IsingModel::compute_magnetization)
+        .def("current_energy", &IsingModel::current_energy)
+        .def("current_magnetization", &IsingModel::current_magnetization)
+        .def("refresh_observables", &IsingModel::refresh_observables)
+        .def("set_check_observables", &IsingModel::set_check_observables)
         .def("save_lattice", &IsingModel::save_lattice)
-        .def("set_lattice", &IsingModel::set_lattice)
-        .def("set_seed", &IsingModel::set_seed)
+        .def_buffer(&lattice_buffer<IsingModel>)
+        .def_property_readonly("lattice", &lattice_view<IsingModel>)
+        .def("get_lattice", &lattice_copy<IsingModel>)
+        .def("set_lattice", &set_lattice_array<IsingModel>)
+        .def("set_seed", &IsingModel::set_seed, py::arg("seed"), py::arg("replica") = 0)
+        .def("randomize_lattice", &IsingModel::randomize_lattice)
+        .def("save_checkpoint", [](const IsingModel& self, const std::string& path, long step) {
+            save_checkpoint(path, "Ising", self, step);
+        }, py::arg("path"), py::arg("step") = 0)
+        .def("load_checkpoint", [](IsingModel& self, const std::string& path) {
+            return restore_checkpoint(self, path, "Ising");
+        })
         .def("metropolis_update", py::overload_cast<>(&IsingModel::metropolis_update))
         .def("set_forced_random", &IsingModel::set_forced_random)
-        .def("metropolis_update", py::overload_cast<int, int>(&IsingModel::metropolis_update));
-    
-}
+        .def("metropolis_update", py::overload_cast<int, int>(&IsingModel::metropolis_update))
+        .def("metropolis_sweep", &IsingModel::metropolis_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("checkerboard_sweep", &IsingModel::checkerboard_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("sweep", &IsingModel::sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_sweep_mode", [](IsingModel& self, const std::string& mode) {
+            self.set_sweep_mode(parse_sweep_mode(mode));  // "random" | "checkerboard"
+        })
+        .def("set_threads", &IsingModel::set_threads)
+        .def("equilibrate", &equilibrate_model<IsingModel>, py::arg("min_sweeps") = 100, py::arg("max_sweeps") = 100000,
+             py::arg("cold_start") = false)
+        .def("benchmark", &benchmark_dict<IsingModel>, py::arg("sweeps") = 2000, py::arg("warmup") = 100,
+             py::arg("repeats") = 3)
+        .def("memory_bytes", &IsingModel::memory_bytes)
+        .def("run", &run_model<IsingModel>, py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("measure") = true, py::arg("burnin") = 0, py::arg("lattice_every") = 0)
+        .def("anneal", &anneal_model<IsingModel>, py::arg("temperatures"), py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("burnin") = 0, py::arg("anneal_burnin") = 500, py::arg("lattice_every") = 0)
+        .def("set_temperature", &IsingModel::set_temperature)
+        .def("get_temperature", &IsingModel::get_temperature)
+        .def("wolff_update", &IsingModel::wolff_update, py::call_guard<py::gil_scoped_release>())
+        .def("wolff_sweep", &IsingModel::wolff_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("swendsen_wang_sweep", &IsingModel::swendsen_wang_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_algorithm", [](IsingModel& self, const std::string& algorithm) {
+            self.set_algorithm(parse_algorithm(algorithm));  // "metropolis" | "wolff" | "sw"
+        });
+
+    // Multi-spin-codiert: 64 Spins pro Wort, nur Metropolis/Checkerboard, L Vielfaches von 64
+    py::class_<MultiSpinIsingModel>(m, "MultiSpinIsingModel")
+        .def(py::init<int, double, double>())
+        .def("compute_energy", &MultiSpinIsingModel::compute_energy)
+        .def("compute_magnetization", &MultiSpinIsingModel::compute_magnetization)
+        .def("current_energy", &MultiSpinIsingModel::current_energy)
+        .def("current_magnetization", &MultiSpinIsingModel::current_magnetization)
+        .def("refresh_observables", &MultiSpinIsingModel::refresh_observables)
+        .def("set_check_observables", &MultiSpinIsingModel::set_check_observables)
+        .def("get_lattice", &lattice_copy<MultiSpinIsingModel>)
+        .def("set_lattice", &set_lattice_array<MultiSpinIsingModel>)
+        .def("set_seed", &MultiSpinIsingModel::set_seed, py::arg("seed"), py::arg("replica") = 0)
+        .def("randomize_lattice", &MultiSpinIsingModel::randomize_lattice)
+        .def("save_checkpoint", [](const MultiSpinIsingModel& self, const std::string& path, long step) {
+            save_checkpoint(path, "Ising", self, step);
+        }, py::arg("path"), py::arg("step") = 0)
+        .def("load_checkpoint", [](MultiSpinIsingModel& self, const std::string& path) {
+            return restore_checkpoint(self, path, "Ising");
+        })
+        .def("sweep", &MultiSpinIsingModel::sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_threads", &MultiSpinIsingModel::set_threads)
+        .def("equilibrate", &equilibrate_model<MultiSpinIsingModel>, py::arg("min_sweeps") = 100,
+             py::arg("max_sweeps") = 100000, py::arg("cold_start") = false)
+        .def("benchmark", &benchmark_dict<MultiSpinIsingModel>, py::arg("sweeps") = 2000, py::arg("warmup") = 100,
+             py::arg("repeats") = 3)
+        .def("memory_bytes", &MultiSpinIsingModel::memory_bytes)
+        .def("run", &run_model<MultiSpinIsingModel>, py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("measure") = true, py::arg("burnin") = 0, py::arg("lattice_every") = 0)
+        .def("anneal", &anneal_model<MultiSpinIsingModel>, py::arg("temperatures"), py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("burnin") = 0, py::arg("anneal_burnin") = 500, py::arg("lattice_every") = 0)
+        .def("set_temperature", &MultiSpinIsingModel::set_temperature)
+        .def("get_temperature", &MultiSpinIsingModel::get_temperature)
+        .def("size", &MultiSpinIsingModel::size);
 
+    // sweep_mode="msc" → MultiSpinIsingModel statt IsingModel
+    m.def("run_replicas", [](int L, double T, double J, int replicas, long sweeps,
+                             int thin, long burnin, int workers, long seed,
+                             const std::string& algorithm, const std::string& sweep_mode) {
+        if (sweep_mode == "msc") {
+            return run_replicas_model<MultiSpinIsingModel>(
+                [=] { return std::make_unique<MultiSpinIsingModel>(L, T, J); },
+                algorithm, "checkerboard", replicas, sweeps, thin, burnin, workers, seed);
+        }
+        return run_replicas_model<IsingModel>([=] { return std::make_unique<IsingModel>(L, T, J); },
+                                              algorithm, sweep_mode, replicas, sweeps, thin, burnin, workers, seed);
+    }, py::arg("L"), py::arg("T"), py::arg("J"), py::arg("replicas"), py::arg("sweeps"),
+       py::arg("thin") = 1, py::arg("burnin") = 0, py::arg("workers") = 0, py::arg("seed") = -1,
+       py::arg("algorithm") = "metropolis", py::arg("sweep_mode") = "random");
+}
@@ -0,0 +1,234 @@
+// numpy_bridge.hpp
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <type_traits>
+#include <utility>
+#include <vector>
+
+#include "../include/benchmark.hpp"
+#include "../include/checkpoint.hpp"
+#include "../include/cluster_updates.hpp"
+#include "../include/equilibration.hpp"
+#include "../include/lattice_utils.hpp"
+#include "../include/replicas.hpp"
+#include "../include/rng.hpp"
+#include "../include/simulation.hpp"
+
+namespace py = pybind11;
+
+// Hands a std::vector to NumPy without copying: the vector moves to the heap and
+// is owned by a capsule that frees it together with the array.
+template <typename T>
+py::array_t<T> vector_to_numpy(std::vector<T>&& data, std::vector<py::ssize_t> shape) {
+    auto* owned = new std::vector<T>(std::move(data));
+    py::capsule owner(owned, [](void* p) { delete static_cast<std::vector<T>*>(p); });
+    return py::array_t<T>(std::move(shape), owned->data(), owner);
+}
+
+// run() result dict; the record's vectors move into the arrays
+template <typename T>
+py::dict chain_to_dict(ChainRecord<T>&& rec, py::ssize_t L, bool measure) {
+    const py::ssize_t n = static_cast<py::ssize_t>(rec.energy.size());
+    const py::ssize_t k = static_cast<py::ssize_t>(rec.lattice_steps.size());
+
+    py::dict out;
+    out["energy"] = vector_to_numpy(std::move(rec.energy), {n});
+    out["magnetization"] = vector_to_numpy(std::move(rec.magnetization), {n});
+    out["lattices"] = vector_to_numpy(std::move(rec.lattices), {k, L, L});
+    out["lattice_steps"] = vector_to_numpy(std::move(rec.lattice_steps), {k});
+    if (measure) {
+        out["tau_int_energy"] = rec.tau_energy;
+        out["tau_int_magnetization"] = rec.tau_magnetization;
+    }
+    return out;
+}
+
+// Model.run(sweeps, thin=1, measure=True, burnin=0, lattice_every=0) → dict of NumPy arrays
+// (+ tau_int_energy / tau_int_magnetization in sweeps when measuring).
+// The whole chain runs in C++ with the GIL released.
+template <class Model>
+py::dict run_model(Model& sim, long sweeps, int thin, bool measure, long burnin, long lattice_every) {
+    if (sweeps < 0 || burnin < 0 || lattice_every < 0) {
+        throw std::invalid_argument("sweeps, burnin and lattice_every must be >= 0");
+    }
+    if (thin < 1) throw std::invalid_argument("thin must be >= 1");
+
+    ChainRecord<typename Model::spin_type> rec;
+    {
+        py::gil_scoped_release release;
+        rec = record_chain(sim, sweeps, thin, measure, burnin, lattice_every);
+    }
+    return chain_to_dict(std::move(rec), sim.size(), measure);
+}
+
+// Model.anneal(temperatures, sweeps, thin=1, burnin=0, anneal_burnin=500, lattice_every=0) → list
+// of run() dicts (+ "T", "burnin"), one per temperature in the given order. The chain keeps its
+// lattice from one temperature to the next: 'burnin' sweeps before the first, 'anneal_burnin'
+// before every further one (mcmc --anneal).
+template <class Model>
+py::list anneal_model(Model& sim, const std::vector<double>& temperatures, long sweeps, int thin,
+                      long burnin, long anneal_burnin, long lattice_every) {
+    if (sweeps < 0 || burnin < 0 || anneal_burnin < 0 || lattice_every < 0) {
+        throw std::invalid_argument("sweeps, burnin, anneal_burnin and lattice_every must be >= 0");
+    }
+    if (thin < 1) throw std::invalid_argument("thin must be >= 1");
+
+    std::vector<ChainRecord<typename Model::spin_type>> records;
+    {
+        py::gil_scoped_release release;
+        for (std::size_t t = 0; t < temperatures.size(); ++t) {
+            sim.set_temperature(temperatures[t]);
+            records.push_back(record_chain(sim, sweeps, thin, true, t == 0 ? burnin : anneal_burnin, lattice_every));
+        }
+    }
+    py::list out;
+    for (std::size_t t = 0; t < records.size(); ++t) {
+        const long n_burnin = records[t].burnin;
+        py::dict run = chain_to_dict(std::move(records[t]), sim.size(), true);
+        run["T"] = temperatures[t];
+        run["burnin"] = n_burnin;
+        out.append(run);
+    }
+    return out;
+}
+
+// run_replicas(...) → {"energy": (R, n), "magnetization": (R, n), "tau_int_*": (R,)}: R independent chains,
+// each with its own RNG stream (seed, replica), on 'workers' threads with the GIL released.
+template <class Model, class MakeModel>
+py::dict run_replicas_model(MakeModel make_model, const std::string& algorithm, const std::string& sweep_mode,
+                            int replicas, long sweeps, int thin, long burnin, int workers, long seed) {
+    if (replicas < 1) throw std::invalid_argument("replicas must be >= 1");
+    if (sweeps < 0 || burnin < 0) throw std::invalid_argument("sweeps and burnin must be >= 0");
+    if (thin < 1) throw std::invalid_argument("thin must be >= 1");
+    const Algorithm alg = parse_algorithm(algorithm);
+    const SweepMode mode = parse_sweep_mode(sweep_mode);
+    if (workers <= 0) workers = static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    const std::uint64_t base_seed = seed >= 0 ? static_cast<std::uint64_t>(seed) : random_seed();
+
+    std::vector<ChainRecord<typename Model::spin_type>> records;
+    {
+        py::gil_scoped_release release;
+        records = run_replicas<Model>(make_model, [&](Model& sim) {
+            sim.set_algorithm(alg);
+            sim.set_sweep_mode(mode);
+        }, [&](Model& sim, int) {
+            BurninScope<Model> scope(sim);
+            for (long s = 0; s < burnin; ++s) sim.sweep();
+            return burnin;
+        }, replicas, workers, base_seed, sweeps / thin, Thinning(thin), 0);
+    }
+
+    const py::ssize_t n = static_cast<py::ssize_t>(sweeps / thin);
+    std::vector<double> energy, magnetization, tau_e, tau_m;
+    energy.reserve(static_cast<std::size_t>(replicas) * n);
+    magnetization.reserve(static_cast<std::size_t>(replicas) * n);
+    for (auto& rec : records) {
+        energy.insert(energy.end(), rec.energy.begin(), rec.energy.end());
+        magnetization.insert(magnetization.end(), rec.magnetization.begin(), rec.magnetization.end());
+        tau_e.push_back(rec.tau_energy);
+        tau_m.push_back(rec.tau_magnetization);
+    }
+
+    py::dict out;
+    out["energy"] = vector_to_numpy(std::move(energy), {replicas, n});
+    out["magnetization"] = vector_to_numpy(std::move(magnetization), {replicas, n});
+    out["tau_int_energy"] = vector_to_numpy(std::move(tau_e), {replicas});
+    out["tau_int_magnetization"] = vector_to_numpy(std::move(tau_m), {replicas});
+    return out;
+}
+
+// model.equilibrate(min_sweeps=100, max_sweeps=100000, cold_start=False) → (sweeps, stationary)
+template <class Model>
+py::tuple equilibrate_model(Model& sim, long min_sweeps, long max_sweeps, bool cold_start) {
+    if (min_sweeps < 0 || max_sweeps < 0) throw std::invalid_argument("min_sweeps and max_sweeps must be >= 0");
+    EquilibrationResult result;
+    {
+        py::gil_scoped_release release;
+        result = equilibrate(sim, min_sweeps, max_sweeps, cold_start);
+    }
+    return py::make_tuple(result.sweeps, result.stationary);
+}
+
+// model.benchmark(sweeps=2000, warmup=100, repeats=3) → dict with the fields of BenchResult
+// (benchmark.hpp; same numbers as mcmc --bench). Runs on the model itself with the GIL released.
+template <class Model>
+py::dict benchmark_dict(Model& sim, long sweeps, long warmup, int repeats) {
+    if (sweeps < 1 || warmup < 0 || repeats < 1) {
+        throw std::invalid_argument("benchmark needs sweeps >= 1, warmup >= 0 and repeats >= 1");
+    }
+    BenchResult r;
+    {
+        py::gil_scoped_release release;
+        r = benchmark_model(sim, sweeps, warmup, repeats);
+    }
+    py::dict out;
+    out["sweeps"] = r.sweeps;
+    out["seconds"] = r.seconds;
+    out["sweeps_per_sec"] = r.sweeps_per_sec;
+    out["updates_per_sec"] = r.updates_per_sec;
+    out["measure_ns"] = r.measure_ns;
+    out["snapshot_us"] = r.snapshot_us;
+    out["memory_bytes"] = r.memory_bytes;
+    out["peak_rss_kb"] = r.peak_rss_kb;
+    return out;
+}
+
+// model.load_checkpoint(path) → step: lattice, RNG state and temperature of the checkpoint
+template <class Model>
+long restore_checkpoint(Model& sim, const std::string& path, const std::string& model) {
+    const Checkpoint cp = load_checkpoint(path);
+    if (cp.model != model) throw std::invalid_argument("Checkpoint is for model " + cp.model + ", not " + model);
+    apply_checkpoint(sim, cp);
+    sim.set_temperature(cp.T);
+    return cp.step;
+}
+
+// --- Lattice access -----------------------------------------------------------------
+
+// Buffer protocol: np.asarray(model) is a writable (L, L) view of the model memory.
+template <class Model>
+py::buffer_info lattice_buffer(Model& sim) {
+    using T = typename Model::spin_type;
+    const py::ssize_t L = sim.size();
+    return py::buffer_info(sim.lattice_data(), sizeof(T), py::format_descriptor<T>::format(), 2,
+                           {L, L}, {L * static_cast<py::ssize_t>(sizeof(T)), static_cast<py::ssize_t>(sizeof(T))});
+}
+
+// model.lattice: same view as a NumPy array whose base keeps the model alive.
+// Writes bypass the cached observables → call model.refresh_observables() afterwards.
+template <class Model>
+py::array_t<typename Model::spin_type> lattice_view(py::object self) {
+    Model& sim = self.cast<Model&>();
+    return py::array_t<typename Model::spin_type>(lattice_buffer(sim), self);
+}
+
+// model.get_lattice(): (L, L) copy (one memcpy)
+template <class Model>
+py::array_t<typename Model::spin_type> lattice_copy(const Model& sim) {
+    using T = typename Model::spin_type;
+    const py::ssize_t L = sim.size();
+    py::array_t<T> out({L, L});
+    std::memcpy(out.mutable_data(), sim.get_lattice().data(), sizeof(T) * L * L);
+    return out;
+}
+
+// model.set_lattice(array_like): any (L, L) array or nested list. Read as int64 / float64 and
+// narrowed to the compact spin dtype, so out-of-range values raise instead of wrapping around.
+template <class Model>
+using wide_spin_t = std::conditional_t<std::is_floating_point<typename Model::spin_type>::value, double, std::int64_t>;
+
+template <class Model>
+void set_lattice_array(Model& sim, py::array_t<wide_spin_t<Model>, py::array::c_style | py::array::forcecast> values) {
+    const py::ssize_t L = sim.size();
+    if (values.ndim() != 2 || values.shape(0) != L || values.shape(1) != L) {
+        throw std::invalid_argument("Lattice size does not match model dimensions");
+    }
+    sim.load_lattice(narrow_lattice<typename Model::spin_type>(values.data(), static_cast<std::size_t>(L * L)).data());
+}
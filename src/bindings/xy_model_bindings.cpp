@@ -1,18 +1,77 @@
 #include "../include/xy_model.hpp"
+#include "numpy_bridge.hpp"
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
 namespace py = pybind11;
 
 PYBIND11_MODULE(xy, m) {
-    py::class_<XYModel>(m, "XYModel")
+    py::class_<XYModel>(m, "XYModel", py::buffer_protocol())
         .def(py::init<int, double, double>())
         .def("metropolis_update", static_cast<void (XYModel::*)()>(&XYModel::metropolis_update))
         .def("metropolis_update_deterministic", static_cast<bool (XYModel::*)(int, int)>(&XYModel::metropolis_update))
         .def("compute_energy", &XYModel::compute_energy)
         .def("compute_magnetization", &XYModel::compute_magnetization)
+        .def("current_energy", &XYModel::current_energy)
+        .def("current_magnetization", &XYModel::current_magnetization)
+        .def("refresh_observables", &XYModel::refresh_observables)
+        .def("set_check_observables", &XYModel::set_check_observables)
         .def("save_lattice", &XYModel::save_lattice)
-        .def("set_lattice", &XYModel::set_lattice)
+        .def_buffer(&lattice_buffer<XYModel>)
+        .def_property_readonly("lattice", &lattice_view<XYModel>)
+        .def("get_lattice", &lattice_copy<XYModel>)
+        .def("set_lattice", &set_lattice_array<XYModel>)
         .def("set_forced_angle", &XYModel::set_forced_angle)
-        .def("set_forced_random", &XYModel::set_forced_random);
+        .def("set_forced_random", &XYModel::set_forced_random)
+        .def("set_seed", &XYModel::set_seed, py::arg("seed"), py::arg("replica") = 0)
+        .def("randomize_lattice", &XYModel::randomize_lattice)
+        .def("save_checkpoint", [](const XYModel& self, const std::string& path, long step) {
+            save_checkpoint(path, "XY", self, step);
+        }, py::arg("path"), py::arg("step") = 0)
+        .def("load_checkpoint", [](XYModel& self, const std::string& path) {
+            return restore_checkpoint(self, path, "XY");
+        })
+        .def("metropolis_sweep", &XYModel::metropolis_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("checkerboard_sweep", &XYModel::checkerboard_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("sweep", &XYModel::sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_sweep_mode", [](XYModel& self, const std::string& mode) {
+            self.set_sweep_mode(parse_sweep_mode(mode));  // "random" | "checkerboard"
+        })
+        .def("set_threads", &XYModel::set_threads)
+        .def("equilibrate", &equilibrate_model<XYModel>, py::arg("min_sweeps") = 100, py::arg("max_sweeps") = 100000,
+             py::arg("cold_start") = false)
+        .def("benchmark", &benchmark_dict<XYModel>, py::arg("sweeps") = 2000, py::arg("warmup") = 100,
+             py::arg("repeats") = 3)
+        .def("memory_bytes", &XYModel::memory_bytes)
+        .def("run", &run_model<XYModel>, py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("measure") = true, py::arg("burnin") = 0, py::arg("lattice_every") = 0)
+        .def("anneal", &anneal_model<XYModel>, py::arg("temperatures"), py::arg("sweeps"), py::arg("thin") = 1,
+             py::arg("burnin") = 0, py::arg("anneal_burnin") = 500, py::arg("lattice_every") = 0)
+        .def("set_temperature", &XYModel::set_temperature)
+        .def("get_temperature", &XYModel::get_temperature)
+        .def("wolff_update", &XYModel::wolff_update, py::call_guard<py::gil_scoped_release>())
+        .def("wolff_sweep", &XYModel::wolff_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("swendsen_wang_sweep", &XYModel::swendsen_wang_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("set_algorithm", [](XYModel& self, const std::string& algorithm) {
+            self.set_algorithm(parse_algorithm(algorithm));  // "metropolis" | "wolff" | "sw"
+        })
+        // Vorschlagsbreite (2π = gleichverteilt), im Burn-in von run()/equilibrate() abgestimmt
+        .def("set_step_width", &XYModel::set_step_width)
+        .def("get_step_width", &XYModel::get_step_width)
+        .def("set_target_acceptance", &XYModel::set_target_acceptance)
+        .def("set_overrelaxation", &XYModel::set_overrelaxation)
+        .def("overrelaxation_sweep", &XYModel::overrelaxation_sweep, py::call_guard<py::gil_scoped_release>())
+        .def("acceptance_rate", &XYModel::acceptance_rate)
+        .def("acceptance_stats", [](const XYModel& self) {
+            return py::make_tuple(self.accepted_moves(), self.attempted_moves());
+        });
+
+    m.def("run_replicas", [](int L, double T, double J, int replicas, long sweeps,
+                             int thin, long burnin, int workers, long seed,
+                             const std::string& algorithm, const std::string& sweep_mode) {
+        return run_replicas_model<XYModel>([=] { return std::make_unique<XYModel>(L, T, J); },
+                                           algorithm, sweep_mode, replicas, sweeps, thin, burnin, workers, seed);
+    }, py::arg("L"), py::arg("T"), py::arg("J"), py::arg("replicas"), py::arg("sweeps"),
+       py::arg("thin") = 1, py::arg("burnin") = 0, py::arg("workers") = 0, py::arg("seed") = -1,
+       py::arg("algorithm") = "metropolis", py::arg("sweep_mode") = "random");
 }
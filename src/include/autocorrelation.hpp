@@ -0,0 +1,112 @@
+// autocorrelation.hpp
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+// Online estimate of the integrated autocorrelation time via a binning (blocking) tree.
+// Level k holds the means of consecutive blocks of 2^k values; a new value cascades up the
+// tree (amortised O(1) per add, O(log n) memory). The squared error of the mean at level k,
+// var_k / n_k, grows with the block size until the blocks are independent:
+//     tau_int = 1/2 * (var_k / n_k) / (var_0 / n_0)
+// taken at the deepest level that still has min_blocks blocks. Uncorrelated data gives 1/2.
+class BinningTau {
+public:
+    explicit BinningTau(long min_blocks = 64) : min_blocks(std::max(2L, min_blocks)) {}
+
+    void add(double x) {
+        for (std::size_t k = 0;; ++k) {
+            if (k == levels.size()) levels.emplace_back();
+            Level& level = levels[k];
+            level.sum += x;
+            level.sum2 += x * x;
+            ++level.count;
+            if (!level.has_pending) {
+                level.pending = x;
+                level.has_pending = true;
+                return;
+            }
+            x = 0.5 * (level.pending + x);
+            level.has_pending = false;
+        }
+    }
+
+    long count() const { return levels.empty() ? 0 : levels[0].count; }
+
+    double tau() const {
+        if (levels.empty() || levels[0].count < 2) return 0.5;
+        const double err0 = error2(levels[0]);
+        if (!(err0 > 0.0)) return 0.5;  // konstante Reihe (z.B. eingefrorener Grundzustand)
+        double tau = 0.5;
+        for (const Level& level : levels) {
+            if (level.count < min_blocks) break;
+            tau = 0.5 * error2(level) / err0;
+        }
+        return std::max(0.5, tau);
+    }
+
+private:
+    struct Level {
+        double sum = 0.0;
+        double sum2 = 0.0;
+        long count = 0;
+        double pending = 0.0;
+        bool has_pending = false;
+    };
+    long min_blocks;
+    std::vector<Level> levels;
+
+    static double error2(const Level& level) {
+        const double n = static_cast<double>(level.count);
+        const double mean = level.sum / n;
+        const double var = std::max(0.0, (level.sum2 / n - mean * mean) * n / (n - 1.0));
+        return var / n;
+    }
+};
+
+// Measurement spacing of one chain. observe() is called after every sweep with E and |M|;
+// tau_int of both is tracked in sweeps. Fixed: 'thin' sweeps per measurement. Adaptive
+// (mcmc --thin auto): after a pilot of 'pilot' sweeps the spacing follows the current
+// max(tau_E, tau_|M|), rounded up and clamped to [1, max_thin], so stored samples are about
+// one tau apart. max_sweeps > 0 bounds the sweeps of the measurement phase (pilot included):
+// with a growing spacing the chain then stores fewer samples instead of running longer.
+class Thinning {
+public:
+    explicit Thinning(int thin, bool adaptive = false, int max_thin = 1000, long max_sweeps = 0, long pilot = 256)
+        : current(std::max(1, thin)), is_adaptive(adaptive), max_thin(std::max(1, max_thin)),
+          budget(std::max(0L, max_sweeps)), pilot(adaptive ? std::max(0L, pilot) : 0) {}
+
+    void observe(double energy, double magnetization) {
+        tau_e.add(energy);
+        tau_m.add(std::abs(magnetization));
+    }
+
+    // spacing for the next measurement
+    int thin() {
+        if (is_adaptive) {
+            const double tau = std::max(tau_e.tau(), tau_m.tau());
+            current = static_cast<int>(std::min<double>(max_thin, std::max(1.0, std::ceil(tau))));
+        }
+        return current;
+    }
+
+    // n more sweeps stay within max_sweeps
+    bool fits(long n) const { return budget == 0 || sweeps() + n <= budget; }
+
+    bool adaptive() const { return is_adaptive; }
+    long pilot_sweeps() const { return budget > 0 ? std::min(pilot, budget) : pilot; }
+    long max_sweeps() const { return budget; }
+    long sweeps() const { return tau_e.count(); }
+    double tau_energy() const { return tau_e.tau(); }
+    double tau_magnetization() const { return tau_m.tau(); }
+
+private:
+    int current;
+    bool is_adaptive;
+    int max_thin;
+    long budget;
+    long pilot;
+    BinningTau tau_e;
+    BinningTau tau_m;
+};
@@ -0,0 +1,107 @@
+// benchmark.hpp
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <cstddef>
+#include <vector>
+
+#if defined(__unix__) || defined(__APPLE__)
+#include <sys/resource.h>
+#endif
+
+#include "autocorrelation.hpp"
+#include "simulation.hpp"
+
+// Throughput of one configured model (mcmc --bench, Model.benchmark() in the bindings,
+// baselines: mcmc_tools.sim.benchmark). The kernel is timed as it runs in the measurement
+// phase: 'warmup' sweeps inside a BurninScope (XY width tuning, Wolff cluster-size estimate),
+// untimed sweeps until at least spin_up_seconds have passed (caches, CPU clock), then 'repeats'
+// blocks of sweeps / repeats sweeps each; the fastest block counts, which filters out short
+// interference from other processes. Cluster algorithms are timed per
+// sweep-equivalent (~L*L flipped spins), so updates_per_sec compares across algorithms.
+struct BenchResult {
+    long sweeps = 0;               // timed sweeps (all blocks)
+    double seconds = 0.0;          // wall time of all blocks
+    double sweeps_per_sec = 0.0;   // fastest block
+    double updates_per_sec = 0.0;  // sweeps_per_sec * L*L
+    double measure_ns = 0.0;       // one measurement as in run_measurements: E, M and the tau_int estimators
+    double snapshot_us = 0.0;      // one lattice snapshot (get_lattice() copied out, as record_samples)
+    std::size_t memory_bytes = 0;  // Model::memory_bytes() after the timed sweeps
+    long peak_rss_kb = -1;         // peak resident set of the process (-1: not available)
+};
+
+// Seconds per call of f(): calls are doubled until one batch takes at least min_seconds; the
+// fastest of 'repeats' such batches counts.
+template <class F>
+double seconds_per_call(F f, int repeats, double min_seconds = 0.02) {
+    using clock = std::chrono::steady_clock;
+    long n = 1;
+    double best = 0.0;
+    for (int r = 0; r < repeats;) {
+        const auto start = clock::now();
+        for (long k = 0; k < n; ++k) f();
+        const double elapsed = std::chrono::duration<double>(clock::now() - start).count();
+        if (elapsed < min_seconds && n < (1L << 30)) {
+            n *= 2;
+            continue;
+        }
+        const double per_call = elapsed / static_cast<double>(n);
+        if (r++ == 0 || per_call < best) best = per_call;
+    }
+    return best;
+}
+
+inline long peak_rss_kb() {
+#if defined(__unix__) || defined(__APPLE__)
+    rusage usage{};
+    if (getrusage(RUSAGE_SELF, &usage) != 0) return -1;
+#if defined(__APPLE__)
+    return static_cast<long>(usage.ru_maxrss / 1024);  // bytes on macOS
+#else
+    return static_cast<long>(usage.ru_maxrss);         // kilobytes on Linux
+#endif
+#else
+    return -1;
+#endif
+}
+
+template <class Model>
+BenchResult benchmark_model(Model& sim, long sweeps, long warmup = 100, int repeats = 3,
+                            double spin_up_seconds = 0.05) {
+    using clock = std::chrono::steady_clock;
+    repeats = std::max(1, repeats);
+    const long block = std::max(1L, (sweeps + repeats - 1) / repeats);
+    BenchResult out;
+    const auto warmup_start = clock::now();
+    {
+        BurninScope<Model> scope(sim);
+        for (long s = 0; s < warmup; ++s) sim.sweep();
+    }
+    while (std::chrono::duration<double>(clock::now() - warmup_start).count() < spin_up_seconds) sim.sweep();
+
+    double best = 0.0;
+    for (int r = 0; r < repeats; ++r) {
+        const auto start = clock::now();
+        for (long s = 0; s < block; ++s) sim.sweep();
+        const double elapsed = std::chrono::duration<double>(clock::now() - start).count();
+        out.seconds += elapsed;
+        if (r == 0 || elapsed < best) best = elapsed;
+    }
+    out.sweeps = block * repeats;
+    out.sweeps_per_sec = best > 0.0 ? static_cast<double>(block) / best : 0.0;
+    out.updates_per_sec = out.sweeps_per_sec * sim.size() * sim.size();
+
+    Thinning thinning(1);
+    out.measure_ns = 1e9 * seconds_per_call([&] { thinning.observe(sim.current_energy(), sim.current_magnetization()); },
+                                            repeats);
+    std::vector<typename Model::spin_type> snapshot;
+    out.snapshot_us = 1e6 * seconds_per_call([&] {
+        const auto& lat = sim.get_lattice();
+        snapshot.assign(lat.begin(), lat.end());
+    }, repeats);
+
+    out.memory_bytes = sim.memory_bytes();
+    out.peak_rss_kb = peak_rss_kb();
+    return out;
+}
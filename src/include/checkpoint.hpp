@@ -0,0 +1,150 @@
+// checkpoint.hpp
+#pragma once
+
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <iomanip>
+#include <iterator>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+#include "lattice_utils.hpp"
+#include "output_writer.hpp"
+
+// Checkpoint file (mcmc --checkpoint-out / --resume-from, Model.save_checkpoint / load_checkpoint):
+//   32 byte MCMC header (see output_writer.hpp) with kind 'C', the spin dtype, count 1, dim L
+//   | L*L spins, row-major, little-endian
+//   | text trailer, one "key=value" per line: model, T, step, rng (optional)
+// Without rng the file is a pure warm start (e.g. an equilibrated lattice from the database,
+// written by mcmc_tools.sim.checkpoint): the model keeps its own RNG streams then.
+struct Checkpoint {
+    std::string model;
+    int L = 0;
+    double T = 0.0;
+    long step = 0;               // measurements recorded before the checkpoint
+    char dtype = 0;              // 'i' / 'u' / 'f'
+    int itemsize = 0;
+    std::vector<char> lattice;   // raw spins, L*L*itemsize bytes
+    std::string rng;             // engines_to_string(), empty for warm starts
+};
+
+// Written to path + ".tmp" first and renamed, so an interrupted run never leaves a torn file.
+template <class Model>
+void save_checkpoint(const std::string& path, const std::string& model, const Model& sim, long step) {
+    using T = typename Model::spin_type;
+    const std::string tmp = path + ".tmp";
+    {
+        std::ofstream out = output_detail::open_binary(tmp);
+        output_detail::write_bin_header(out, 'C', output_detail::dtype_kind<T>(),
+                                        static_cast<std::uint8_t>(sizeof(T)), 1,
+                                        static_cast<std::uint32_t>(sim.size()));
+        const auto& lattice = sim.get_lattice();
+        out.write(reinterpret_cast<const char*>(lattice.data()),
+                  static_cast<std::streamsize>(lattice.size() * sizeof(T)));
+        out << "model=" << model << "\n"
+            << "T=" << std::setprecision(17) << sim.get_temperature() << "\n"
+            << "step=" << step << "\n"
+            << "rng=" << sim.rng_state() << "\n";
+        if (!out) throw std::runtime_error("Cannot write checkpoint: " + tmp);
+    }
+    if (std::rename(tmp.c_str(), path.c_str()) != 0) {
+        throw std::runtime_error("Cannot move checkpoint to " + path);
+    }
+}
+
+inline Checkpoint load_checkpoint(const std::string& path) {
+    std::ifstream in(path, std::ios::binary);
+    if (!in) throw std::runtime_error("Cannot open checkpoint: " + path);
+    const std::string raw((std::istreambuf_iterator<char>(in)), std::istreambuf_iterator<char>());
+
+    if (raw.size() < output_detail::kBinHeaderSize || raw.compare(0, 4, "MCMC") != 0 || raw[5] != 'C') {
+        throw std::invalid_argument("Not an MCMC checkpoint: " + path);
+    }
+    if (raw[4] != 1) throw std::invalid_argument("Unsupported checkpoint version: " + path);
+
+    Checkpoint cp;
+    cp.dtype = raw[6];
+    cp.itemsize = static_cast<unsigned char>(raw[7]);
+    std::uint32_t dim;
+    std::memcpy(&dim, raw.data() + 16, sizeof(dim));
+    cp.L = static_cast<int>(dim);
+
+    const std::size_t n_bytes = static_cast<std::size_t>(cp.L) * cp.L * cp.itemsize;
+    if (raw.size() < output_detail::kBinHeaderSize + n_bytes) {
+        throw std::invalid_argument("Truncated checkpoint: " + path);
+    }
+    const char* lattice = raw.data() + output_detail::kBinHeaderSize;
+    cp.lattice.assign(lattice, lattice + n_bytes);
+
+    std::istringstream trailer(raw.substr(output_detail::kBinHeaderSize + n_bytes));
+    std::string line;
+    while (std::getline(trailer, line)) {
+        const auto eq = line.find('=');
+        if (eq == std::string::npos) continue;
+        const std::string key = line.substr(0, eq);
+        const std::string value = line.substr(eq + 1);
+        if (key == "model") cp.model = value;
+        else if (key == "T") cp.T = std::stod(value);
+        else if (key == "step") cp.step = std::stol(value);
+        else if (key == "rng") cp.rng = value;
+    }
+    if (cp.model.empty()) throw std::invalid_argument("Checkpoint without model: " + path);
+    return cp;
+}
+
+// Raw checkpoint spins → lattice element type of the model. Checkpoints with a different
+// width of the same kind (e.g. int32 spins or float64 angles written before the compact
+// lattices, or by mcmc_tools.sim.checkpoint) are converted; integer and float lattices never mix.
+template <typename T>
+std::vector<T> checkpoint_values(const Checkpoint& cp) {
+    if ((cp.dtype == 'f') != std::is_floating_point<T>::value) {
+        throw std::invalid_argument("Checkpoint spin type does not match the model");
+    }
+    const std::size_t n = static_cast<std::size_t>(cp.L) * cp.L;
+    auto convert = [&](auto tag) {
+        using U = decltype(tag);
+        if (cp.itemsize != static_cast<int>(sizeof(U))) throw std::invalid_argument("Unsupported checkpoint spin type");
+        std::vector<U> raw(n);
+        std::memcpy(raw.data(), cp.lattice.data(), n * sizeof(U));
+        return narrow_lattice<T>(raw.data(), n);
+    };
+    switch (cp.dtype) {
+        case 'f':
+            return cp.itemsize == 4 ? convert(float()) : convert(double());
+        case 'u':
+            switch (cp.itemsize) {
+                case 1: return convert(std::uint8_t());
+                case 2: return convert(std::uint16_t());
+                case 4: return convert(std::uint32_t());
+                default: return convert(std::uint64_t());
+            }
+        case 'i':
+            switch (cp.itemsize) {
+                case 1: return convert(std::int8_t());
+                case 2: return convert(std::int16_t());
+                case 4: return convert(std::int32_t());
+                default: return convert(std::int64_t());
+            }
+        default:
+            throw std::invalid_argument("Unsupported checkpoint spin type");
+    }
+}
+
+// Loads lattice and (if stored) RNG state into sim. The temperature is left to the caller:
+// a checkpoint may warm-start a run at a neighbouring temperature.
+template <class Model>
+void apply_checkpoint(Model& sim, const Checkpoint& cp) {
+    using T = typename Model::spin_type;
+    if (cp.L != sim.size()) {
+        throw std::invalid_argument("Checkpoint lattice size " + std::to_string(cp.L)
+                                    + " does not match L=" + std::to_string(sim.size()));
+    }
+    const std::vector<T> values = checkpoint_values<T>(cp);
+    sim.load_lattice(values.data());
+    if (!cp.rng.empty()) sim.set_rng_state(cp.rng);
+}
@@ -1,22 +1,60 @@
 // clock_model.hpp
 #pragma once
 
+#include <cstdint>
 #include <vector>
-#include <random>
+#include <string>
+
+#include "lattice_utils.hpp"
+#include "cluster_updates.hpp"
+#include "rng.hpp"
 
 class ClockModel {
 public:
+    using spin_type = clock_state_t;       // uint8 by default → M <= 256 (lattice_utils.hpp)
+
     ClockModel(int L, int M, double T, double J);
 
     void metropolis_update();
     double compute_energy() const;
     double compute_magnetization() const;
+    double current_energy() const;         // tracked total E, O(1)
+    double current_magnetization() const;  // tracked |M|, O(1)
+    void refresh_observables();            // revalidate the lattice, recompute caches and tracked values
+    void set_check_observables(bool on) { check_observables = on; }  // debug cross-check
     void save_lattice(const std::string& filename) const;
+    const std::vector<spin_type>& get_lattice() const { return lattice; }  // flat, row-major
     void set_lattice(const std::vector<std::vector<int>>& new_lattice);    
+    void load_lattice(const spin_type* values);  // L*L values, row-major (bulk copy, validated)
+    spin_type* lattice_data() { return lattice.data(); }  // raw view; call refresh_observables() after writes
     void set_forced_state(int s) { forced_state = s; };
     void set_forced_random(double r) { forced_random = r; };
     bool metropolis_update_deterministic(int i, int j);
     void metropolis_sweep();     
+    void checkerboard_sweep();
+    void heat_bath_sweep();                // heat-bath updates of all sites (random or checkerboard order)
+    void sweep();                          // one sweep in the configured sweep mode
+    void set_sweep_mode(SweepMode mode) { sweep_mode = mode; }
+    void set_threads(int n);               // threads for checkerboard_sweep (OpenMP)
+    int wolff_update();                    // one Wolff cluster, returns its size
+    void wolff_sweep();                    // Wolff clusters flipping ~L*L spins on average
+    int swendsen_wang_sweep();             // returns the number of clusters
+    void set_algorithm(Algorithm a) { algorithm = a; }
+    void set_burnin(bool) {}               // no tunable proposals (see BurninScope)
+    void set_seed(std::uint64_t seed, int replica = 0);  // stream (seed, replica), see rng.hpp
+    void randomize_lattice();              // random start configuration from the current stream
+    std::string rng_state() const { return engines_to_string(gen, thread_gens); }  // checkpoints
+    void set_rng_state(const std::string& state) {
+        if (!engines_from_string(state, gen, thread_gens)) set_threads(n_threads);  // other thread count
+    }
+    int size() const { return L; }
+    std::size_t memory_bytes() const {     // model object + heap (lattice, tables, workspaces)
+        return sizeof(*this) + heap_bytes(lattice, nbr, cos_table, sin_table, heat_bath_weight, mirror_proj,
+                                          thread_gens, rand_sites, rand_shift, rand_accept)
+               + cluster_ws.memory_bytes();
+    }
+    void set_temperature(double new_T);    // also rebuilds the heat-bath weights
+    double get_temperature() const { return T; }
 
     
 private:
@@ -26,13 +64,37 @@ private:
     int M;                                 // Number of clock states (e.g. 6)
     double T;                              // Temperature
     double J;                              // Coupling constant
-    std::vector<std::vector<int>> lattice; // Lattice values: m_i in [0, M-1]
+    std::vector<spin_type> lattice;        // Lattice values: m_i in [0, M-1], flat (i * L + j)
+    std::vector<int> nbr;                  // Neighbour table (see lattice_utils.hpp)
+    std::vector<double> cos_table;         // cos(2π d / M), d = (m1 - m2) mod M
+    std::vector<double> sin_table;         // sin(2π d / M)
+    // Heat-bath: P(m) ∝ exp(J/T Σ_k cos(2π (m - n_k) / M)) = Π_k w[(m - n_k) mod M] with
+    // w[d] = exp(J/T (cos(2π d / M) - 1)); stored twice (index m - n_k + M) to avoid the modulo
+    std::vector<double> heat_bath_weight;
+    SweepMode sweep_mode = SweepMode::Random;
+    Algorithm algorithm = Algorithm::Metropolis;
+    ClusterWorkspace cluster_ws;
+    std::vector<double> mirror_proj;       // projection of each state for the current mirror
+    int n_threads = 1;
+    Observables obs;                       // running E and (Mx, My) (see lattice_utils.hpp)
+    bool check_observables = false;
 
-    std::mt19937 gen;
-    std::uniform_int_distribution<int> dist_site;  // For i, j
-    std::uniform_real_distribution<double> dist_real; // For r in [0,1)
+    Rng gen;                               // RNG engine (rng.hpp)
+    std::vector<Rng> thread_gens;          // one engine per extra checkerboard thread
+    std::vector<std::uint32_t> rand_sites; // random sweep: sites, proposal shifts and
+    std::vector<std::uint32_t> rand_shift; // acceptance numbers, drawn in bulk once per sweep
+    std::vector<double> rand_accept;
 
     void init_lattice();
-    double spin_dot(int m1, int m2) const;
+    double spin_dot(int m1, int m2) const {
+        const int d = m1 - m2;
+        return cos_table[d < 0 ? d + M : d];
+    }
+    // shift in [0, M-2] selects the proposal (old + 1 + shift) mod M, r the acceptance test
+    void update_site(int s, int shift, double r, Observables& delta);
+    void set_state(int s, int new_state, Observables& delta);
+    void build_heat_bath_table();
+    int heat_bath_state(int s, double u) const;  // u uniform in [0, 1)
+    void heat_bath_site(int s, double u, Observables& delta);
+    int draw_mirror();
 };
-
@@ -0,0 +1,162 @@
+// cluster_updates.hpp
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <initializer_list>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include "lattice_utils.hpp"
+#include "rng.hpp"
+
+// Update algorithm of one sweep:
+//   metropolis : single-spin Metropolis (site order from SweepMode)
+//   wolff      : Wolff single-cluster updates, ~N flipped spins per sweep on average
+//   sw         : Swendsen-Wang, every site belongs to exactly one cluster per sweep
+//   heatbath   : single-site heat-bath, new state drawn from its conditional distribution
+//                (Clock model only; site order from SweepMode)
+enum class Algorithm { Metropolis, Wolff, SwendsenWang, HeatBath };
+
+inline Algorithm parse_algorithm(const std::string& s) {
+    if (s == "metropolis") return Algorithm::Metropolis;
+    if (s == "wolff") return Algorithm::Wolff;
+    if (s == "sw") return Algorithm::SwendsenWang;
+    if (s == "heatbath") return Algorithm::HeatBath;
+    throw std::invalid_argument("Unknown algorithm: " + s + " (expected metropolis|wolff|sw|heatbath)");
+}
+
+inline const char* algorithm_name(Algorithm a) {
+    switch (a) {
+        case Algorithm::Wolff:        return "wolff";
+        case Algorithm::SwendsenWang: return "sw";
+        case Algorithm::HeatBath:     return "heatbath";
+        default:                      return "metropolis";
+    }
+}
+
+// Embedded-Ising cluster moves (Wolff 1989). Every spin is projected onto an axis r,
+// p_i = s_i . r (Ising: p_i = s_i). A bond (i, j) is activated with probability
+//     P = 1 - exp(min(0, -2 beta J p_i p_j)),
+// and flipping a cluster reflects its spins at the plane perpendicular to r (Ising: s -> -s).
+// The models supply p_i via `proj(site)` and the reflection via `reflect(site)`.
+
+// Scratch buffers, allocated once per model so the updates themselves never allocate.
+struct ClusterWorkspace {
+    std::vector<int> stack;
+    std::vector<int> members;
+    std::vector<int> parent;
+    std::vector<double> proj;
+    std::vector<char> mark;
+
+    // Running mean Wolff cluster size → number of clusters per sweep. Stopping a sweep once
+    // N spins have been flipped would make the measurement time depend on the current
+    // configuration and bias the averages; a count fixed in advance does not.
+    double flipped_total = 0.0;
+    double cluster_count = 0.0;
+
+    int clusters_per_sweep(int n_sites) const {
+        if (cluster_count == 0.0) return 1;
+        const double mean_size = flipped_total / cluster_count;
+        return std::max(1, static_cast<int>(std::lround(n_sites / mean_size)));
+    }
+
+    void record_clusters(int n_clusters, int flipped) {
+        cluster_count += n_clusters;
+        flipped_total += flipped;
+    }
+
+    std::size_t memory_bytes() const { return heap_bytes(stack, members, parent, proj, mark); }
+
+    void resize(int n_sites) {
+        stack.reserve(n_sites);
+        members.reserve(n_sites);
+        parent.resize(n_sites);
+        proj.resize(n_sites);
+        mark.assign(n_sites, 0);
+    }
+
+    int find(int x) {
+        while (parent[x] != x) {
+            parent[x] = parent[parent[x]];  // path halving
+            x = parent[x];
+        }
+        return x;
+    }
+
+    void unite(int a, int b) {
+        a = find(a);
+        b = find(b);
+        if (a != b) parent[a] = b;
+    }
+};
+
+// Grows and flips one Wolff cluster from a random seed site; returns the cluster size.
+template <class Proj, class Reflect>
+int wolff_cluster(ClusterWorkspace& ws, const std::vector<int>& nbr, int n_sites,
+                  double beta_J, Proj proj, Reflect reflect, Rng& rng) {
+    const int seed = static_cast<int>(uniform_index(rng, static_cast<std::uint32_t>(n_sites)));
+
+    ws.stack.clear();
+    ws.members.clear();
+    ws.mark[seed] = 1;
+    ws.stack.push_back(seed);
+    ws.members.push_back(seed);
+
+    while (!ws.stack.empty()) {
+        const int i = ws.stack.back();
+        ws.stack.pop_back();
+        const double pi = proj(i);
+        for (int k = 0; k < 4; ++k) {
+            const int j = nbr[4 * i + k];
+            if (ws.mark[j]) continue;
+            const double x = 2.0 * beta_J * pi * proj(j);
+            if (x <= 0.0) continue;  // anti-aligned along r → bond never active
+            if (uniform01(rng) < 1.0 - std::exp(-x)) {
+                ws.mark[j] = 1;
+                ws.stack.push_back(j);
+                ws.members.push_back(j);
+            }
+        }
+    }
+
+    // Flip only after growth: bond probabilities use the projections before the move
+    for (int s : ws.members) {
+        reflect(s);
+        ws.mark[s] = 0;
+    }
+    return static_cast<int>(ws.members.size());
+}
+
+// One Swendsen-Wang sweep: activate bonds (right/down), label clusters with union-find,
+// flip each cluster with probability 1/2. Returns the number of clusters.
+template <class Proj, class Reflect>
+int swendsen_wang_step(ClusterWorkspace& ws, const std::vector<int>& nbr, int n_sites,
+                       double beta_J, Proj proj, Reflect reflect, Rng& rng) {
+
+    for (int s = 0; s < n_sites; ++s) {
+        ws.parent[s] = s;
+        ws.proj[s] = proj(s);
+    }
+    for (int s = 0; s < n_sites; ++s) {
+        for (int k : {1, 3}) {  // down, right → every bond exactly once
+            const int j = nbr[4 * s + k];
+            const double x = 2.0 * beta_J * ws.proj[s] * ws.proj[j];
+            if (x > 0.0 && uniform01(rng) < 1.0 - std::exp(-x)) ws.unite(s, j);
+        }
+    }
+
+    // mark[root]: 0 = undecided, 1 = keep, 2 = flip
+    int clusters = 0;
+    for (int s = 0; s < n_sites; ++s) {
+        const int r = ws.find(s);
+        if (ws.mark[r] == 0) {
+            ws.mark[r] = uniform01(rng) < 0.5 ? 2 : 1;
+            ++clusters;
+        }
+        if (ws.mark[r] == 2) reflect(s);
+    }
+    std::fill(ws.mark.begin(), ws.mark.end(), 0);
+    return clusters;
+}
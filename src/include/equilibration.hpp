@@ -0,0 +1,145 @@
+// equilibration.hpp
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+#include "simulation.hpp"
+
+// Adaptive burn-in on energy series (one value per sweep and series).
+// Drift test per series: at a check after n sweeps the window A = [n/4, n/2) is compared
+// with B = [n/2, n) (everything before n/4 is treated as transient). Means and standard
+// errors come from 'batches' batch means per window, which absorb the autocorrelation:
+//     |mean(A) - mean(B)| <= z * sqrt(se(A)^2 + se(B)^2)
+// With several series (hot and cold start, equilibrate(..., cold_start = true)) the B-window
+// means of all series must additionally agree with series 0 within the same tolerance. A drift
+// test alone cannot see metastable states (e.g. Ising stripes below T_c); two different starts
+// that have not met yet can.
+// Checks happen every ~5 % of the sweeps done (amortised O(1) per sweep); the burn-in ends
+// at the first passing check after min_sweeps, or at max_sweeps.
+class EquilibrationMonitor {
+public:
+    EquilibrationMonitor(long min_sweeps, long max_sweeps, int n_series = 1, double z = 2.0, int batches = 5)
+        : min_sweeps(std::max(1L, min_sweeps)), max_sweeps(std::max(this->min_sweeps, max_sweeps)),
+          z(z), batches(std::max(2, batches)), series(std::max(1, n_series)) {}
+
+    void add(double energy) {
+        add(0, energy);
+        step();
+    }
+
+    // several series: add(k, e) for every series, then step()
+    void add(int k, double energy) { series[k].push_back(energy); }
+
+    void step() {
+        const long n = sweeps();
+        if (n >= max_sweeps) {
+            finished = true;
+        } else if (n >= min_sweeps && n >= next_check) {
+            is_stationary = test_stationary();
+            finished = is_stationary;
+            next_check = n + std::max(10L, n / 20);
+        }
+    }
+
+    bool done() const { return finished; }
+    bool stationary() const { return is_stationary; }  // false if stopped by max_sweeps
+    long sweeps() const { return static_cast<long>(series[0].size()); }
+
+private:
+    long min_sweeps;
+    long max_sweeps;
+    double z;
+    int batches;
+    std::vector<std::vector<double>> series;
+    long next_check = 0;
+    bool finished = false;
+    bool is_stationary = false;
+
+    struct Window { double mean; double se; };
+
+    // mean and standard error from batch means of x[begin, end)
+    Window window(const std::vector<double>& x, std::size_t begin, std::size_t end) const {
+        const std::size_t b = (end - begin) / batches;
+        std::vector<double> means(batches, 0.0);
+        for (int k = 0; k < batches; ++k) {
+            for (std::size_t i = 0; i < b; ++i) means[k] += x[begin + k * b + i];
+            means[k] /= static_cast<double>(b);
+        }
+        double mean = 0.0;
+        for (double m : means) mean += m;
+        mean /= batches;
+        double var = 0.0;
+        for (double m : means) var += (m - mean) * (m - mean);
+        return {mean, std::sqrt(var / (batches - 1) / batches)};
+    }
+
+    bool agree(const Window& a, const Window& b) const {
+        // frozen series (e.g. ground state at low T): identical up to rounding
+        const double floor = 1e-12 * std::max(1.0, std::abs(b.mean));
+        return std::abs(a.mean - b.mean) <= z * std::sqrt(a.se * a.se + b.se * b.se) + floor;
+    }
+
+    bool test_stationary() const {
+        const std::size_t n = series[0].size();
+        if (n / 4 < static_cast<std::size_t>(batches)) return false;
+        std::vector<Window> last;
+        for (const auto& x : series) {
+            const Window a = window(x, n / 4, n / 2);
+            const Window b = window(x, n / 2, n);
+            if (!agree(a, b)) return false;
+            last.push_back(b);
+        }
+        for (std::size_t k = 1; k < last.size(); ++k) {
+            if (!agree(last[0], last[k])) return false;
+        }
+        return true;
+    }
+};
+
+struct EquilibrationResult {
+    long sweeps = 0;
+    bool stationary = false;
+};
+
+// Sweeps sim until its energy series is stationary (drift test, see EquilibrationMonitor).
+// cold_start (opt-in): a cold-start copy (every spin set to the value of site 0, same random
+// numbers) runs alongside and its series must agree with sim's; this also catches metastable
+// states, at twice the burn-in work. sim itself carries on into the measurement.
+// The chains run inside a BurninScope (proposal tuning, see simulation.hpp); on_sweep() after
+// every sweep of sim (progress).
+template <class Model, class OnSweep>
+EquilibrationResult equilibrate(Model& sim, long min_sweeps, long max_sweeps, bool cold_start, OnSweep on_sweep) {
+    if (!cold_start) {
+        BurninScope<Model> scope(sim);
+        EquilibrationMonitor monitor(min_sweeps, max_sweeps);
+        while (!monitor.done()) {
+            sim.sweep();
+            monitor.add(sim.current_energy());
+            on_sweep();
+        }
+        return {monitor.sweeps(), monitor.stationary()};
+    }
+
+    Model cold(sim);
+    std::vector<typename Model::spin_type> ordered(sim.get_lattice().size(), sim.get_lattice()[0]);
+    cold.load_lattice(ordered.data());
+
+    BurninScope<Model> scope(sim), cold_scope(cold);
+    EquilibrationMonitor monitor(min_sweeps, max_sweeps, 2);
+    while (!monitor.done()) {
+        sim.sweep();
+        cold.sweep();
+        monitor.add(0, sim.current_energy());
+        monitor.add(1, cold.current_energy());
+        monitor.step();
+        on_sweep();
+    }
+    return {monitor.sweeps(), monitor.stationary()};
+}
+
+template <class Model>
+EquilibrationResult equilibrate(Model& sim, long min_sweeps, long max_sweeps, bool cold_start = false) {
+    return equilibrate(sim, min_sweeps, max_sweeps, cold_start, [] {});
+}
@@ -1,34 +1,83 @@
 // ising_model.hpp
 #pragma once
 
+#include <array>
+#include <cstdint>
 #include <vector>
-#include <random>
+#include <string>
+
+#include "lattice_utils.hpp"
+#include "cluster_updates.hpp"
+#include "rng.hpp"
 
 class IsingModel {
 public:
+    using spin_type = ising_spin_t;        // int8 by default (lattice_utils.hpp)
+
     IsingModel(int L, double T, double J);
 
     void metropolis_update();
     double compute_energy() const;
     double compute_magnetization() const;
+    double current_energy() const;         // tracked total E, O(1)
+    double current_magnetization() const;  // tracked total M, O(1)
+    void refresh_observables();            // revalidate the lattice, recompute caches and tracked values
+    void set_check_observables(bool on) { check_observables = on; }  // debug cross-check
     void save_lattice(const std::string& filename) const;
+    const std::vector<spin_type>& get_lattice() const { return lattice; }  // flat, row-major
     void set_lattice(const std::vector<std::vector<int>>& new_lattice);
-    void set_seed(unsigned int seed);
+    void load_lattice(const spin_type* values);  // L*L values, row-major (bulk copy, validated)
+    spin_type* lattice_data() { return lattice.data(); }  // raw view; call refresh_observables() after writes
+    void set_seed(std::uint64_t seed, int replica = 0);  // stream (seed, replica), see rng.hpp
+    void randomize_lattice();              // random start configuration from the current stream
+    std::string rng_state() const { return engines_to_string(gen, thread_gens); }  // checkpoints
+    void set_rng_state(const std::string& state) {
+        if (!engines_from_string(state, gen, thread_gens)) set_threads(n_threads);  // other thread count
+    }
     bool metropolis_update(int i, int j);
     void set_forced_random(double r);
     void metropolis_sweep();  
+    void checkerboard_sweep();
+    void sweep();                          // one sweep in the configured sweep mode
+    void set_sweep_mode(SweepMode mode) { sweep_mode = mode; }
+    void set_threads(int n);               // threads for checkerboard_sweep (OpenMP)
+    int wolff_update();                    // one Wolff cluster, returns its size
+    void wolff_sweep();                    // Wolff clusters flipping ~L*L spins on average
+    int swendsen_wang_sweep();             // returns the number of clusters
+    void set_algorithm(Algorithm a) {
+        if (a == Algorithm::HeatBath) throw std::invalid_argument("heat-bath updates are only available for the Clock model");
+        algorithm = a;
+    }
+    void set_burnin(bool) {}               // no tunable proposals (see BurninScope)
+    int size() const { return L; }
+    std::size_t memory_bytes() const {     // model object + heap (lattice, tables, workspaces)
+        return sizeof(*this) + heap_bytes(lattice, nbr, thread_gens, rand_sites, rand_accept) + cluster_ws.memory_bytes();
+    }
+    void set_temperature(double T);        // also rebuilds the acceptance table
+    double get_temperature() const { return T; }
 
 private:
     int L;                                 // Lattice size (LxL)
     double T;                              // Temperature
     double J;                              // Coupling constant
-    std::vector<std::vector<int>> lattice; // Spin lattice: -1 or +1
+    std::vector<spin_type> lattice;        // Spin lattice: -1 or +1, flat (i * L + j)
+    std::vector<int> nbr;                  // Neighbour table (see lattice_utils.hpp)
+    std::array<double, 5> accept_prob{};   // exp(-dE/T) for s * neighbour_sum = -4, -2, 0, 2, 4
     double forced_random = -1.0;  // default: deaktiviert
+    SweepMode sweep_mode = SweepMode::Random;
+    Algorithm algorithm = Algorithm::Metropolis;
+    ClusterWorkspace cluster_ws;
+    int n_threads = 1;
+    Observables obs;                       // running E and M (see lattice_utils.hpp)
+    bool check_observables = false;
 
-    std::mt19937 gen;                     // RNG engine
-    std::uniform_int_distribution<int> dist_int;     // Site index dist
-    std::uniform_real_distribution<double> dist_real; // [0, 1) dist
+    Rng gen;                               // RNG engine (rng.hpp)
+    std::vector<Rng> thread_gens;          // one engine per extra checkerboard thread
+    std::vector<std::uint32_t> rand_sites; // random sweep: sites and acceptance numbers,
+    std::vector<double> rand_accept;       // drawn in bulk once per sweep
 
     void init_lattice();
+    void build_acceptance_table();
+    void update_site(int s, double r, Observables& delta);  // r: uniform [0, 1) for the acceptance test
+    void flip_spin(int s, Observables& delta);
 };
-
@@ -0,0 +1,194 @@
+// lattice_utils.hpp
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <limits>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+// Flat, row-major LxL lattice: site s = i * L + j.
+// Neighbour table with periodic boundaries: nbr[4*s + k], k = 0 up, 1 down, 2 left, 3 right.
+inline std::vector<int> build_neighbor_table(int L) {
+    std::vector<int> nbr(4 * static_cast<std::size_t>(L) * L);
+    for (int i = 0; i < L; ++i) {
+        for (int j = 0; j < L; ++j) {
+            const int s = i * L + j;
+            nbr[4 * s + 0] = ((i - 1 + L) % L) * L + j;
+            nbr[4 * s + 1] = ((i + 1) % L) * L + j;
+            nbr[4 * s + 2] = i * L + (j - 1 + L) % L;
+            nbr[4 * s + 3] = i * L + (j + 1) % L;
+        }
+    }
+    return nbr;
+}
+
+// Element types of the flat lattices: 1 byte per Ising spin (±1) and per Clock state
+// (0..M-1, M <= 256), float32 angles for XY. Snapshots, checkpoints and the NumPy views use
+// the same type; wider storage is a compile flag away, e.g. -DMCMC_ANGLE_TYPE=double.
+#ifndef MCMC_SPIN_TYPE
+#define MCMC_SPIN_TYPE std::int8_t
+#endif
+#ifndef MCMC_CLOCK_STATE_TYPE
+#define MCMC_CLOCK_STATE_TYPE std::uint8_t
+#endif
+#ifndef MCMC_ANGLE_TYPE
+#define MCMC_ANGLE_TYPE float
+#endif
+using ising_spin_t = MCMC_SPIN_TYPE;
+using clock_state_t = MCMC_CLOCK_STATE_TYPE;
+using xy_angle_t = MCMC_ANGLE_TYPE;
+
+// Heap memory held by vectors (capacity), for the models' memory_bytes() (mcmc --bench).
+template <typename... Vectors>
+std::size_t heap_bytes(const Vectors&... v) {
+    return (std::size_t(0) + ... + (v.capacity() * sizeof(typename Vectors::value_type)));
+}
+
+// n wide values (nested C++ input, NumPy int64/float64, older checkpoints) → lattice element
+// type. Integers that do not fit are rejected instead of wrapping around; floats are rounded.
+template <typename T, typename U>
+std::vector<T> narrow_lattice(const U* values, std::size_t n) {
+    std::vector<T> out(n);
+    for (std::size_t k = 0; k < n; ++k) {
+        if constexpr (std::is_integral<T>::value) {
+            const double v = static_cast<double>(values[k]);
+            if (!(v >= static_cast<double>(std::numeric_limits<T>::min())
+                  && v <= static_cast<double>(std::numeric_limits<T>::max()))) {
+                throw std::invalid_argument("Lattice value " + std::to_string(v) + " does not fit the "
+                                            + std::to_string(8 * sizeof(T)) + "-bit lattice type");
+            }
+        }
+        out[k] = static_cast<T>(values[k]);
+    }
+    return out;
+}
+
+// Nested LxL input (Python list of lists, C++ API) → flat row-major copy.
+template <typename T>
+std::vector<T> flatten_lattice(const std::vector<std::vector<T>>& nested, int L) {
+    if (static_cast<int>(nested.size()) != L) {
+        throw std::invalid_argument("Lattice size does not match model dimensions");
+    }
+    std::vector<T> flat;
+    flat.reserve(static_cast<std::size_t>(L) * L);
+    for (const auto& row : nested) {
+        if (static_cast<int>(row.size()) != L) {
+            throw std::invalid_argument("Lattice size does not match model dimensions");
+        }
+        flat.insert(flat.end(), row.begin(), row.end());
+    }
+    return flat;
+}
+
+// Site order of one sweep:
+//   random       : L*L Metropolis proposals at random sites (original scheme)
+//   checkerboard : even sublattice, then odd sublattice; rows can be split across threads
+enum class SweepMode { Random, Checkerboard };
+
+inline SweepMode parse_sweep_mode(const std::string& s) {
+    if (s == "random") return SweepMode::Random;
+    if (s == "checkerboard") return SweepMode::Checkerboard;
+    throw std::invalid_argument("Unknown sweep mode: " + s + " (expected random|checkerboard)");
+}
+
+inline const char* sweep_mode_name(SweepMode m) {
+    return m == SweepMode::Checkerboard ? "checkerboard" : "random";
+}
+
+inline int current_thread_id() {
+#ifdef _OPENMP
+    return omp_get_thread_num();
+#else
+    return 0;
+#endif
+}
+
+// Sites of one colour never touch each other only if L is even (periodic wrap);
+// for odd L the checkerboard sweep stays valid but must run sequentially.
+inline int checkerboard_threads(int requested, int L) {
+#ifdef _OPENMP
+    return (requested > 1 && L % 2 == 0) ? requested : 1;
+#else
+    (void)requested; (void)L;
+    return 1;
+#endif
+}
+
+// Running totals of the observables, updated with every accepted move so that
+// measurements cost O(1) instead of a full lattice traversal.
+// Ising: mx = sum of spins, my = 0; Clock/XY: (mx, my) = sum of spin vectors.
+struct Observables {
+    double energy = 0.0;
+    double mx = 0.0;
+    double my = 0.0;
+
+    Observables& operator+=(const Observables& o) {
+        energy += o.energy;
+        mx += o.mx;
+        my += o.my;
+        return *this;
+    }
+};
+
+#pragma omp declare reduction(+ : Observables : omp_out += omp_in)
+
+// Debug cross-check of a tracked observable against a full recomputation.
+// Rounding drift of the running sums stays far below the tolerance.
+inline void check_tracked_observable(const char* name, double tracked, double exact, int n_sites) {
+    if (std::abs(tracked - exact) > 1e-8 * n_sites) {
+        throw std::runtime_error(std::string("Tracked ") + name + " " + std::to_string(tracked)
+                                 + " differs from recomputed value " + std::to_string(exact));
+    }
+}
+
+// RNG state as text (checkpoints): the main engine, then one entry per checkerboard
+// thread engine, '|'-separated (stream format of the engine, see rng.hpp).
+template <class Engine>
+std::string engines_to_string(const Engine& gen, const std::vector<Engine>& thread_gens) {
+    std::ostringstream out;
+    out << gen;
+    for (const auto& g : thread_gens) out << '|' << g;
+    return out.str();
+}
+
+// Restores the engines from engines_to_string(). Returns false if the stored thread
+// count differs from thread_gens.size(); the thread engines are left untouched then.
+template <class Engine>
+bool engines_from_string(const std::string& state, Engine& gen, std::vector<Engine>& thread_gens) {
+    std::vector<Engine> engines;
+    std::stringstream ss(state);
+    std::string item;
+    while (std::getline(ss, item, '|')) {
+        std::istringstream in(item);
+        Engine g;
+        if (!(in >> g)) throw std::invalid_argument("Invalid RNG state in checkpoint");
+        engines.push_back(g);
+    }
+    if (engines.empty()) throw std::invalid_argument("Empty RNG state in checkpoint");
+    gen = engines[0];
+    if (engines.size() - 1 != thread_gens.size()) return false;
+    std::copy(engines.begin() + 1, engines.end(), thread_gens.begin());
+    return true;
+}
+
+// Checkerboard thread engines of a model: thread t (1..n-1) continues t jumps after the
+// main engine (rng.hpp), so the streams follow deterministically from (seed, replica, thread).
+template <class Engine>
+std::vector<Engine> split_thread_engines(const Engine& gen, int n_threads) {
+    std::vector<Engine> engines;
+    Engine g = gen;
+    for (int t = 1; t < n_threads; ++t) {
+        g.jump();
+        engines.push_back(g);
+    }
+    return engines;
+}
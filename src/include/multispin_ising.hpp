@@ -0,0 +1,79 @@
+// multispin_ising.hpp
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+#include "lattice_utils.hpp"
+#include "cluster_updates.hpp"
+#include "rng.hpp"
+
+// Multi-spin-coded Ising model (mcmc --sweep msc, ising.MultiSpinIsingModel): 64 spins per
+// 64-bit word, bit = 1 ↔ spin +1. Same observables, lattice format and checkpoints as
+// IsingModel, Metropolis with checkerboard sweeps only; L must be a multiple of 64.
+//
+// Packing: row i has W = L/64 words, bit b of word k holds column j = k + b*W. Horizontal
+// neighbours are then the adjacent words (at the row ends the first/last word rotated by one
+// bit), vertical neighbours the same word of rows i±1. The colour (i + j) % 2 of a bit is a
+// fixed mask per word, so one half-sweep updates all sites of a colour with bitwise logic:
+// a bit-sliced adder counts the anti-aligned neighbours m (0..4, dE = 2J(4 - 2m)), and each
+// spin with p(m) < 1 draws one uniform number bitwise, compared against its class threshold
+// from the top bit down (~log2(64) + 2 random words per 64 spins). E and M are recounted with
+// popcounts after every sweep.
+class MultiSpinIsingModel {
+public:
+    using spin_type = ising_spin_t;        // unpacked lattice type, as IsingModel
+
+    MultiSpinIsingModel(int L, double T, double J);
+
+    double compute_energy() const;
+    double compute_magnetization() const;
+    double current_energy() const;         // total E after the last sweep, O(1)
+    double current_magnetization() const;  // total M after the last sweep, O(1)
+    void refresh_observables();            // recompute the tracked values from the packed words
+    void set_check_observables(bool on) { check_observables = on; }  // debug cross-check
+    const std::vector<spin_type>& get_lattice() const;  // unpacked copy (flat, row-major, ±1)
+    void load_lattice(const spin_type* values);  // L*L values, row-major (validated, packed)
+    void set_seed(std::uint64_t seed, int replica = 0);  // stream (seed, replica), see rng.hpp
+    void randomize_lattice();              // random start configuration from the current stream
+    std::string rng_state() const { return engines_to_string(gen, thread_gens); }  // checkpoints
+    void set_rng_state(const std::string& state) {
+        if (!engines_from_string(state, gen, thread_gens)) set_threads(n_threads);  // other thread count
+    }
+    void sweep();                          // one checkerboard sweep of all L*L spins
+    void set_sweep_mode(SweepMode) {}      // always checkerboard
+    void set_threads(int n);               // threads over the rows of a colour (OpenMP)
+    void set_algorithm(Algorithm a);       // Metropolis only
+    void set_burnin(bool) {}               // no tunable proposals (see BurninScope)
+    int size() const { return L; }
+    std::size_t memory_bytes() const {     // model object + packed words (+ get_lattice() cache, neighbour copy once used)
+        return sizeof(*this) + heap_bytes(words, unpacked, thread_gens, frozen);
+    }
+    void set_temperature(double T);        // also rebuilds the acceptance table
+    double get_temperature() const { return T; }
+
+private:
+    int L;
+    int W;                                 // words per row (L / 64)
+    double T;
+    double J;
+    std::vector<std::uint64_t> words;      // L * W words, row i at [i * W, (i + 1) * W)
+    std::vector<std::uint64_t> frozen;     // copy of words for threaded half-sweeps (rows i±1 are read here)
+    std::array<std::uint64_t, 5> accept{}; // acceptance probability of m anti-aligned neighbours, * 2^64
+    std::array<bool, 5> always{};          // dE <= 0 → accept without random bits
+    std::array<int, 5> stochastic{};       // the other classes m
+    int n_stochastic = 0;
+    int n_threads = 1;
+    Observables obs;                       // E and M, recounted after every sweep
+    bool check_observables = false;
+    mutable std::vector<spin_type> unpacked;  // get_lattice() cache
+
+    Rng gen;
+    std::vector<Rng> thread_gens;          // one engine per extra thread
+
+    void build_acceptance_table();
+    std::uint64_t colour_mask(int i, int k, int parity) const;
+    void update_row(int i, int parity, const std::uint64_t* neighbours, Rng& shared);
+};
@@ -0,0 +1,295 @@
+// output_writer.hpp
+#pragma once
+
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <type_traits>
+#include <vector>
+
+// Output formats of the mcmc executable:
+//   csv : results_<...>.csv (one text row per measurement) + lattice_<...>_<step>.csv per snapshot
+//   npy : results_<...>.npy, float64 array (n, 5) with columns step,E,M,E^2,M^2
+//         (replica runs: replicas_<...>.npy, (n, 6) with a leading replica column)
+//         lattice_<...>.npy, structured array (k,) of {step: int64, lattice: (L, L)}
+//   bin : same payload as npy, but behind a fixed 32 byte header:
+//         "MCMC" | u8 version | u8 kind ('S' series / 'L' lattices) | u8 dtype ('f'/'i'/'u') | u8 itemsize
+//         | u64 count | u32 dim (5 or 6 columns / L) | 12 reserved bytes
+// All binary payloads are little-endian and contiguous, so they can be memory-mapped directly.
+enum class OutputFormat { Csv, Npy, Bin };
+
+inline OutputFormat parse_output_format(const std::string& s) {
+    if (s == "csv") return OutputFormat::Csv;
+    if (s == "npy") return OutputFormat::Npy;
+    if (s == "bin") return OutputFormat::Bin;
+    throw std::invalid_argument("Unknown output format: " + s + " (expected csv|npy|bin)");
+}
+
+inline const char* format_extension(OutputFormat fmt) {
+    switch (fmt) {
+        case OutputFormat::Npy: return ".npy";
+        case OutputFormat::Bin: return ".bin";
+        default:                return ".csv";
+    }
+}
+
+namespace output_detail {
+
+constexpr std::size_t kNpyHeaderSize = 128;  // fixed → header can be patched in place
+constexpr std::size_t kBinHeaderSize = 32;
+
+inline bool host_is_little_endian() {
+    const std::uint16_t probe = 1;
+    unsigned char first;
+    std::memcpy(&first, &probe, 1);
+    return first == 1;
+}
+
+template <typename T> constexpr char dtype_kind() {
+    return std::is_floating_point<T>::value ? 'f' : std::is_unsigned<T>::value ? 'u' : 'i';
+}
+
+template <typename T> std::string npy_descr() {
+    return std::string("<") + dtype_kind<T>() + std::to_string(sizeof(T));
+}
+
+inline void write_npy_header(std::ofstream& out, const std::string& descr, const std::string& shape) {
+    std::string dict = "{'descr': " + descr + ", 'fortran_order': False, 'shape': " + shape + ", }";
+    const std::size_t prefix = 10;  // magic(6) + version(2) + header_len(2)
+    if (prefix + dict.size() + 1 > kNpyHeaderSize) {
+        throw std::runtime_error("npy header too long");
+    }
+    dict.append(kNpyHeaderSize - prefix - dict.size() - 1, ' ');
+    dict.push_back('\n');
+
+    const std::uint16_t header_len = static_cast<std::uint16_t>(dict.size());
+    out.seekp(0);
+    out.write("\x93NUMPY\x01\x00", 8);
+    out.put(static_cast<char>(header_len & 0xff));
+    out.put(static_cast<char>(header_len >> 8));
+    out.write(dict.data(), static_cast<std::streamsize>(dict.size()));
+}
+
+inline void write_bin_header(std::ofstream& out, char kind, char dtype, std::uint8_t itemsize,
+                             std::uint64_t count, std::uint32_t dim) {
+    char header[kBinHeaderSize] = {0};
+    std::memcpy(header, "MCMC", 4);
+    header[4] = 1;  // version
+    header[5] = kind;
+    header[6] = dtype;
+    header[7] = static_cast<char>(itemsize);
+    std::memcpy(header + 8, &count, sizeof(count));
+    std::memcpy(header + 16, &dim, sizeof(dim));
+    out.seekp(0);
+    out.write(header, kBinHeaderSize);
+}
+
+inline std::ofstream open_binary(const std::string& path) {
+    if (!host_is_little_endian()) {
+        throw std::runtime_error("binary output requires a little-endian host");
+    }
+    std::ofstream out(path, std::ios::binary | std::ios::trunc);
+    if (!out) throw std::runtime_error("Cannot open output file: " + path);
+    return out;
+}
+
+// Reopens an existing binary output for appending (checkpoint resume); 'count' is set to
+// the number of rows already in the file. A missing file is created like open_binary().
+inline std::ofstream open_binary_append(const std::string& path, std::size_t header_size,
+                                        std::size_t row_bytes, std::uint64_t& count) {
+    std::ifstream probe(path, std::ios::binary | std::ios::ate);
+    if (!probe) {
+        count = 0;
+        return open_binary(path);
+    }
+    const std::uint64_t size = static_cast<std::uint64_t>(probe.tellg());
+    if (size < header_size || (size - header_size) % row_bytes != 0) {
+        throw std::runtime_error("Cannot append to " + path + ": unexpected file size");
+    }
+    count = (size - header_size) / row_bytes;
+    std::ofstream out(path, std::ios::binary | std::ios::in | std::ios::out);
+    if (!out) throw std::runtime_error("Cannot open output file: " + path);
+    return out;
+}
+
+}  // namespace output_detail
+
+// Measurement series: one row (step, E, M, E^2, M^2) per call to write(),
+// with with_replica a leading replica column (write_replica()).
+// append: continue an existing file (checkpoint resume) instead of truncating it.
+class SeriesWriter {
+public:
+    SeriesWriter(const std::string& stem, OutputFormat fmt, bool with_replica = false, bool append = false)
+        : fmt(fmt), path(stem + format_extension(fmt)), columns(with_replica ? 6 : 5)
+    {
+        if (fmt == OutputFormat::Csv) {
+            const bool has_rows = append && std::ifstream(path, std::ios::ate).tellg() > 0;
+            out.open(path, has_rows ? std::ios::app : std::ios::trunc);
+            if (!out) throw std::runtime_error("Cannot open output file: " + path);
+            if (has_rows) return;
+            if (with_replica) out << "replica,";
+            out << "step,energy,magnetization,energy_squared,magnetization_squared\n";
+        } else if (append) {
+            const std::size_t header = fmt == OutputFormat::Npy ? output_detail::kNpyHeaderSize
+                                                                : output_detail::kBinHeaderSize;
+            out = output_detail::open_binary_append(path, header, columns * sizeof(double), count);
+            write_header();
+            out.seekp(0, std::ios::end);
+        } else {
+            out = output_detail::open_binary(path);
+            write_header();
+        }
+    }
+
+    ~SeriesWriter() {
+        try { close(); } catch (...) {}
+    }
+
+    SeriesWriter(const SeriesWriter&) = delete;
+    SeriesWriter& operator=(const SeriesWriter&) = delete;
+
+    void write(long step, double energy, double magnetization) {
+        if (columns != 5) throw std::logic_error("SeriesWriter: replica column expected");
+        if (fmt == OutputFormat::Csv) {
+            out << step << "," << energy << "," << magnetization << ","
+                << (energy * energy) << "," << (magnetization * magnetization) << "\n";
+            return;
+        }
+        const double row[5] = {
+            static_cast<double>(step), energy, magnetization,
+            energy * energy, magnetization * magnetization
+        };
+        out.write(reinterpret_cast<const char*>(row), sizeof(row));
+        ++count;
+    }
+
+    void write_replica(int replica, long step, double energy, double magnetization) {
+        if (columns != 6) throw std::logic_error("SeriesWriter: no replica column");
+        if (fmt == OutputFormat::Csv) {
+            out << replica << "," << step << "," << energy << "," << magnetization << ","
+                << (energy * energy) << "," << (magnetization * magnetization) << "\n";
+            return;
+        }
+        const double row[6] = {
+            static_cast<double>(replica), static_cast<double>(step), energy, magnetization,
+            energy * energy, magnetization * magnetization
+        };
+        out.write(reinterpret_cast<const char*>(row), sizeof(row));
+        ++count;
+    }
+
+    // Pushes buffered rows to disk (before an intermediate checkpoint).
+    void flush() { out.flush(); }
+
+    // Patches the row count into the header (binary formats) and closes the file.
+    void close() {
+        if (!out.is_open()) return;
+        if (fmt != OutputFormat::Csv) {
+            out.seekp(0, std::ios::end);
+            const auto end = out.tellp();
+            write_header();
+            out.seekp(end);
+        }
+        out.close();
+    }
+
+    const std::string& filename() const { return path; }
+
+private:
+    OutputFormat fmt;
+    std::string path;
+    std::uint32_t columns;
+    std::ofstream out;
+    std::uint64_t count = 0;
+
+    void write_header() {
+        if (fmt == OutputFormat::Npy) {
+            output_detail::write_npy_header(out, "'<f8'",
+                                            "(" + std::to_string(count) + ", " + std::to_string(columns) + ")");
+        } else {
+            output_detail::write_bin_header(out, 'S', 'f', 8, count, columns);
+        }
+    }
+};
+
+// Lattice snapshots. csv: one file per snapshot (lattice_<...>_<step>.csv),
+// npy/bin: all snapshots stacked in one file, the header is updated after every append.
+// append: keep the snapshots of an existing stack (checkpoint resume).
+template <typename T>
+class LatticeStackWriter {
+public:
+    LatticeStackWriter(const std::string& stem, OutputFormat fmt, int L, bool append = false)
+        : fmt(fmt), stem(stem), L(L)
+    {
+        if (fmt == OutputFormat::Csv) return;
+        const std::string path = stem + format_extension(fmt);
+        if (append) {
+            const std::size_t header = fmt == OutputFormat::Npy ? output_detail::kNpyHeaderSize
+                                                                : output_detail::kBinHeaderSize;
+            out = output_detail::open_binary_append(
+                path, header, sizeof(std::int64_t) + static_cast<std::size_t>(L) * L * sizeof(T), count);
+        } else {
+            out = output_detail::open_binary(path);
+        }
+        write_header();
+    }
+
+    LatticeStackWriter(const LatticeStackWriter&) = delete;
+    LatticeStackWriter& operator=(const LatticeStackWriter&) = delete;
+
+    // lattice: flat, row-major L*L values
+    void append(long step, const std::vector<T>& lattice) {
+        if (fmt == OutputFormat::Csv) {
+            std::ofstream file(stem + "_" + std::to_string(step) + ".csv");
+            for (int i = 0; i < L; ++i) {
+                for (int j = 0; j < L; ++j) {
+                    file << +lattice[i * L + j];  // + promotes int8/uint8: numbers, not characters
+                    if (j < L - 1) file << ",";
+                }
+                file << "\n";
+            }
+            return;
+        }
+        const std::int64_t s = step;
+        out.seekp(0, std::ios::end);
+        out.write(reinterpret_cast<const char*>(&s), sizeof(s));
+        out.write(reinterpret_cast<const char*>(lattice.data()),
+                  static_cast<std::streamsize>(lattice.size() * sizeof(T)));
+        ++count;
+        write_header();
+        out.flush();
+    }
+
+private:
+    OutputFormat fmt;
+    std::string stem;
+    int L;
+    std::ofstream out;
+    std::uint64_t count = 0;
+
+    void write_header() {
+        if (fmt == OutputFormat::Npy) {
+            const std::string l = std::to_string(L);
+            const std::string descr = "[('step', '<i8'), ('lattice', '" + output_detail::npy_descr<T>()
+                                    + "', (" + l + ", " + l + "))]";
+            output_detail::write_npy_header(out, descr, "(" + std::to_string(count) + ",)");
+        } else {
+            output_detail::write_bin_header(out, 'L', output_detail::dtype_kind<T>(),
+                                            static_cast<std::uint8_t>(sizeof(T)), count,
+                                            static_cast<std::uint32_t>(L));
+        }
+    }
+};
+
+// results/<prefix>_<MODEL>_L<L>_T<T with 2 decimals>
+inline std::string output_stem(const std::string& dir, const std::string& prefix,
+                               const std::string& model, int L, double T) {
+    std::ostringstream name;
+    name << dir << "/" << prefix << "_" << model << "_L" << L
+         << "_T" << std::fixed << std::setprecision(2) << T;
+    return name.str();
+}
@@ -0,0 +1,92 @@
+// parallel_tempering.hpp
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <cstdint>
+#include <memory>
+#include <stdexcept>
+#include <vector>
+
+#include "lattice_utils.hpp"
+#include "rng.hpp"
+
+// Replica exchange over a temperature grid. One model instance per temperature; the
+// replicas sweep in parallel (OpenMP, one replica per thread at a time). Neighbouring
+// temperatures k, k+1 are swapped, alternating between even and odd pairs, with
+//     P = min(1, exp((1/T_k - 1/T_{k+1}) * (E_a - E_b)))
+// where replica a sits at T_k and b at T_{k+1}. Temperatures are exchanged instead of
+// configurations, so a swap costs O(1).
+template <class Model>
+class ParallelTempering {
+public:
+    // replicas[k] must be at the k-th temperature, ascending
+    ParallelTempering(std::vector<std::unique_ptr<Model>> replicas, int workers)
+        : replicas(std::move(replicas)), workers(std::max(1, workers)), gen(random_seed())
+    {
+        const int n = static_cast<int>(this->replicas.size());
+        if (n == 0) throw std::invalid_argument("parallel tempering needs at least one temperature");
+        for (int k = 0; k < n; ++k) {
+            temps.push_back(this->replicas[k]->get_temperature());
+            replica_at.push_back(k);
+            if (k > 0 && temps[k] <= temps[k - 1]) {
+                throw std::invalid_argument("temperatures must be strictly ascending");
+            }
+        }
+        n_attempts.assign(n > 1 ? n - 1 : 0, 0);
+        n_accepted.assign(n > 1 ? n - 1 : 0, 0);
+    }
+
+    int size() const { return static_cast<int>(temps.size()); }
+    double temperature(int k) const { return temps[k]; }
+    Model& at_temperature(int k) { return *replicas[replica_at[k]]; }
+    Model& replica(int r) { return *replicas[r]; }
+    int replica_index(int k) const { return replica_at[k]; }
+
+    // n sweeps of every replica
+    void sweep(int n) {
+        const int count = size();
+        const int threads = std::min(workers, count);
+        #pragma omp parallel for num_threads(threads) schedule(dynamic, 1) if(threads > 1)
+        for (int r = 0; r < count; ++r) {
+            for (int s = 0; s < n; ++s) replicas[r]->sweep();
+        }
+    }
+
+    // one round of swap attempts on the even or odd neighbour pairs (alternating)
+    void attempt_swaps() {
+        for (int k = parity; k + 1 < size(); k += 2) {
+            const int a = replica_at[k];
+            const int b = replica_at[k + 1];
+            const double delta = (1.0 / temps[k] - 1.0 / temps[k + 1])
+                               * (replicas[a]->current_energy() - replicas[b]->current_energy());
+            ++n_attempts[k];
+            if (delta >= 0.0 || uniform01(gen) < std::exp(delta)) {
+                ++n_accepted[k];
+                std::swap(replica_at[k], replica_at[k + 1]);
+                replicas[a]->set_temperature(temps[k + 1]);
+                replicas[b]->set_temperature(temps[k]);
+            }
+        }
+        parity ^= 1;
+    }
+
+    // statistics of the pair (k, k+1)
+    long attempts(int k) const { return n_attempts[k]; }
+    long accepted(int k) const { return n_accepted[k]; }
+    double acceptance_rate(int k) const {
+        return n_attempts[k] > 0 ? static_cast<double>(n_accepted[k]) / n_attempts[k] : 0.0;
+    }
+
+    void set_seed(std::uint64_t seed, int stream = 0) { gen = make_stream(seed, stream); }
+
+private:
+    std::vector<std::unique_ptr<Model>> replicas;
+    std::vector<double> temps;        // ascending
+    std::vector<int> replica_at;      // temperature index → replica index
+    std::vector<long> n_attempts;
+    std::vector<long> n_accepted;
+    int workers;
+    int parity = 0;
+    Rng gen;                          // swap decisions
+};
@@ -0,0 +1,110 @@
+// progress.hpp
+#pragma once
+
+#include <chrono>
+#include <cstring>
+#include <limits>
+#include <ostream>
+#include <string>
+
+#include "run_meta.hpp"
+
+// Machine-readable progress of the mcmc executable (--progress jsonl): one JSON object per line,
+// flushed right away, so a reader on the other end of the pipe sees the run while it is going
+// (mcmc_tools.sim.progress). Records:
+//   {"event": "start", "model", "L", "T"}
+//   {"event": "progress", "model", "L", "T", "phase": "burnin" | "measure", "sweeps", "total",
+//    "samples", "samples_total", "sweeps_per_sec", "energy", "magnetization", "eta_s"}
+//   {"event": "done", "model", "L", "T", "sweeps", "seconds"}
+// Progress records come at most every 'interval' seconds plus once right after every phase
+// change. sweeps/total count the current phase; total (and then eta_s) is null when it is not
+// known in advance (--burnin auto), samples_total with --thin auto (the sweep budget is the
+// total there). energy and magnetization are the tracked totals of the chain.
+class ProgressReporter {
+public:
+    using clock = std::chrono::steady_clock;
+
+    ProgressReporter(std::ostream& out, double interval_seconds)
+        : out(out), interval(std::chrono::duration_cast<clock::duration>(std::chrono::duration<double>(interval_seconds))) {}
+
+    // new chain at T; measure_sweeps: sweeps of the measurement phase, < 0 if unknown (ETA)
+    void begin_run(const std::string& run_model, int run_L, double run_T, long measure_sweeps) {
+        model = run_model;
+        L = run_L;
+        T = run_T;
+        expected_measure = measure_sweeps;
+        run_sweeps = 0;
+        run_start = clock::now();
+        emit(header("start"));
+    }
+
+    // total_sweeps / total_samples < 0: unknown
+    void begin_phase(const char* name, long total_sweeps, long total_samples = -1) {
+        phase = name;
+        total = total_sweeps;
+        samples_total = total_samples;
+        sweeps = samples = 0;
+        phase_start = next_report = clock::now();  // first sweep of the phase reports
+    }
+
+    template <class Model>
+    void sweep(const Model& sim, long n = 1) {
+        sweeps += n;
+        run_sweeps += n;
+        if (clock::now() >= next_report) report(sim.current_energy(), sim.current_magnetization());
+    }
+
+    void sample() { ++samples; }
+
+    void end_run() {
+        const double seconds = std::chrono::duration<double>(clock::now() - run_start).count();
+        emit(header("done").set("sweeps", run_sweeps).set("seconds", seconds));
+    }
+
+private:
+    std::ostream& out;
+    clock::duration interval;
+    std::string model;
+    int L = 0;
+    double T = 0.0;
+    long expected_measure = -1;
+    const char* phase = "";
+    long total = -1;
+    long samples_total = -1;
+    long sweeps = 0;
+    long samples = 0;
+    long run_sweeps = 0;
+    clock::time_point run_start, phase_start, next_report;
+
+    RunMeta header(const char* event) const {
+        RunMeta record;
+        record.set("event", event).set("model", model).set("L", L).set("T", T);
+        return record;
+    }
+
+    void report(double energy, double magnetization) {
+        const auto now = clock::now();
+        next_report = now + interval;
+        const double elapsed = std::chrono::duration<double>(now - phase_start).count();
+        const double rate = elapsed > 0.0 ? sweeps / elapsed : 0.0;
+        const double unknown = std::numeric_limits<double>::quiet_NaN();  // → null
+        double eta = unknown;
+        if (rate > 0.0) {
+            if (samples_total >= 0 && samples > 0) {
+                // measurement phase: remaining samples at the spacing so far (also --thin auto)
+                eta = (samples_total - samples) * (static_cast<double>(sweeps) / samples) / rate;
+            } else if (total >= 0) {
+                // burn-in: plus the measurement phase that follows, if that is known
+                const bool burnin = std::strcmp(phase, "burnin") == 0;
+                if (!burnin || expected_measure >= 0) eta = (total - sweeps + (burnin ? expected_measure : 0)) / rate;
+            }
+        }
+        RunMeta record = header("progress");
+        record.set("phase", phase).set("sweeps", sweeps).set("total", total >= 0 ? static_cast<double>(total) : unknown)
+            .set("samples", samples).set("samples_total", samples_total >= 0 ? static_cast<double>(samples_total) : unknown)
+            .set("sweeps_per_sec", rate).set("energy", energy).set("magnetization", magnetization).set("eta_s", eta);
+        emit(record);
+    }
+
+    void emit(const RunMeta& record) { out << record.line() << std::endl; }
+};
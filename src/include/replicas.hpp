@@ -0,0 +1,37 @@
+// replicas.hpp
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+#include "rng.hpp"
+#include "simulation.hpp"
+
+// R independent chains of one (model, L, T) point, distributed over 'workers' threads
+// (OpenMP). make_model() builds a fresh replica, configure(model) applies the run options
+// after seeding, thermalize(model, r) performs the burn-in and returns its length in sweeps
+// (fixed or adaptive, see equilibration.hpp). Every replica then records 'samples' measurements
+// with its own copy of 'thinning' (fixed or adaptive spacing, tau_int per replica in the record).
+// Returns one ChainRecord per replica.
+template <class Model, class MakeModel, class Configure, class Thermalize>
+std::vector<ChainRecord<typename Model::spin_type>> run_replicas(
+    MakeModel make_model, Configure configure, Thermalize thermalize, int n_replicas, int workers,
+    std::uint64_t base_seed, long samples, const Thinning& thinning, long lattice_every) {
+    std::vector<ChainRecord<typename Model::spin_type>> records(n_replicas);
+    const int threads = std::max(1, std::min(workers, n_replicas));
+
+    #pragma omp parallel for num_threads(threads) schedule(dynamic, 1) if(threads > 1)
+    for (int r = 0; r < n_replicas; ++r) {
+        std::unique_ptr<Model> sim = make_model();
+        sim->set_seed(base_seed, r);  // stream (base_seed, r), threads split further (rng.hpp)
+        sim->randomize_lattice();     // Startgitter ebenfalls aus dem Stream → reproduzierbar
+        configure(*sim);
+        records[r].burnin = thermalize(*sim, r);
+        // Snapshots nur von Replika 0 (Visualisierung), Messreihen von allen
+        Thinning own = thinning;
+        record_samples(*sim, samples, own, r == 0 ? lattice_every : 0, records[r]);
+    }
+    return records;
+}
@@ -0,0 +1,149 @@
+// rng.hpp
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <istream>
+#include <ostream>
+#include <random>
+
+// Random number layer of the native core.
+// Rng is the engine used by all models, cluster moves and replica exchange; any engine with
+// the same members (UniformRandomBitGenerator with 64-bit output, seed(), jump(), long_jump(),
+// stream operators) can be plugged in here.
+//
+// xoshiro256** (Blackman & Vigna 2018): 256 bit state, period 2^256 - 1, a handful of
+// shifts/rotations per 64-bit output (several times cheaper than std::mt19937 plus a std::
+// distribution). jump() advances by 2^128 outputs, long_jump() by 2^192, which gives
+// non-overlapping streams without any coordination between threads or processes.
+class Xoshiro256ss {
+public:
+    using result_type = std::uint64_t;
+    static constexpr result_type min() { return 0; }
+    static constexpr result_type max() { return ~result_type(0); }
+
+    explicit Xoshiro256ss(std::uint64_t seed_value = 0x853c49e6748fea9bULL) { seed(seed_value); }
+
+    // splitmix64 expansion of the seed → never the all-zero state
+    void seed(std::uint64_t seed_value) {
+        for (auto& word : s) {
+            seed_value += 0x9e3779b97f4a7c15ULL;
+            std::uint64_t z = seed_value;
+            z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+            z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+            word = z ^ (z >> 31);
+        }
+    }
+
+    result_type operator()() {
+        const std::uint64_t result = rotl(s[1] * 5, 7) * 9;
+        const std::uint64_t t = s[1] << 17;
+        s[2] ^= s[0];
+        s[3] ^= s[1];
+        s[1] ^= s[2];
+        s[0] ^= s[3];
+        s[2] ^= t;
+        s[3] = rotl(s[3], 45);
+        return result;
+    }
+
+    void jump() {
+        static constexpr std::uint64_t poly[] = {0x180ec6d33cfd0abaULL, 0xd5a61266f0c9392cULL,
+                                                 0xa9582618e03fc9aaULL, 0x39abdc4529b1661cULL};
+        advance(poly);
+    }
+
+    void long_jump() {
+        static constexpr std::uint64_t poly[] = {0x76e15d3efefdcbbfULL, 0xc5004e441c522fb3ULL,
+                                                 0x77710069854ee241ULL, 0x39109bb02acbe635ULL};
+        advance(poly);
+    }
+
+    bool operator==(const Xoshiro256ss& o) const {
+        return s[0] == o.s[0] && s[1] == o.s[1] && s[2] == o.s[2] && s[3] == o.s[3];
+    }
+    bool operator!=(const Xoshiro256ss& o) const { return !(*this == o); }
+
+    // checkpoints: four decimal words, space-separated
+    friend std::ostream& operator<<(std::ostream& out, const Xoshiro256ss& g) {
+        return out << g.s[0] << ' ' << g.s[1] << ' ' << g.s[2] << ' ' << g.s[3];
+    }
+    friend std::istream& operator>>(std::istream& in, Xoshiro256ss& g) {
+        std::uint64_t w[4];
+        if ((in >> w[0] >> w[1] >> w[2] >> w[3]) && (w[0] | w[1] | w[2] | w[3])) {
+            for (int k = 0; k < 4; ++k) g.s[k] = w[k];
+        } else {
+            in.setstate(std::ios::failbit);
+        }
+        return in;
+    }
+
+private:
+    std::uint64_t s[4];
+
+    static std::uint64_t rotl(std::uint64_t x, int k) { return (x << k) | (x >> (64 - k)); }
+
+    void advance(const std::uint64_t (&poly)[4]) {
+        std::uint64_t t[4] = {0, 0, 0, 0};
+        for (std::uint64_t word : poly) {
+            for (int b = 0; b < 64; ++b) {
+                if (word & (std::uint64_t(1) << b)) {
+                    for (int k = 0; k < 4; ++k) t[k] ^= s[k];
+                }
+                (*this)();
+            }
+        }
+        for (int k = 0; k < 4; ++k) s[k] = t[k];
+    }
+};
+
+using Rng = Xoshiro256ss;
+
+// Stream (seed, replica, thread): replica r starts r long jumps (2^192) and thread t another
+// t jumps (2^128) after the seeded state. Identical inputs give identical streams on every
+// machine; different (replica, thread) pairs never overlap.
+inline Rng make_stream(std::uint64_t seed, int replica = 0, int thread = 0) {
+    Rng rng(seed);
+    for (int r = 0; r < replica; ++r) rng.long_jump();
+    for (int t = 0; t < thread; ++t) rng.jump();
+    return rng;
+}
+
+// Fresh 64-bit seed from the OS entropy source (default seeding of the models)
+inline std::uint64_t random_seed() {
+    std::random_device rd;
+    return (static_cast<std::uint64_t>(rd()) << 32) ^ rd();
+}
+
+// Uniform double in [0, 1) from the top 53 bits
+template <class Engine>
+inline double uniform01(Engine& rng) {
+    return static_cast<double>(rng() >> 11) * 0x1.0p-53;
+}
+
+// Uniform integer in [0, n), n < 2^32: Lemire's multiply-shift with rejection (exact, almost
+// never more than one draw, no division on the fast path)
+template <class Engine>
+inline std::uint32_t uniform_index(Engine& rng, std::uint32_t n) {
+    std::uint64_t m = (rng() >> 32) * n;
+    auto low = static_cast<std::uint32_t>(m);
+    if (low < n) {
+        const std::uint32_t threshold = static_cast<std::uint32_t>(-n) % n;
+        while (low < threshold) {
+            m = (rng() >> 32) * n;
+            low = static_cast<std::uint32_t>(m);
+        }
+    }
+    return static_cast<std::uint32_t>(m >> 32);
+}
+
+// Bulk generation for sweep kernels: all random numbers of a sweep in one tight loop
+template <class Engine>
+inline void fill_uniform(Engine& rng, double* out, std::size_t n, double scale = 1.0) {
+    for (std::size_t i = 0; i < n; ++i) out[i] = uniform01(rng) * scale;
+}
+
+template <class Engine>
+inline void fill_index(Engine& rng, std::uint32_t* out, std::size_t n, std::uint32_t bound) {
+    for (std::size_t i = 0; i < n; ++i) out[i] = uniform_index(rng, bound);
+}
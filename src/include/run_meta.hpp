@@ -0,0 +1,82 @@
+// run_meta.hpp
+#pragma once
+
+#include <cmath>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+
+// Run metadata written next to the results: results/meta_<model>_L<L>_T<T>.json
+// (flat JSON object, keys in insertion order; see mcmc_tools.sim.binary_io.read_meta).
+class RunMeta {
+public:
+    RunMeta& set(const std::string& key, const std::string& value) {
+        return raw(key, "\"" + escape(value) + "\"");
+    }
+    RunMeta& set(const std::string& key, const char* value) { return set(key, std::string(value)); }
+    RunMeta& set(const std::string& key, bool value) { return raw(key, value ? "true" : "false"); }
+    RunMeta& set(const std::string& key, long value) { return raw(key, std::to_string(value)); }
+    RunMeta& set(const std::string& key, int value) { return raw(key, std::to_string(value)); }
+    RunMeta& set(const std::string& key, double value) { return raw(key, number(value)); }
+    template <typename T>
+    RunMeta& set(const std::string& key, const std::vector<T>& values) {
+        std::string out = "[";
+        for (std::size_t i = 0; i < values.size(); ++i) {
+            if (i) out += ", ";
+            out += number(static_cast<double>(values[i]));
+        }
+        return raw(key, out + "]");
+    }
+
+    void write(const std::string& path) const {
+        std::ofstream out(path);
+        if (!out) throw std::runtime_error("Cannot open output file: " + path);
+        out << "{\n";
+        for (std::size_t i = 0; i < fields.size(); ++i) {
+            out << "  \"" << escape(fields[i].first) << "\": " << fields[i].second
+                << (i + 1 < fields.size() ? ",\n" : "\n");
+        }
+        out << "}\n";
+    }
+
+    // the same object on one line (JSON Lines, see progress.hpp)
+    std::string line() const {
+        std::string out = "{";
+        for (std::size_t i = 0; i < fields.size(); ++i) {
+            if (i) out += ", ";
+            out += "\"" + escape(fields[i].first) + "\": " + fields[i].second;
+        }
+        return out + "}";
+    }
+
+private:
+    std::vector<std::pair<std::string, std::string>> fields;
+
+    RunMeta& raw(const std::string& key, const std::string& json) {
+        for (auto& f : fields) {
+            if (f.first == key) { f.second = json; return *this; }
+        }
+        fields.emplace_back(key, json);
+        return *this;
+    }
+
+    static std::string number(double v) {
+        if (!std::isfinite(v)) return "null";
+        std::ostringstream s;
+        s << std::setprecision(12) << v;
+        return s.str();
+    }
+
+    static std::string escape(const std::string& s) {
+        std::string out;
+        for (char c : s) {
+            if (c == '"' || c == '\\') out += '\\';
+            out += c;
+        }
+        return out;
+    }
+};
@@ -0,0 +1,125 @@
+// simulation.hpp
+#pragma once
+
+#include <cstdint>
+#include <vector>
+
+#include "autocorrelation.hpp"
+
+// Burn-in phase of a chain: models with tunable proposals (XYModel step width) adapt them
+// only inside this scope, so the measurement phase runs with fixed proposals (detailed balance).
+// Models without tunable proposals implement set_burnin() as a no-op.
+template <class Model>
+class BurninScope {
+public:
+    explicit BurninScope(Model& sim) : sim(sim) { sim.set_burnin(true); }
+    ~BurninScope() { sim.set_burnin(false); }
+    BurninScope(const BurninScope&) = delete;
+    BurninScope& operator=(const BurninScope&) = delete;
+
+private:
+    Model& sim;
+};
+
+// Burn-in + measurement loop shared by the mcmc executable and the Python bindings.
+// After the burn-in, 'thin' sweeps are performed before every call to on_sample(k),
+// k = 0 .. samples-1.
+template <class Model, class OnSample>
+void run_chain(Model& sim, long burnin, long samples, int thin, OnSample on_sample) {
+    {
+        BurninScope<Model> scope(sim);
+        for (long s = 0; s < burnin; ++s) sim.sweep();
+    }
+    for (long k = 0; k < samples; ++k) {
+        for (int t = 0; t < thin; ++t) sim.sweep();
+        on_sample(k);
+    }
+}
+
+// Measurement phase with online tau_int: every sweep feeds thinning with E and |M|, and
+// on_sample(k), k = 0 .. samples-1, follows after thinning.thin() sweeps each (adaptive:
+// preceded by the pilot sweeps). Stops early once the next spacing would exceed
+// thinning.max_sweeps(). on_sweep() after every sweep (progress). Returns the number of
+// sweeps done.
+template <class Model, class OnSample, class OnSweep>
+long run_measurements(Model& sim, long samples, Thinning& thinning, OnSample on_sample, OnSweep on_sweep) {
+    const long start = thinning.sweeps();
+    auto sweep = [&]() {
+        sim.sweep();
+        thinning.observe(sim.current_energy(), sim.current_magnetization());
+        on_sweep();
+    };
+    for (long s = 0; s < thinning.pilot_sweeps(); ++s) sweep();
+    for (long k = 0; k < samples; ++k) {
+        const int thin = thinning.thin();
+        if (!thinning.fits(thin)) break;
+        for (int t = thin; t > 0; --t) sweep();
+        on_sample(k);
+    }
+    return thinning.sweeps() - start;
+}
+
+template <class Model, class OnSample>
+long run_measurements(Model& sim, long samples, Thinning& thinning, OnSample on_sample) {
+    return run_measurements(sim, samples, thinning, on_sample, [] {});
+}
+
+// In-memory record of a chain (bindings: handed to NumPy without copying).
+template <typename T>
+struct ChainRecord {
+    std::vector<double> energy;              // total E per measurement
+    std::vector<double> magnetization;       // total M per measurement (Clock/XY: |M|)
+    std::vector<T> lattices;                 // snapshots, k * L * L, row-major
+    std::vector<std::int64_t> lattice_steps; // measurement index (1-based) of each snapshot
+    long burnin = 0;                         // burn-in sweeps before the first measurement
+    long sweeps = 0;                         // sweeps of the measurement phase
+    double tau_energy = 0.5;                 // tau_int of E and |M| in sweeps (binning estimate)
+    double tau_magnetization = 0.5;
+};
+
+// 'samples' measurements spaced by thinning (see run_measurements) into rec, with a lattice
+// snapshot after every 'lattice_every'-th measurement (0 = none).
+template <class Model>
+void record_samples(Model& sim, long samples, Thinning& thinning, long lattice_every,
+                    ChainRecord<typename Model::spin_type>& rec) {
+    const std::size_t n_sites = static_cast<std::size_t>(sim.size()) * sim.size();
+    rec.energy.reserve(samples);
+    rec.magnetization.reserve(samples);
+    if (lattice_every > 0) {
+        rec.lattices.reserve((samples / lattice_every) * n_sites);
+        rec.lattice_steps.reserve(samples / lattice_every);
+    }
+
+    rec.sweeps = run_measurements(sim, samples, thinning, [&](long k) {
+        rec.energy.push_back(sim.current_energy());
+        rec.magnetization.push_back(sim.current_magnetization());
+        if (lattice_every > 0 && (k + 1) % lattice_every == 0) {
+            const auto& lat = sim.get_lattice();
+            rec.lattices.insert(rec.lattices.end(), lat.begin(), lat.end());
+            rec.lattice_steps.push_back(k + 1);
+        }
+    });
+    rec.tau_energy = thinning.tau_energy();
+    rec.tau_magnetization = thinning.tau_magnetization();
+}
+
+// 'sweeps' sweeps after the burn-in; with measure=true a measurement after every
+// 'thin'-th sweep and a lattice snapshot after every 'lattice_every'-th measurement (0 = none).
+template <class Model>
+ChainRecord<typename Model::spin_type> record_chain(Model& sim, long sweeps, int thin, bool measure,
+                                                    long burnin, long lattice_every) {
+    ChainRecord<typename Model::spin_type> rec;
+    rec.burnin = burnin;
+    if (!measure) {
+        run_chain(sim, burnin, sweeps, 1, [](long) {});
+        return rec;
+    }
+
+    const long samples = sweeps / thin;
+    run_chain(sim, burnin, 0, 1, [](long) {});
+    Thinning thinning(thin);
+    record_samples(sim, samples, thinning, lattice_every, rec);
+    for (long s = samples * thin; s < sweeps; ++s) sim.sweep();  // remainder when thin ∤ sweeps
+    rec.sweeps = sweeps;
+    return rec;
+}
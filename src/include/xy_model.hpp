@@ -1,22 +1,73 @@
 // xy_model.hpp
 #pragma once
 
+#include <cmath>
+#include <cstdint>
 #include <vector>
-#include <random>
+#include <string>
+
+#include "lattice_utils.hpp"
+#include "cluster_updates.hpp"
+#include "rng.hpp"
 
 class XYModel {
 public:
+    using spin_type = xy_angle_t;          // float32 by default (lattice_utils.hpp)
+
     XYModel(int L, double T, double J);
 
     void metropolis_update();
     double compute_energy() const;
     double compute_magnetization() const;
+    double current_energy() const;         // tracked total E, O(1)
+    double current_magnetization() const;  // tracked |M|, O(1)
+    void refresh_observables();            // revalidate the lattice, recompute caches and tracked values
+    void set_check_observables(bool on) { check_observables = on; }  // debug cross-check
     void save_lattice(const std::string& filename) const;
+    const std::vector<spin_type>& get_lattice() const { return lattice; }  // flat, row-major
     void set_lattice(const std::vector<std::vector<double>>& new_lattice);
+    void load_lattice(const spin_type* values);  // L*L angles, row-major (bulk copy)
+    spin_type* lattice_data() { return lattice.data(); }  // raw view; call refresh_observables() after writes
     void set_forced_angle(double angle);
     void set_forced_random(double value);
     bool metropolis_update(int i, int j);  
     void metropolis_sweep();   
+    void checkerboard_sweep();
+    void overrelaxation_sweep();           // reflect every spin about its local field (E unchanged)
+    void sweep();                          // one sweep in the configured mode + n_overrelax OR sweeps
+    void set_sweep_mode(SweepMode mode) { sweep_mode = mode; }
+    void set_threads(int n);               // threads for checkerboard_sweep (OpenMP)
+    int wolff_update();                    // one Wolff cluster, returns its size
+    void wolff_sweep();                    // Wolff clusters flipping ~L*L spins on average
+    int swendsen_wang_sweep();             // returns the number of clusters
+    void set_algorithm(Algorithm a) {
+        if (a == Algorithm::HeatBath) throw std::invalid_argument("heat-bath updates are only available for the Clock model");
+        algorithm = a;
+    }
+    // Metropolis proposals phi + w (u - 1/2); w = 2π (default) draws a completely new angle.
+    // With a target acceptance > 0, w adapts after every sweep of the burn-in (set_burnin).
+    void set_step_width(double w);
+    double get_step_width() const { return step_width; }
+    void set_target_acceptance(double a);  // 0 = fixed width
+    void set_overrelaxation(int n);        // over-relaxation sweeps after every sweep
+    void set_burnin(bool on);              // burn-in phase: width tuning on; off resets the statistics
+    long attempted_moves() const { return attempted; }  // Metropolis proposals since the burn-in
+    long accepted_moves() const { return accepted; }
+    double acceptance_rate() const { return attempted > 0 ? static_cast<double>(accepted) / attempted : 0.0; }
+    void set_seed(std::uint64_t seed, int replica = 0);  // stream (seed, replica), see rng.hpp
+    void randomize_lattice();              // random start configuration from the current stream
+    std::string rng_state() const { return engines_to_string(gen, thread_gens); }  // checkpoints
+    void set_rng_state(const std::string& state) {
+        if (!engines_from_string(state, gen, thread_gens)) set_threads(n_threads);  // other thread count
+    }
+    int size() const { return L; }
+    std::size_t memory_bytes() const {     // model object + heap (lattice, angle caches, workspaces)
+        return sizeof(*this) + heap_bytes(lattice, nbr, cos_phi, sin_phi, thread_gens, rand_sites, rand_angle,
+                                          rand_accept)
+               + cluster_ws.memory_bytes();
+    }
+    void set_temperature(double new_T) { T = new_T; }
+    double get_temperature() const { return T; }
 
 private:
     double forced_angle = -1.0;
@@ -25,13 +76,45 @@ private:
     int L;                                // Lattice size (LxL)
     double T;                             // Temperature
     double J;                             // Coupling constant
-    std::vector<std::vector<double>> lattice; // Angle values: phi_i ∈ [0, 2π)
+    std::vector<spin_type> lattice;       // Angle values: phi_i ∈ [0, 2π), flat (i * L + j)
+    std::vector<int> nbr;                 // Neighbour table (see lattice_utils.hpp)
+    std::vector<double> cos_phi;          // cos(phi_i) of the stored angle, kept in sync with lattice
+    std::vector<double> sin_phi;          // sin(phi_i)
+    SweepMode sweep_mode = SweepMode::Random;
+    Algorithm algorithm = Algorithm::Metropolis;
+    ClusterWorkspace cluster_ws;
+    int n_threads = 1;
+    double step_width = 2.0 * M_PI;       // proposal width (2π = uniform new angle)
+    double target_acceptance = 0.0;
+    int n_overrelax = 0;
+    bool in_burnin = false;
+    long attempted = 0;                   // acceptance statistics of the Metropolis proposals
+    long accepted = 0;
+    Observables obs;                      // running E and (Mx, My) (see lattice_utils.hpp)
+    bool check_observables = false;
 
-    std::mt19937 gen;
-    std::uniform_int_distribution<int> dist_site;
-    std::uniform_real_distribution<double> dist_real; // [0, 1)
-    std::uniform_real_distribution<double> dist_angle; // [0, 2π)
+    Rng gen;                              // RNG engine (rng.hpp)
+    std::vector<Rng> thread_gens;         // one engine per extra checkerboard thread
+    std::vector<std::uint32_t> rand_sites; // random sweep: sites, proposed angles and
+    std::vector<double> rand_angle;       // acceptance numbers, drawn in bulk once per sweep (u in [0, 1))
+    std::vector<double> rand_accept;
 
     void init_lattice();
-    double spin_dot(double phi1, double phi2) const;
+    double spin_dot(int s1, int s2) const {   // cos(phi_1 - phi_2) from the cache
+        return cos_phi[s1] * cos_phi[s2] + sin_phi[s1] * sin_phi[s2];
+    }
+    // The cache follows the stored (rounded) angle, so tracked and recomputed observables agree
+    void set_angle(int s, double phi) {
+        lattice[s] = static_cast<spin_type>(phi);
+        cos_phi[s] = std::cos(static_cast<double>(lattice[s]));
+        sin_phi[s] = std::sin(static_cast<double>(lattice[s]));
+    }
+    double propose(double phi, double u) const {  // u uniform in [0, 1)
+        if (step_width >= 2.0 * M_PI) return 2.0 * M_PI * u;
+        const double p = phi + step_width * (u - 0.5);
+        return p < 0.0 ? p + 2.0 * M_PI : (p >= 2.0 * M_PI ? p - 2.0 * M_PI : p);
+    }
+    bool update_site(int s, double new_phi, double r, Observables& delta);  // r: acceptance test
+    void adapt_step_width(long sweep_attempted, long sweep_accepted);
+    void rotate_spin(int s, double new_phi, Observables& delta);
 };
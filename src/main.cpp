@@ -1,21 +1,516 @@
 // main.cpp
+#include <algorithm>
+#include <cmath>
 #include <iostream>
 #include <fstream>
-#include <sstream>      
+#include <sstream>
 #include <memory>
+#include <numeric>
 #include <string>
 #include <iomanip>
 #include <cstdlib>
 #include <filesystem>
+#include <thread>
+#include <vector>
 
+#include "include/benchmark.hpp"
 #include "include/ising_model.hpp"
+#include "include/multispin_ising.hpp"
 #include "include/clock_model.hpp"
+#include "include/equilibration.hpp"
 #include "include/xy_model.hpp"
+#include "include/checkpoint.hpp"
+#include "include/output_writer.hpp"
+#include "include/parallel_tempering.hpp"
+#include "include/progress.hpp"
+#include "include/replicas.hpp"
+#include "include/run_meta.hpp"
+#include "include/simulation.hpp"
 
 namespace fs = std::filesystem;
 
 std::string output_dir = "results";
 
+// Laufzeit-Optionen, die für alle Modelle gleich sind
+struct RunOptions {
+    OutputFormat format = OutputFormat::Csv;
+    SweepMode sweep_mode = SweepMode::Random;
+    bool multispin = false;           // --sweep msc: bit-packed Ising engine (checkerboard, 64 spins per word)
+    int threads = 1;                  // checkerboard threads per model
+    Algorithm algorithm = Algorithm::Metropolis;
+    bool check_observables = false;
+    int swap_every = 5;               // parallel tempering: sweeps between swap rounds
+    bool anneal = false;              // --anneal: one chain walks the --T-list/--T-range grid in order
+    long anneal_burnin = 500;         // --anneal-burnin: re-equilibration sweeps at every further T
+    int workers = 0;                  // parallel tempering / replicas: threads (0 = all cores)
+    int replicas = 0;                 // > 0: independent chains at the same (model, L, T)
+    long seed = -1;                   // base seed of the update streams (seed, replica, thread); < 0 = random
+    long burnin = -1;                 // --burnin; < 0 = burnin_sweeps (0 when continuing a checkpoint)
+    bool burnin_auto = false;         // --burnin auto: stop once the energy series is stationary
+    long burnin_min = 100;            // adaptive burn-in bounds (sweeps)
+    long burnin_max = 100000;
+    bool burnin_cold = false;         // --burnin-cold: adaptive burn-in also waits for a cold-start copy to agree
+    int thin = 5;                     // --thin: sweeps per measurement
+    bool thin_auto = false;           // --thin auto: spacing follows the online tau_int estimate
+    int thin_max = 1000;              // upper bound of the adaptive spacing (sweeps)
+    long max_sweeps = 0;              // --max-sweeps: measurement sweeps with --thin auto (0 = steps * thin)
+    double step_width = 0.0;          // XY: --step-width W (radians), 0 = uniform new angle
+    bool step_auto = false;           // XY: --step-width auto, tuned during burn-in
+    double target_acceptance = 0.5;   // XY: --target-acceptance of the tuned width
+    int overrelax = 0;                // XY: --overrelax N over-relaxation sweeps per sweep
+    std::string checkpoint_out;       // lattice + RNG state after the run (and every checkpoint_every)
+    long checkpoint_every = 0;        // measurements between intermediate checkpoints (0 = only at the end)
+    std::string resume_from;          // checkpoint to continue from / warm-start with
+    ProgressReporter* progress = nullptr;  // --progress jsonl (owned by main), nullptr = off
+    bool bench = false;               // --bench: time the configured model instead of simulating (benchmark.hpp)
+    int bench_repeats = 3;            // --bench-repeats: timed blocks, the fastest counts
+};
+
+const int burnin_sweeps = 2000;  // thermalisieren (raise near critical region if needed)
+
+long burnin_for(const RunOptions& opt, bool continuing = false) {
+    if (opt.burnin >= 0) return opt.burnin;
+    return continuing ? 0 : burnin_sweeps;
+}
+
+// XY: Schrittweite der Metropolis-Vorschläge und Over-Relaxation; andere Modelle haben keine
+template <class Model>
+void configure_proposals(Model&, const RunOptions&) {}
+
+void configure_proposals(XYModel& sim, const RunOptions& opt) {
+    if (opt.step_width > 0.0) sim.set_step_width(opt.step_width);
+    if (opt.step_auto) sim.set_target_acceptance(opt.target_acceptance);
+    sim.set_overrelaxation(opt.overrelax);
+}
+
+template <class Model>
+void configure(Model& sim, const RunOptions& opt) {
+    sim.set_sweep_mode(opt.sweep_mode);
+    sim.set_threads(opt.threads);
+    sim.set_algorithm(opt.algorithm);
+    sim.set_check_observables(opt.check_observables);
+    configure_proposals(sim, opt);
+}
+
+// --progress: Sweeps an die Fortschrittsanzeige melden (ohne --progress nichts)
+template <class Model>
+void report_sweeps(const RunOptions& opt, const Model& sim, long n = 1) {
+    if (opt.progress) opt.progress->sweep(sim, n);
+}
+
+void begin_phase(const RunOptions& opt, const char* phase, long total_sweeps, long total_samples = -1) {
+    if (opt.progress) opt.progress->begin_phase(phase, total_sweeps, total_samples);
+}
+
+// Burn-in einer Kette: fest (burnin_for) oder adaptiv bis zur Stationarität (--burnin auto,
+// mit --burnin-cold zusätzlich gegen einen Kaltstart geprüft)
+template <class Model>
+EquilibrationResult thermalize(Model& sim, const RunOptions& opt, bool continuing = false) {
+    if (opt.burnin_auto && !continuing) {
+        begin_phase(opt, "burnin", -1);
+        return equilibrate(sim, opt.burnin_min, opt.burnin_max, opt.burnin_cold, [&] { report_sweeps(opt, sim); });
+    }
+    const long n = burnin_for(opt, continuing);
+    begin_phase(opt, "burnin", n);
+    BurninScope<Model> scope(sim);
+    for (long s = 0; s < n; ++s) {
+        sim.sweep();
+        report_sweeps(opt, sim);
+    }
+    return {n, false};
+}
+
+// Sweeps der Messphase: samples * thin, bei --thin auto das Budget (--max-sweeps, Standard
+// ebenfalls samples * thin) als Obergrenze
+long measurement_sweeps_for(const RunOptions& opt, long samples) {
+    return opt.thin_auto && opt.max_sweeps > 0 ? opt.max_sweeps : samples * opt.thin;
+}
+
+// Messungen einer Kette, soweit vorab bekannt (--thin auto: höchstens 'samples', -1)
+long measurement_samples_for(const RunOptions& opt, long samples) {
+    return opt.thin_auto ? -1 : samples;
+}
+
+// Messabstand einer Kette: fest (--thin N) oder adaptiv (--thin auto), tau_int wird immer geschätzt.
+// Adaptiv bleibt die Messphase im Sweep-Budget; wächst tau, werden es weniger Messungen
+// (~ Budget / tau), nicht mehr Sweeps.
+Thinning thinning_for(const RunOptions& opt, long samples) {
+    return Thinning(opt.thin, opt.thin_auto, opt.thin_max, opt.thin_auto ? measurement_sweeps_for(opt, samples) : 0);
+}
+
+// tau_int (in Sweeps) und tatsächlicher Messabstand einer Kette
+void set_tau_meta(RunMeta& meta, const Thinning& thinning, long measurement_sweeps, long samples) {
+    meta.set("tau_int_energy", thinning.tau_energy())
+        .set("tau_int_magnetization", thinning.tau_magnetization())
+        .set("measurement_sweeps", measurement_sweeps);
+    if (thinning.adaptive() && samples > 0) {
+        meta.set("thin", static_cast<double>(measurement_sweeps - thinning.pilot_sweeps()) / samples)
+            .set("pilot_sweeps", thinning.pilot_sweeps());
+    }
+}
+
+// Gemeinsame Felder von meta_<model>_L<L>_T<T>.json (Burn-in-Felder setzen die Aufrufer)
+RunMeta base_meta(const std::string& model, int L, double T, int steps, const RunOptions& opt) {
+    RunMeta meta;
+    meta.set("model", model).set("L", L).set("T", T).set("steps", steps).set("thin", opt.thin)
+        .set("thin_mode", opt.thin_auto ? "auto" : "fixed").set("algorithm", algorithm_name(opt.algorithm)).set("sweep_mode", opt.multispin ? "msc" : sweep_mode_name(opt.sweep_mode))
+        .set("burnin_mode", opt.burnin_auto ? "auto" : "fixed");
+    if (opt.burnin_auto) meta.set("burnin_cold_start", opt.burnin_cold);
+    return meta;
+}
+
+// XY: Schrittweite nach dem Burn-in und Akzeptanzrate der Messphase
+template <class Model>
+void set_proposal_meta(RunMeta&, const Model&) {}
+
+void set_proposal_meta(RunMeta& meta, const XYModel& sim) {
+    meta.set("step_width", sim.get_step_width()).set("acceptance_rate", sim.acceptance_rate());
+}
+
+void write_meta(const RunMeta& meta, const std::string& model, int L, double T) {
+    meta.write(output_stem(output_dir, "meta", model, L, T) + ".json");
+}
+
+// Messphase einer Kette bei T: 'samples' Messungen nach results_*, Gitter nach lattice_*,
+// Checkpoints (--checkpoint-out) und meta_* (Burn-in-Felder stehen schon in meta).
+// first_step/continuing: Fortsetzung eines Checkpoints (Messindex läuft weiter, Dateien anhängen).
+template <class Model>
+void measure_and_write(Model& sim, const std::string& model, int L, double T, int samples,
+                       int lattice_every_samples, const RunOptions& opt, long first_step, bool continuing,
+                       RunMeta& meta) {
+    SeriesWriter output(output_stem(output_dir, "results", model, L, T), opt.format, false, continuing);
+    LatticeStackWriter<typename Model::spin_type> lattices(
+        output_stem(output_dir, "lattice", model, L, T), opt.format, L, continuing);
+
+    // 'samples' Messungen, Abstand fest oder nach laufender tau_int-Schätzung (dann höchstens
+    // 'samples', bis das Sweep-Budget aufgebraucht ist)
+    Thinning thinning = thinning_for(opt, samples);
+    begin_phase(opt, "measure", measurement_sweeps_for(opt, samples), measurement_samples_for(opt, samples));
+    long taken = 0;
+    const long measurement_sweeps = run_measurements(sim, samples, thinning, [&](long k) {
+        taken = k + 1;
+        if (opt.progress) opt.progress->sample();
+        const long step = first_step + k;  // fortlaufender Messindex über Checkpoints hinweg
+
+        // laufend mitgeführt → O(1) statt voller Gitter-Traversierung
+        double energy        = sim.current_energy();        // TOTAL E
+        double magnetization = sim.current_magnetization(); // TOTAL M (Clock/XY: |M|)
+
+        output.write(step, energy, magnetization);
+
+        // Lattice nach jeder 'lattice_every_samples'-ten Messung
+        if ((step + 1) % lattice_every_samples == 0) {
+            lattices.append(step + 1, sim.get_lattice());
+        }
+
+        if (!opt.checkpoint_out.empty() && opt.checkpoint_every > 0 && (k + 1) % opt.checkpoint_every == 0) {
+            output.flush();
+            save_checkpoint(opt.checkpoint_out, model, sim, step + 1);
+        }
+    }, [&] { report_sweeps(opt, sim); });
+    output.close();
+
+    if (!opt.checkpoint_out.empty()) {
+        save_checkpoint(opt.checkpoint_out, model, sim, first_step + taken);
+    }
+
+    meta.set("samples", taken);
+    set_tau_meta(meta, thinning, measurement_sweeps, taken);
+    set_proposal_meta(meta, sim);
+    write_meta(meta, model, L, T);
+}
+
+// Burn-in + Messphase für ein Modell; schreibt results_* und lattice_* im gewählten Format.
+// --resume-from: Checkpoint derselben Kette (gleiches Modell und T, mit RNG-Zustand) → Messindex
+// läuft weiter, results_*/lattice_* werden fortgesetzt, kein Burn-in. Sonst (andere Temperatur
+// oder Gitter ohne RNG, z.B. aus der DB) → Warmstart: nur das Gitter wird übernommen, neue
+// Dateien ab Messung 0, Burn-in wie gewohnt (per --burnin verkürzbar).
+template <class Model>
+void run_simulation(Model& sim, const std::string& model, int L, double T, int steps,
+                    int lattice_every_samples, const RunOptions& opt) {
+    const int samples = steps; // steps = Anzahl Messungen
+
+    if (opt.seed >= 0) {
+        sim.set_seed(static_cast<std::uint64_t>(opt.seed));
+        sim.randomize_lattice();
+    }
+    configure(sim, opt);
+
+    long first_step = 0;
+    bool continuing = false;
+    if (!opt.resume_from.empty()) {
+        const Checkpoint cp = load_checkpoint(opt.resume_from);
+        if (cp.model != model) {
+            throw std::invalid_argument("Checkpoint is for model " + cp.model + ", not " + model);
+        }
+        apply_checkpoint(sim, cp);
+        continuing = !cp.rng.empty() && std::abs(cp.T - T) < 1e-9;
+        if (continuing) first_step = cp.step;
+        std::cout << (continuing ? "Continuing " : "Warm start from ") << opt.resume_from
+                  << " (T=" << cp.T << ", step " << cp.step << ")" << std::endl;
+    }
+
+    if (opt.progress) opt.progress->begin_run(model, L, T, measurement_sweeps_for(opt, samples));
+    const EquilibrationResult burnin = thermalize(sim, opt, continuing);
+
+    RunMeta meta = base_meta(model, L, T, samples, opt);
+    meta.set("burnin_sweeps", burnin.sweeps);
+    if (opt.burnin_auto && !continuing) meta.set("burnin_stationary", burnin.stationary);
+    if (continuing) meta.set("resumed_from_step", first_step);
+    measure_and_write(sim, model, L, T, samples, lattice_every_samples, opt, first_step, continuing, meta);
+    if (opt.progress) opt.progress->end_run();
+}
+
+// --bench: Durchsatz des konfigurierten Modells statt einer Simulation (benchmark.hpp).
+// --steps = gemessene Sweeps, --burnin N = Warm-up-Sweeps (Standard 100). Eine JSON-Zeile auf
+// stdout (mcmc_tools.sim.benchmark), keine Dateien in results/.
+template <class Model>
+void run_benchmark(Model& sim, const std::string& model, int L, double T, int steps, const RunOptions& opt) {
+    if (opt.seed >= 0) {
+        sim.set_seed(static_cast<std::uint64_t>(opt.seed));
+        sim.randomize_lattice();
+    }
+    configure(sim, opt);
+    const long warmup = opt.burnin >= 0 ? opt.burnin : 100;
+    const BenchResult r = benchmark_model(sim, steps, warmup, opt.bench_repeats);
+
+    RunMeta meta;
+    meta.set("event", "bench").set("model", model).set("L", L).set("T", T)
+        .set("algorithm", algorithm_name(opt.algorithm))
+        .set("sweep_mode", opt.multispin ? "msc" : sweep_mode_name(opt.sweep_mode)).set("threads", opt.threads)
+        .set("warmup", warmup).set("sweeps", r.sweeps).set("seconds", r.seconds)
+        .set("sweeps_per_sec", r.sweeps_per_sec).set("updates_per_sec", r.updates_per_sec)
+        .set("measure_ns", r.measure_ns).set("snapshot_us", r.snapshot_us)
+        .set("memory_bytes", static_cast<long>(r.memory_bytes)).set("peak_rss_kb", r.peak_rss_kb);
+    std::cout << meta.line() << std::endl;
+}
+
+// Anneal (--anneal mit --T-list/--T-range): eine Kette läuft das Gitter in der angegebenen
+// Reihenfolge ab, jede Temperatur startet vom Endgitter der vorigen. Burn-in wie gewohnt nur
+// bei der ersten Temperatur, danach --anneal-burnin Sweeps (--burnin auto: adaptiv bei jeder).
+// Ausgabe pro Temperatur wie bei Einzelläufen.
+template <class Model>
+void run_anneal(Model& sim, const std::string& model, int L, const std::vector<double>& temperatures,
+                int steps, int lattice_every_samples, const RunOptions& opt) {
+    if (opt.seed >= 0) {
+        sim.set_seed(static_cast<std::uint64_t>(opt.seed));
+        sim.randomize_lattice();
+    }
+    configure(sim, opt);
+
+    RunOptions reequilibrate = opt;
+    reequilibrate.burnin = opt.anneal_burnin;
+    for (std::size_t t = 0; t < temperatures.size(); ++t) {
+        const double T = temperatures[t];
+        sim.set_temperature(T);
+        if (opt.progress) opt.progress->begin_run(model, L, T, measurement_sweeps_for(opt, steps));
+        const EquilibrationResult burnin = thermalize(sim, t == 0 ? opt : reequilibrate);
+
+        RunMeta meta = base_meta(model, L, T, steps, opt);
+        meta.set("burnin_sweeps", burnin.sweeps).set("anneal", true);
+        if (opt.burnin_auto) meta.set("burnin_stationary", burnin.stationary);
+        if (t > 0) meta.set("annealed_from_T", temperatures[t - 1]);
+        measure_and_write(sim, model, L, T, steps, lattice_every_samples, opt, 0, false, meta);
+        if (opt.progress) opt.progress->end_run();
+    }
+}
+
+// Replica Exchange: eine Replika pro Temperatur, gleiche Ausgabe-Dateien wie Einzelläufe
+// (results_<model>_L<L>_T<T>.*) plus swaps_<model>_L<L>.csv mit den Tauschraten.
+// --progress meldet E/M der ersten Temperatur der Liste.
+template <class Model, class MakeModel>
+void run_tempering(MakeModel make_model, const std::string& model, int L,
+                   const std::vector<double>& temperatures, int steps,
+                   int lattice_every_samples, const RunOptions& opt) {
+    using spin_type = typename Model::spin_type;
+    const int n_temps = static_cast<int>(temperatures.size());
+
+    std::vector<std::unique_ptr<Model>> replicas;
+    std::vector<std::unique_ptr<SeriesWriter>> outputs;
+    std::vector<std::unique_ptr<LatticeStackWriter<spin_type>>> lattices;
+    for (double T : temperatures) {
+        replicas.push_back(make_model(T));
+        if (opt.seed >= 0) {
+            replicas.back()->set_seed(static_cast<std::uint64_t>(opt.seed), static_cast<int>(replicas.size()) - 1);
+            replicas.back()->randomize_lattice();
+        }
+        configure(*replicas.back(), opt);
+        outputs.push_back(std::make_unique<SeriesWriter>(
+            output_stem(output_dir, "results", model, L, T), opt.format));
+        lattices.push_back(std::make_unique<LatticeStackWriter<spin_type>>(
+            output_stem(output_dir, "lattice", model, L, T), opt.format, L));
+    }
+
+    const int workers = opt.workers > 0 ? opt.workers
+                                        : static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    ParallelTempering<Model> pt(std::move(replicas), workers);
+    if (opt.seed >= 0) pt.set_seed(static_cast<std::uint64_t>(opt.seed), n_temps);  // eigener Stream für die Tauschentscheidungen
+
+    // Sweeps in Blöcken, damit Tauschversuche und Messungen auf Blockgrenzen fallen
+    const int block = std::gcd(opt.swap_every, opt.thin);
+    long sweeps_done = 0;
+    auto advance = [&](int n_sweeps) {
+        for (int done = 0; done < n_sweeps; done += block) {
+            pt.sweep(block);
+            sweeps_done += block;
+            report_sweeps(opt, pt.at_temperature(0), block);
+            if (n_temps > 1 && sweeps_done % opt.swap_every == 0) pt.attempt_swaps();
+        }
+    };
+
+    if (opt.progress) opt.progress->begin_run(model, L, temperatures[0], measurement_sweeps_for(opt, steps));
+    bool stationary = false;
+    std::vector<std::unique_ptr<BurninScope<Model>>> burnin_scopes;
+    for (int t = 0; t < n_temps; ++t) burnin_scopes.push_back(std::make_unique<BurninScope<Model>>(pt.at_temperature(t)));
+    if (opt.burnin_auto) {
+        // ein Monitor pro Temperatur, ein Energiewert pro Block; fertig, wenn alle gleichzeitig stationär sind
+        std::vector<EquilibrationMonitor> monitors(
+            n_temps, EquilibrationMonitor(opt.burnin_min / block, opt.burnin_max / block));
+        begin_phase(opt, "burnin", -1);
+        for (bool all_done = false; !all_done;) {
+            advance(block);
+            all_done = true;
+            for (int t = 0; t < n_temps; ++t) {
+                monitors[t].add(pt.at_temperature(t).current_energy());
+                all_done = all_done && monitors[t].done();
+            }
+        }
+        stationary = std::all_of(monitors.begin(), monitors.end(),
+                                 [](const EquilibrationMonitor& m) { return m.stationary(); });
+    } else {
+        const long burnin = burnin_for(opt);
+        begin_phase(opt, "burnin", burnin - burnin % block);
+        advance(static_cast<int>(burnin - burnin % block));
+    }
+    const long burnin_done = sweeps_done;
+    burnin_scopes.clear();
+    begin_phase(opt, "measure", measurement_sweeps_for(opt, steps), steps);
+    for (long k = 0; k < steps; ++k) {
+        advance(opt.thin);
+        if (opt.progress) opt.progress->sample();
+        for (int t = 0; t < n_temps; ++t) {
+            Model& sim = pt.at_temperature(t);
+            outputs[t]->write(k, sim.current_energy(), sim.current_magnetization());
+            if ((k + 1) % lattice_every_samples == 0) {
+                lattices[t]->append(k + 1, sim.get_lattice());
+            }
+        }
+    }
+    for (auto& out : outputs) out->close();
+
+    for (int t = 0; t < n_temps; ++t) {
+        const double T = temperatures[t];
+        RunMeta meta = base_meta(model, L, T, steps, opt);
+        meta.set("burnin_sweeps", burnin_done).set("tempering", true);
+        set_proposal_meta(meta, pt.at_temperature(t));
+        if (opt.burnin_auto) meta.set("burnin_stationary", stationary);
+        write_meta(meta, model, L, T);
+    }
+
+    std::ostringstream name;
+    name << output_dir << "/swaps_" << model << "_L" << L << ".csv";
+    std::ofstream swaps(name.str());
+    swaps << "T_low,T_high,attempts,accepted,acceptance_rate\n";
+    for (int k = 0; k + 1 < n_temps; ++k) {
+        swaps << pt.temperature(k) << "," << pt.temperature(k + 1) << ","
+              << pt.attempts(k) << "," << pt.accepted(k) << "," << pt.acceptance_rate(k) << "\n";
+    }
+    if (opt.progress) opt.progress->end_run();
+}
+
+// Replica-Batch: opt.replicas unabhängige Ketten desselben (model, L, T), verteilt auf
+// opt.workers Threads. Alle Messreihen landen in replicas_<model>_L<L>_T<T>.* mit
+// führender replica-Spalte; Lattices nur von Replika 0 (lattice_<model>_L<L>_T<T>.*).
+// --progress: nur start/done (die Ketten laufen auf mehreren Threads).
+template <class Model, class MakeModel>
+void run_replica_batch(MakeModel make_model, const std::string& model, int L, double T, int steps,
+                       int lattice_every_samples, const RunOptions& opt) {
+    const int workers = opt.workers > 0 ? opt.workers
+                                        : static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    const std::uint64_t base_seed = opt.seed >= 0 ? static_cast<std::uint64_t>(opt.seed) : random_seed();
+
+    if (opt.progress) opt.progress->begin_run(model, L, T, -1);
+    RunOptions chain_opt = opt;
+    chain_opt.progress = nullptr;  // Worker-Threads melden nichts
+    std::vector<char> stationary(opt.replicas, 0);
+    auto records = run_replicas<Model>(
+        make_model, [&](Model& sim) { configure(sim, opt); },
+        [&](Model& sim, int r) {
+            const EquilibrationResult eq = thermalize(sim, chain_opt);
+            stationary[r] = eq.stationary;
+            return eq.sweeps;
+        },
+        opt.replicas, workers, base_seed, steps, thinning_for(opt, steps), lattice_every_samples);
+
+    SeriesWriter output(output_stem(output_dir, "replicas", model, L, T), opt.format, true);
+    for (int r = 0; r < opt.replicas; ++r) {
+        const auto& rec = records[r];
+        for (std::size_t k = 0; k < rec.energy.size(); ++k) {
+            output.write_replica(r, static_cast<long>(k), rec.energy[k], rec.magnetization[k]);
+        }
+    }
+    output.close();
+
+    std::vector<long> burnins, sweeps, samples;
+    std::vector<double> tau_e, tau_m, thins;
+    const long pilot = thinning_for(opt, steps).pilot_sweeps();
+    for (const auto& rec : records) {
+        const long n = static_cast<long>(rec.energy.size());
+        burnins.push_back(rec.burnin);
+        sweeps.push_back(rec.sweeps);
+        samples.push_back(n);
+        tau_e.push_back(rec.tau_energy);
+        tau_m.push_back(rec.tau_magnetization);
+        thins.push_back(n > 0 ? static_cast<double>(rec.sweeps - pilot) / n : 0.0);
+    }
+    RunMeta meta = base_meta(model, L, T, steps, opt);
+    meta.set("replicas", opt.replicas).set("burnin_sweeps", burnins)
+        .set("tau_int_energy", tau_e).set("tau_int_magnetization", tau_m).set("measurement_sweeps", sweeps)
+        .set("samples", samples);
+    if (opt.thin_auto) meta.set("thin", thins);
+    if (opt.burnin_auto) {
+        meta.set("burnin_stationary", std::all_of(stationary.begin(), stationary.end(), [](char s) { return s != 0; }));
+    }
+    write_meta(meta, model, L, T);
+
+    using spin_type = typename Model::spin_type;
+    LatticeStackWriter<spin_type> lattices(output_stem(output_dir, "lattice", model, L, T), opt.format, L);
+    const auto& first = records[0];
+    const std::size_t n_sites = static_cast<std::size_t>(L) * L;
+    for (std::size_t i = 0; i < first.lattice_steps.size(); ++i) {
+        std::vector<spin_type> snapshot(first.lattices.begin() + i * n_sites,
+                                        first.lattices.begin() + (i + 1) * n_sites);
+        lattices.append(first.lattice_steps[i], snapshot);
+    }
+    if (opt.progress) opt.progress->end_run();
+}
+
+// "1.0,1.5,2.0"
+std::vector<double> parse_temperature_list(const std::string& s) {
+    std::vector<double> temps;
+    std::stringstream ss(s);
+    std::string item;
+    while (std::getline(ss, item, ',')) {
+        if (!item.empty()) temps.push_back(std::stod(item));
+    }
+    return temps;
+}
+
+// "min:max:step", max inklusive (wie temperature_grid in mcmc_tools.sim.sweep)
+std::vector<double> parse_temperature_range(const std::string& s) {
+    double t_min, t_max, t_step;
+    char c1, c2;
+    std::stringstream ss(s);
+    if (!(ss >> t_min >> c1 >> t_max >> c2 >> t_step) || c1 != ':' || c2 != ':' || t_step <= 0.0) {
+        throw std::invalid_argument("Invalid --T-range " + s + " (expected min:max:step)");
+    }
+    std::vector<double> temps;
+    for (int i = 0; t_min + i * t_step <= t_max + t_step / 2; ++i) {
+        temps.push_back(std::round((t_min + i * t_step) * 100.0) / 100.0);
+    }
+    return temps;
+}
+
 int main(int argc, char* argv[]) {
     // Default parameter values
     std::string model = "Ising";
@@ -24,6 +519,15 @@ int main(int argc, char* argv[]) {
     int steps = 10000;
     double J = 1.0;
     int interval = 100;
+    std::string format_name = "csv";
+    std::string sweep_name = "random";  // random | checkerboard | msc (nur Ising)
+    std::string algorithm_name = "metropolis";  // metropolis | wolff | sw | heatbath (Clock)
+    std::string t_list;                 // parallel tempering / anneal: "1.0,1.5,2.0"
+    std::string t_range;                // parallel tempering / anneal: "min:max:step"
+    std::string progress_format;        // --progress jsonl: JSON-Lines-Fortschritt (progress.hpp)
+    double progress_every = 1.0;        // Sekunden zwischen zwei Fortschrittszeilen
+    std::string progress_out;           // Datei/Named Pipe statt stdout
+    RunOptions opt;
 
     // // Delete folder if exists
     // if (fs::exists(output_dir)) {
@@ -42,116 +546,213 @@ int main(int argc, char* argv[]) {
         else if (arg == "--steps" && i + 1 < argc) steps = std::atoi(argv[++i]);
         else if (arg == "--J" && i + 1 < argc) J = std::atof(argv[++i]);
         else if (arg == "--interval" && i + 1 < argc) interval = std::atoi(argv[++i]);
+        else if (arg == "--format" && i + 1 < argc) format_name = argv[++i];
+        else if (arg == "--sweep" && i + 1 < argc) sweep_name = argv[++i];
+        else if (arg == "--threads" && i + 1 < argc) opt.threads = std::atoi(argv[++i]);
+        else if (arg == "--algorithm" && i + 1 < argc) algorithm_name = argv[++i];
+        else if (arg == "--check-observables") opt.check_observables = true;
+        else if (arg == "--T-list" && i + 1 < argc) t_list = argv[++i];
+        else if (arg == "--T-range" && i + 1 < argc) t_range = argv[++i];
+        else if (arg == "--swap-every" && i + 1 < argc) opt.swap_every = std::atoi(argv[++i]);
+        else if (arg == "--anneal") opt.anneal = true;
+        else if (arg == "--anneal-burnin" && i + 1 < argc) opt.anneal_burnin = std::atol(argv[++i]);
+        else if (arg == "--workers" && i + 1 < argc) opt.workers = std::atoi(argv[++i]);
+        else if (arg == "--replicas" && i + 1 < argc) opt.replicas = std::atoi(argv[++i]);
+        else if (arg == "--seed" && i + 1 < argc) opt.seed = std::atol(argv[++i]);
+        else if (arg == "--burnin" && i + 1 < argc) {
+            const std::string value = argv[++i];
+            opt.burnin_auto = value == "auto";  // letzte Angabe gilt (z.B. Warmstart nach --burnin auto)
+            if (!opt.burnin_auto) opt.burnin = std::atol(value.c_str());
+        }
+        else if (arg == "--thin" && i + 1 < argc) {
+            const std::string value = argv[++i];
+            opt.thin_auto = value == "auto";
+            if (!opt.thin_auto) opt.thin = std::atoi(value.c_str());
+        }
+        else if (arg == "--thin-max" && i + 1 < argc) opt.thin_max = std::atoi(argv[++i]);
+        else if (arg == "--max-sweeps" && i + 1 < argc) opt.max_sweeps = std::atol(argv[++i]);
+        else if (arg == "--step-width" && i + 1 < argc) {
+            const std::string value = argv[++i];
+            opt.step_auto = value == "auto";
+            if (!opt.step_auto) opt.step_width = std::atof(value.c_str());
+        }
+        else if (arg == "--target-acceptance" && i + 1 < argc) opt.target_acceptance = std::atof(argv[++i]);
+        else if (arg == "--overrelax" && i + 1 < argc) opt.overrelax = std::atoi(argv[++i]);
+        else if (arg == "--burnin-min" && i + 1 < argc) opt.burnin_min = std::atol(argv[++i]);
+        else if (arg == "--burnin-max" && i + 1 < argc) opt.burnin_max = std::atol(argv[++i]);
+        else if (arg == "--burnin-cold") opt.burnin_cold = true;
+        else if (arg == "--checkpoint-out" && i + 1 < argc) opt.checkpoint_out = argv[++i];
+        else if (arg == "--checkpoint-every" && i + 1 < argc) opt.checkpoint_every = std::atol(argv[++i]);
+        else if (arg == "--resume-from" && i + 1 < argc) opt.resume_from = argv[++i];
+        else if (arg == "--progress" && i + 1 < argc) progress_format = argv[++i];
+        else if (arg == "--progress-every" && i + 1 < argc) progress_every = std::atof(argv[++i]);
+        else if (arg == "--progress-out" && i + 1 < argc) progress_out = argv[++i];
+        else if (arg == "--bench") opt.bench = true;
+        else if (arg == "--bench-repeats" && i + 1 < argc) opt.bench_repeats = std::atoi(argv[++i]);
     }
 
-    std::ostringstream filename;
-    filename << "results/results_" << model << "_L" << L << "_T" << std::fixed << std::setprecision(2) << T << ".csv";
-    std::ofstream output(filename.str());
-    output << "step,energy,magnetization,energy_squared,magnetization_squared\n";
-
-
-    if (model == "Ising") {
-        auto sim = std::make_unique<IsingModel>(L, T, J);
-    
-        const int burnin_sweeps = 2000;  // thermalisieren
-        const int thin          = 5;    // Sweeps pro Messung
-        const int samples       = steps; // steps = Anzahl Messungen
-        const int lattice_every_samples = std::max(1, samples / 20);     
-        // Burn-in
-        for (int s = 0; s < burnin_sweeps; ++s) sim->metropolis_sweep();
-    
-        // Messphase: genau 'samples' Messungen
-        for (int k = 0; k < samples; ++k) {
-            // zwischen Messungen 'thin' Sweeps
-            for (int t = 0; t < thin; ++t) sim->metropolis_sweep();
-    
-            double energy        = sim->compute_energy();        // TOTAL E
-            double magnetization = sim->compute_magnetization(); // TOTAL M
-    
-            // CSV: k ist Messindex (0..samples-1)
-            output << k << "," << energy << "," << magnetization << ","
-                   << (energy * energy) << "," << (magnetization * magnetization) << "\n";
-    
-            // Lattice NACH jeder 1000. Messung (also bei 1000, 2000, ...)
-            if ( (k + 1) % lattice_every_samples == 0 ) {
-                std::ostringstream lattice_filename;
-                lattice_filename << "results/lattice_" << model
-                << "_L" << L
-                << "_T" << std::fixed << std::setprecision(2) << T
-                << "_" << (k + 1) << ".csv";
-
-                sim->save_lattice(lattice_filename.str());
+    std::vector<double> temperatures;  // nicht leer → Parallel Tempering (--anneal: eine Kette nacheinander)
+    try {
+        opt.format = parse_output_format(format_name);
+        opt.multispin = sweep_name == "msc";
+        opt.sweep_mode = parse_sweep_mode(opt.multispin ? "checkerboard" : sweep_name);
+        opt.algorithm = parse_algorithm(algorithm_name);
+        if (!t_list.empty()) temperatures = parse_temperature_list(t_list);
+        else if (!t_range.empty()) temperatures = parse_temperature_range(t_range);
+        if (opt.swap_every < 1) throw std::invalid_argument("--swap-every must be >= 1");
+        if (opt.burnin_min < 0 || opt.burnin_max < opt.burnin_min) {
+            throw std::invalid_argument("--burnin-min/--burnin-max must satisfy 0 <= min <= max");
+        }
+        if (opt.thin < 1 || opt.thin_max < 1) throw std::invalid_argument("--thin and --thin-max must be >= 1");
+        if (opt.max_sweeps < 0) throw std::invalid_argument("--max-sweeps must be >= 0");
+        if (opt.anneal && temperatures.empty()) throw std::invalid_argument("--anneal needs --T-list or --T-range");
+        if (opt.anneal_burnin < 0) throw std::invalid_argument("--anneal-burnin must be >= 0");
+        if (opt.thin_auto && !temperatures.empty() && !opt.anneal) {
+            throw std::invalid_argument("--thin auto is not supported with parallel tempering");
+        }
+        if (opt.multispin && model != "Ising") throw std::invalid_argument("--sweep msc is only available for the Ising model");
+        if (opt.algorithm == Algorithm::HeatBath && model != "Clock") {
+            throw std::invalid_argument("--algorithm heatbath is only available for the Clock model");
+        }
+        if (opt.multispin && opt.algorithm != Algorithm::Metropolis) {
+            throw std::invalid_argument("--sweep msc supports only --algorithm metropolis");
+        }
+        if (opt.multispin && (L < 64 || L % 64 != 0)) {
+            throw std::invalid_argument("--sweep msc needs L to be a multiple of 64");
+        }
+        if ((opt.step_auto || opt.step_width != 0.0 || opt.overrelax != 0) && model != "XY") {
+            throw std::invalid_argument("--step-width and --overrelax are only available for the XY model");
+        }
+        if (opt.step_width < 0.0 || opt.overrelax < 0) throw std::invalid_argument("--step-width and --overrelax must be >= 0");
+        if (!(opt.target_acceptance > 0.0 && opt.target_acceptance < 1.0)) {
+            throw std::invalid_argument("--target-acceptance must be in (0, 1)");
+        }
+        if (!progress_format.empty() && progress_format != "jsonl") {
+            throw std::invalid_argument("Unknown progress format: " + progress_format + " (expected jsonl)");
+        }
+        if (!(progress_every > 0.0)) throw std::invalid_argument("--progress-every must be > 0");
+        if (opt.replicas < 0) throw std::invalid_argument("--replicas must be >= 0");
+        if (opt.bench && (!temperatures.empty() || opt.replicas > 0 || opt.burnin_auto
+                          || !opt.checkpoint_out.empty() || !opt.resume_from.empty() || !progress_format.empty())) {
+            throw std::invalid_argument("--bench times a single chain: no --T-list/--T-range, --replicas, "
+                                        "--burnin auto, checkpoints or --progress");
+        }
+        if (opt.bench && (steps < 1 || opt.bench_repeats < 1)) {
+            throw std::invalid_argument("--bench needs --steps >= 1 and --bench-repeats >= 1");
+        }
+        if (opt.replicas > 0 && !temperatures.empty()) {
+            throw std::invalid_argument("--replicas cannot be combined with --T-list/--T-range");
+        }
+        if ((opt.replicas > 0 || !temperatures.empty())
+            && !(opt.checkpoint_out.empty() && opt.resume_from.empty())) {
+            throw std::invalid_argument("checkpoints are only supported for single runs");
+        }
+    } catch (const std::exception& e) {
+        std::cerr << e.what() << std::endl;
+        return 1;
+    }
+    std::ofstream progress_file;
+    std::unique_ptr<ProgressReporter> progress;
+    if (!progress_format.empty()) {
+        if (!progress_out.empty()) {
+            progress_file.open(progress_out);
+            if (!progress_file) {
+                std::cerr << "Cannot open progress output: " << progress_out << std::endl;
+                return 1;
             }
         }
+        progress = std::make_unique<ProgressReporter>(progress_out.empty() ? std::cout : progress_file, progress_every);
+        opt.progress = progress.get();
     }
+    const bool bench = opt.bench;
+    const bool anneal = opt.anneal;
+    const bool tempering = !temperatures.empty() && !anneal;
+    const bool batch = opt.replicas > 0;
 
-    else if (model == "Clock") {
-        const int M = 6;
-        auto sim = std::make_unique<ClockModel>(L, M, T, J);
-    
-        const int burnin_sweeps = 2000;             // raise near critical region if needed
-        const int thin          = 5;                // sweeps per measurement
-        const int samples       = steps;            // UI "steps" = number of stored measurements
-        const int lattice_every_samples = 500;      // dump a lattice every 500 measurements
-    
-        // Burn-in
-        for (int s = 0; s < burnin_sweeps; ++s) sim->metropolis_sweep();
-    
-        // Measurement loop: exactly 'samples' rows in CSV
-        for (int k = 0; k < samples; ++k) {
-            for (int t = 0; t < thin; ++t) sim->metropolis_sweep();
-    
-            double energy        = sim->compute_energy();        // TOTAL E
-            double magnetization = sim->compute_magnetization(); // TOTAL |M|
-            output << k << "," << energy << "," << magnetization << ","
-                   << (energy*energy) << "," << (magnetization*magnetization) << "\n";
-    
-            if ((k + 1) % lattice_every_samples == 0) {
-                std::ostringstream lattice_filename;
-                lattice_filename << "results/lattice_" << model
-                << "_L" << L
-                << "_T" << std::fixed << std::setprecision(2) << T
-                << "_" << (k + 1) << ".csv";
-               sim->save_lattice(lattice_filename.str());
+    try {
+        if (model == "Ising" && opt.multispin) {
+            const int every = std::max(1, steps / 20);
+            if (bench) {
+                auto sim = std::make_unique<MultiSpinIsingModel>(L, T, J);
+                run_benchmark(*sim, model, L, T, steps, opt);
+            } else if (tempering) {
+                run_tempering<MultiSpinIsingModel>([&](double t) { return std::make_unique<MultiSpinIsingModel>(L, t, J); },
+                                                   model, L, temperatures, steps, every, opt);
+            } else if (anneal) {
+                auto sim = std::make_unique<MultiSpinIsingModel>(L, temperatures[0], J);
+                run_anneal(*sim, model, L, temperatures, steps, every, opt);
+            } else if (batch) {
+                run_replica_batch<MultiSpinIsingModel>([&] { return std::make_unique<MultiSpinIsingModel>(L, T, J); },
+                                                       model, L, T, steps, every, opt);
+            } else {
+                auto sim = std::make_unique<MultiSpinIsingModel>(L, T, J);
+                run_simulation(*sim, model, L, T, steps, every, opt);
             }
         }
-    }
-    
-    else if (model == "XY") {
-        auto sim = std::make_unique<XYModel>(L, T, J);
-    
-        const int burnin_sweeps = 2000;
-        const int thin          = 5;
-        const int samples       = steps;
-        const int lattice_every_samples = 500;
-    
-        for (int s = 0; s < burnin_sweeps; ++s) sim->metropolis_sweep();
-    
-        for (int k = 0; k < samples; ++k) {
-            for (int t = 0; t < thin; ++t) sim->metropolis_sweep();
-    
-            double energy        = sim->compute_energy();        // TOTAL E
-            double magnetization = sim->compute_magnetization(); // TOTAL |M|
-            output << k << "," << energy << "," << magnetization << ","
-                   << (energy*energy) << "," << (magnetization*magnetization) << "\n";
-    
-            if ((k + 1) % lattice_every_samples == 0) {
-                std::ostringstream lattice_filename;
-                lattice_filename << "results/lattice_" << model
-                << "_L" << L
-                << "_T" << std::fixed << std::setprecision(2) << T
-                << "_" << (k + 1) << ".csv";
-               sim->save_lattice(lattice_filename.str());
+        else if (model == "Ising") {
+            const int every = std::max(1, steps / 20);
+            if (bench) {
+                auto sim = std::make_unique<IsingModel>(L, T, J);
+                run_benchmark(*sim, model, L, T, steps, opt);
+            } else if (tempering) {
+                run_tempering<IsingModel>([&](double t) { return std::make_unique<IsingModel>(L, t, J); },
+                                          model, L, temperatures, steps, every, opt);
+            } else if (anneal) {
+                auto sim = std::make_unique<IsingModel>(L, temperatures[0], J);
+                run_anneal(*sim, model, L, temperatures, steps, every, opt);
+            } else if (batch) {
+                run_replica_batch<IsingModel>([&] { return std::make_unique<IsingModel>(L, T, J); },
+                                              model, L, T, steps, every, opt);
+            } else {
+                auto sim = std::make_unique<IsingModel>(L, T, J);
+                run_simulation(*sim, model, L, T, steps, every, opt);
             }
         }
-    }
-    
-
-    else {
-        std::cerr << "Unknown model: " << model << std::endl;
+        else if (model == "Clock") {
+            const int M = 6;
+            if (bench) {
+                auto sim = std::make_unique<ClockModel>(L, M, T, J);
+                run_benchmark(*sim, model, L, T, steps, opt);
+            } else if (tempering) {
+                run_tempering<ClockModel>([&](double t) { return std::make_unique<ClockModel>(L, M, t, J); },
+                                          model, L, temperatures, steps, 500, opt);
+            } else if (anneal) {
+                auto sim = std::make_unique<ClockModel>(L, M, temperatures[0], J);
+                run_anneal(*sim, model, L, temperatures, steps, 500, opt);
+            } else if (batch) {
+                run_replica_batch<ClockModel>([&] { return std::make_unique<ClockModel>(L, M, T, J); },
+                                              model, L, T, steps, 500, opt);
+            } else {
+                auto sim = std::make_unique<ClockModel>(L, M, T, J);
+                run_simulation(*sim, model, L, T, steps, 500, opt);  // dump a lattice every 500 measurements
+            }
+        }
+        else if (model == "XY") {
+            if (bench) {
+                auto sim = std::make_unique<XYModel>(L, T, J);
+                run_benchmark(*sim, model, L, T, steps, opt);
+            } else if (tempering) {
+                run_tempering<XYModel>([&](double t) { return std::make_unique<XYModel>(L, t, J); },
+                                       model, L, temperatures, steps, 500, opt);
+            } else if (anneal) {
+                auto sim = std::make_unique<XYModel>(L, temperatures[0], J);
+                run_anneal(*sim, model, L, temperatures, steps, 500, opt);
+            } else if (batch) {
+                run_replica_batch<XYModel>([&] { return std::make_unique<XYModel>(L, T, J); },
+                                           model, L, T, steps, 500, opt);
+            } else {
+                auto sim = std::make_unique<XYModel>(L, T, J);
+                run_simulation(*sim, model, L, T, steps, 500, opt);
+            }
+        }
+        else {
+            std::cerr << "Unknown model: " << model << std::endl;
+            return 1;
+        }
+    } catch (const std::exception& e) {
+        std::cerr << "Error: " << e.what() << std::endl;
         return 1;
     }
 
-    output.close();
     return 0;
 }
@@ -1,92 +1,322 @@
-
 // clock_model.cpp
 #include "../include/clock_model.hpp"
 #include <cmath>
 #include <fstream>
+#include <algorithm>
+#include <limits>
+
+namespace {
+
+constexpr int heat_bath_buffer = 64;  // Zustände mit kumulierten Gewichten auf dem Stack
+
+}  // namespace
 
 ClockModel::ClockModel(int L, int M, double T, double J)
     : L(L), M(M), T(T), J(J),
-      lattice(L, std::vector<int>(L)),
-      dist_site(0, L - 1),
-      dist_real(0.0, 1.0)
+      lattice(static_cast<std::size_t>(L) * L),
+      nbr(build_neighbor_table(L)),
+      gen(random_seed()),
+      rand_sites(lattice.size()),
+      rand_shift(lattice.size()),
+      rand_accept(lattice.size())
 {
-    std::random_device rd;
-    gen.seed(rd());
+    if (M < 2 || M - 1 > static_cast<int>(std::numeric_limits<spin_type>::max())) {
+        throw std::invalid_argument("Clock model needs 2 <= M <= " + std::to_string(std::numeric_limits<spin_type>::max() + 1)
+                                    + " with the configured lattice type, got M=" + std::to_string(M));
+    }
+    cos_table.resize(M);
+    sin_table.resize(M);
+    for (int d = 0; d < M; ++d) {
+        cos_table[d] = std::cos(2.0 * M_PI * d / M);
+        sin_table[d] = std::sin(2.0 * M_PI * d / M);
+    }
+    build_heat_bath_table();
+
     init_lattice();
+    cluster_ws.resize(L * L);
+    refresh_observables();
+    mirror_proj.resize(M);
 }
 
 void ClockModel::init_lattice() {
-    std::uniform_int_distribution<int> state_dist(0, M - 1);
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            lattice[i][j] = state_dist(gen);
-        }
+    for (auto& m : lattice) {
+        m = static_cast<spin_type>(uniform_index(gen, static_cast<std::uint32_t>(M)));
     }
 }
 
-double ClockModel::spin_dot(int m1, int m2) const {
-    double angle = 2.0 * M_PI * (m1 - m2) / M;
-    return std::cos(angle);
-}
+void ClockModel::update_site(int s, int shift, double r, Observables& delta) {
+    int old_state = lattice[s];
 
-void ClockModel::metropolis_update() {
-    int i = dist_site(gen);
-    int j = dist_site(gen);
-    int old_state = lattice[i][j];
-
-    // Propose a new state different from the old one
-    int new_state = old_state;
-    while (new_state == old_state) {
-        new_state = std::uniform_int_distribution<int>(0, M - 1)(gen);
-    }
+    // Propose a new state different from the old one (uniform over the other M-1 states)
+    int new_state = (old_state + 1 + shift) % M;
 
     // Compute local energy difference
-    std::vector<std::pair<int, int>> neighbors = {
-        { (i - 1 + L) % L, j },
-        { (i + 1) % L, j },
-        { i, (j - 1 + L) % L },
-        { i, (j + 1) % L }
-    };
+    const int* nb = &nbr[4 * s];
+    double dbond = 0.0;
+    for (int k = 0; k < 4; ++k) {
+        int neighbor = lattice[nb[k]];
+        dbond += spin_dot(new_state, neighbor) - spin_dot(old_state, neighbor);
+    }
+    const double deltaE = -J * dbond;  // compute_energy() zählt -J * cos pro Bindung
 
-    double deltaE = 0.0;
-    for (const auto& [ni, nj] : neighbors) {
-        int neighbor = lattice[ni][nj];
-        deltaE += J * (spin_dot(new_state, neighbor) - spin_dot(old_state, neighbor));
+    if (deltaE <= 0.0 || r < std::exp(-deltaE / T)) {
+        lattice[s] = static_cast<spin_type>(new_state);
+        delta.energy += deltaE;
+        delta.mx += cos_table[new_state] - cos_table[old_state];
+        delta.my += sin_table[new_state] - sin_table[old_state];
     }
+}
 
-    if (deltaE <= 0.0 || dist_real(gen) < std::exp(-deltaE / T)) {
-        lattice[i][j] = new_state;
+// Unbedingtes Setzen (Cluster-Updates, deterministischer Debug-Pfad) inkl. Observablen
+void ClockModel::set_state(int s, int new_state, Observables& delta) {
+    const int old_state = lattice[s];
+    const int* nb = &nbr[4 * s];
+    double dbond = 0.0;
+    for (int k = 0; k < 4; ++k) {
+        int neighbor = lattice[nb[k]];
+        dbond += spin_dot(new_state, neighbor) - spin_dot(old_state, neighbor);
     }
+    lattice[s] = static_cast<spin_type>(new_state);
+    delta.energy -= J * dbond;
+    delta.mx += cos_table[new_state] - cos_table[old_state];
+    delta.my += sin_table[new_state] - sin_table[old_state];
+}
+
+void ClockModel::metropolis_update() {
+    const int s = static_cast<int>(uniform_index(gen, static_cast<std::uint32_t>(L * L)));
+    const int shift = static_cast<int>(uniform_index(gen, static_cast<std::uint32_t>(M - 1)));
+    update_site(s, shift, uniform01(gen), obs);
 }
 
 double ClockModel::compute_energy() const {
     double energy = 0.0;
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            int m = lattice[i][j];
-            int right = lattice[i][(j + 1) % L];
-            int down  = lattice[(i + 1) % L][j];
+    for (int s = 0; s < L * L; ++s) {
+        int m = lattice[s];
+        int right = lattice[nbr[4 * s + 3]];
+        int down  = lattice[nbr[4 * s + 1]];
 
-            energy -= J * (spin_dot(m, right) + spin_dot(m, down));
-        }
+        energy -= J * (spin_dot(m, right) + spin_dot(m, down));
     }
     return energy;
 }
 
 void ClockModel::metropolis_sweep() {
-    for (int n = 0; n < L*L; ++n) {
-        metropolis_update();
+    // Plätze, Vorschläge und Zufallszahlen eines Sweeps vorab in einem Block
+    const std::size_t n = lattice.size();
+    fill_index(gen, rand_sites.data(), n, static_cast<std::uint32_t>(n));
+    fill_index(gen, rand_shift.data(), n, static_cast<std::uint32_t>(M - 1));
+    fill_uniform(gen, rand_accept.data(), n);
+    for (std::size_t k = 0; k < n; ++k) {
+        update_site(static_cast<int>(rand_sites[k]), static_cast<int>(rand_shift[k]), rand_accept[k], obs);
+    }
+}
+
+void ClockModel::checkerboard_sweep() {
+    const int threads = checkerboard_threads(n_threads, L);
+    Observables delta;
+    for (int parity = 0; parity < 2; ++parity) {
+        #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1) reduction(+ : delta)
+        for (int i = 0; i < L; ++i) {
+            const int t = current_thread_id();
+            Rng& rng = (t == 0) ? gen : thread_gens[t - 1];
+            for (int j = (i + parity) & 1; j < L; j += 2) {
+                const int shift = static_cast<int>(uniform_index(rng, static_cast<std::uint32_t>(M - 1)));
+                update_site(i * L + j, shift, uniform01(rng), delta);
+            }
+        }
+    }
+    obs += delta;
+}
+
+void ClockModel::build_heat_bath_table() {
+    heat_bath_weight.resize(2 * M);
+    for (int d = 0; d < 2 * M; ++d) {
+        heat_bath_weight[d] = std::exp(J / T * (cos_table[d % M] - 1.0));
+    }
+}
+
+void ClockModel::set_temperature(double new_T) {
+    T = new_T;
+    build_heat_bath_table();
+}
+
+// Zieht den neuen Zustand von s aus P(m) ∝ Π_k w[m - n_k + M]: kumulierte Gewichte auf dem
+// Stack, neuer Zustand = Anzahl der Teilsummen <= u * Summe (verzweigungsfrei, kein exp pro
+// Update). Mehr als heat_bath_buffer Zustände: zweiter Durchlauf statt Puffer.
+int ClockModel::heat_bath_state(int s, double u) const {
+    const int* nb = &nbr[4 * s];
+    const double* w0 = &heat_bath_weight[M - lattice[nb[0]]];
+    const double* w1 = &heat_bath_weight[M - lattice[nb[1]]];
+    const double* w2 = &heat_bath_weight[M - lattice[nb[2]]];
+    const double* w3 = &heat_bath_weight[M - lattice[nb[3]]];
+    double cumulative[heat_bath_buffer];
+    const bool buffered = M <= heat_bath_buffer;
+    double total = 0.0;
+    for (int m = 0; m < M; ++m) {
+        total += w0[m] * w1[m] * w2[m] * w3[m];
+        if (buffered) cumulative[m] = total;
+    }
+
+    if (!(total > std::numeric_limits<double>::min())) {
+        // J/T so groß, dass alle Gewichte unterlaufen: exp relativ zum besten Zustand
+        auto field = [&](int m) {
+            return spin_dot(m, lattice[nb[0]]) + spin_dot(m, lattice[nb[1]]) + spin_dot(m, lattice[nb[2]]) + spin_dot(m, lattice[nb[3]]);
+        };
+        double best = field(0);
+        for (int m = 1; m < M; ++m) best = std::max(best, field(m));
+        total = 0.0;
+        for (int m = 0; m < M; ++m) total += std::exp(J / T * (field(m) - best));
+        double r = u * total;
+        for (int m = 0; m < M - 1; ++m) {
+            r -= std::exp(J / T * (field(m) - best));
+            if (r < 0.0) return m;
+        }
+        return M - 1;
+    }
+
+    const double r = u * total;
+    if (buffered) {
+        int state = 0;
+        for (int m = 0; m < M - 1; ++m) state += cumulative[m] <= r;
+        return state;
+    }
+    double rest = r;
+    for (int m = 0; m < M - 1; ++m) {
+        rest -= w0[m] * w1[m] * w2[m] * w3[m];
+        if (rest < 0.0) return m;
+    }
+    return M - 1;
+}
+
+void ClockModel::heat_bath_site(int s, double u, Observables& delta) {
+    const int old_state = lattice[s];
+    const int new_state = heat_bath_state(s, u);
+    if (new_state == old_state) return;
+    const int* nb = &nbr[4 * s];
+    double hx = 0.0, hy = 0.0;  // Feld der Nachbarn: Σ_k cos(θ_m - θ_k) = cos θ_m hx + sin θ_m hy
+    for (int k = 0; k < 4; ++k) {
+        hx += cos_table[lattice[nb[k]]];
+        hy += sin_table[lattice[nb[k]]];
+    }
+    const double dcx = cos_table[new_state] - cos_table[old_state];
+    const double dcy = sin_table[new_state] - sin_table[old_state];
+    lattice[s] = static_cast<spin_type>(new_state);
+    delta.energy -= J * (dcx * hx + dcy * hy);
+    delta.mx += dcx;
+    delta.my += dcy;
+}
+
+void ClockModel::heat_bath_sweep() {
+    if (sweep_mode == SweepMode::Checkerboard) {
+        const int threads = checkerboard_threads(n_threads, L);
+        Observables delta;
+        for (int parity = 0; parity < 2; ++parity) {
+            #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1) reduction(+ : delta)
+            for (int i = 0; i < L; ++i) {
+                const int t = current_thread_id();
+                Rng& rng = (t == 0) ? gen : thread_gens[t - 1];
+                for (int j = (i + parity) & 1; j < L; j += 2) {
+                    heat_bath_site(i * L + j, uniform01(rng), delta);
+                }
+            }
+        }
+        obs += delta;
+        return;
+    }
+    const std::size_t n = lattice.size();
+    fill_index(gen, rand_sites.data(), n, static_cast<std::uint32_t>(n));
+    fill_uniform(gen, rand_accept.data(), n);
+    for (std::size_t k = 0; k < n; ++k) {
+        heat_bath_site(static_cast<int>(rand_sites[k]), rand_accept[k], obs);
+    }
+}
+
+void ClockModel::sweep() {
+    switch (algorithm) {
+        case Algorithm::Wolff:        wolff_sweep(); break;
+        case Algorithm::SwendsenWang: swendsen_wang_sweep(); break;
+        case Algorithm::HeatBath:     heat_bath_sweep(); break;
+        default:
+            if (sweep_mode == SweepMode::Checkerboard) checkerboard_sweep();
+            else metropolis_sweep();
+    }
+}
+
+void ClockModel::wolff_sweep() {
+    // Sweep-äquivalent: im Mittel ~N geflippte Spins (Clusteranzahl vorab festgelegt)
+    const int n_clusters = cluster_ws.clusters_per_sweep(L * L);
+    int flipped = 0;
+    for (int c = 0; c < n_clusters; ++c) flipped += wolff_update();
+    cluster_ws.record_clusters(n_clusters, flipped);
+}
+
+// Embedded Ising: mirror line at angle pi*k/M maps state m -> (k - m) mod M,
+// the projection onto its normal is sin(2 pi m / M - pi k / M).
+int ClockModel::draw_mirror() {
+    const int k = static_cast<int>(uniform_index(gen, static_cast<std::uint32_t>(M)));
+    for (int m = 0; m < M; ++m) {
+        mirror_proj[m] = std::sin(2.0 * M_PI * m / M - M_PI * k / M);
+    }
+    return k;
+}
+
+int ClockModel::wolff_update() {
+    const int k = draw_mirror();
+    return wolff_cluster(cluster_ws, nbr, L * L, J / T,
+                         [this](int s) { return mirror_proj[lattice[s]]; },
+                         [this, k](int s) { set_state(s, ((k - lattice[s]) % M + M) % M, obs); }, gen);
+}
+
+int ClockModel::swendsen_wang_sweep() {
+    const int k = draw_mirror();
+    return swendsen_wang_step(cluster_ws, nbr, L * L, J / T,
+                              [this](int s) { return mirror_proj[lattice[s]]; },
+                              [this, k](int s) { set_state(s, ((k - lattice[s]) % M + M) % M, obs); }, gen);
+}
+
+void ClockModel::set_threads(int n) {
+    n_threads = std::max(1, n);
+    thread_gens = split_thread_engines(gen, n_threads);  // the main stream stays independent of the thread count
+}
+
+void ClockModel::randomize_lattice() {
+    init_lattice();
+    refresh_observables();
+}
+
+void ClockModel::set_seed(std::uint64_t seed, int replica) {
+    gen = make_stream(seed, replica);
+    set_threads(n_threads);
+}
+
+double ClockModel::current_energy() const {
+    if (check_observables) check_tracked_observable("energy", obs.energy, compute_energy(), L * L);
+    return obs.energy;
+}
+
+double ClockModel::current_magnetization() const {
+    const double m = std::sqrt(obs.mx * obs.mx + obs.my * obs.my);
+    if (check_observables) check_tracked_observable("magnetization", m, compute_magnetization(), L * L);
+    return m;
+}
+
+void ClockModel::refresh_observables() {
+    for (int m : lattice) {
+        if (m < 0 || m >= M) throw std::invalid_argument("Clock state out of range [0, M)");
+    }
+    obs.energy = compute_energy();
+    obs.mx = obs.my = 0.0;
+    for (int m : lattice) {
+        obs.mx += cos_table[m];
+        obs.my += sin_table[m];
     }
 }
 
 double ClockModel::compute_magnetization() const {
     double mx = 0.0, my = 0.0;
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            double angle = 2.0 * M_PI * lattice[i][j] / M;
-            mx += std::cos(angle);
-            my += std::sin(angle);
-        }
+    for (int m : lattice) {
+        mx += cos_table[m];
+        my += sin_table[m];
     }
     return std::sqrt(mx*mx + my*my);  // <-- no /N
 }
@@ -95,7 +325,7 @@ void ClockModel::save_lattice(const std::string& filename) const {
     std::ofstream file(filename);
     for (int i = 0; i < L; ++i) {
         for (int j = 0; j < L; ++j) {
-            file << lattice[i][j];
+            file << +lattice[i * L + j];
             if (j < L - 1) file << ",";
         }
         file << "\n";
@@ -103,35 +333,43 @@ void ClockModel::save_lattice(const std::string& filename) const {
 }
 
 void ClockModel::set_lattice(const std::vector<std::vector<int>>& new_lattice) {
-    lattice = new_lattice;
+    const std::vector<int> flat = flatten_lattice(new_lattice, L);
+    load_lattice(narrow_lattice<spin_type>(flat.data(), flat.size()).data());
+}
+
+void ClockModel::load_lattice(const spin_type* values) {
+    for (int s = 0; s < L * L; ++s) {
+        // ein Vergleich für beide Grenzen: negative Werte (nur bei vorzeichenbehaftetem
+        // MCMC_CLOCK_STATE_TYPE möglich, Standard uint8) werden unsigned sehr groß
+        if (static_cast<unsigned>(values[s]) >= static_cast<unsigned>(M)) {
+            throw std::invalid_argument("Clock state out of range [0, M)");
+        }
+    }
+    std::copy(values, values + L * L, lattice.begin());
+    refresh_observables();
 }
 
 bool ClockModel::metropolis_update_deterministic(int i, int j) {
-    int old_state = lattice[i][j];
-    int new_state = forced_state >= 0 ? forced_state : old_state;
+    const int s = i * L + j;
+    int old_state = lattice[s];
+    int new_state = forced_state >= 0 ? forced_state % M : old_state;
 
     if (new_state == old_state) {
         return false; // Kein echter Vorschlag
     }
 
-    std::vector<std::pair<int, int>> neighbors = {
-        { (i - 1 + L) % L, j },
-        { (i + 1) % L, j },
-        { i, (j - 1 + L) % L },
-        { i, (j + 1) % L }
-    };
-
+    const int* nb = &nbr[4 * s];
     double deltaE = 0.0;
-    for (const auto& [ni, nj] : neighbors) {
-        int neighbor = lattice[ni][nj];
-        deltaE += J * (spin_dot(new_state, neighbor) - spin_dot(old_state, neighbor));
+    for (int k = 0; k < 4; ++k) {
+        int neighbor = lattice[nb[k]];
+        deltaE -= J * (spin_dot(new_state, neighbor) - spin_dot(old_state, neighbor));
     }
 
-    double r = forced_random >= 0.0 ? forced_random : dist_real(gen);
+    double r = forced_random >= 0.0 ? forced_random : uniform01(gen);
     double threshold = std::exp(-deltaE / T);
 
     if (deltaE <= 0.0 || r < threshold) {
-        lattice[i][j] = new_state;
+        set_state(s, new_state, obs);
         return true;
     }
     return false;
@@ -3,71 +3,165 @@
 #include <cmath>
 #include <iostream>
 #include <fstream>
+#include <algorithm>
 
 IsingModel::IsingModel(int L, double T, double J)
     : L(L), T(T), J(J),
-      lattice(L, std::vector<int>(L)),
-      dist_int(0, L - 1),
-      dist_real(0.0, 1.0)
+      lattice(static_cast<std::size_t>(L) * L),
+      nbr(build_neighbor_table(L)),
+      gen(random_seed()),
+      rand_sites(lattice.size()),
+      rand_accept(lattice.size())
 {
-    std::random_device rd;
-    gen.seed(rd());
+    build_acceptance_table();
     init_lattice();
+    cluster_ws.resize(L * L);
+    refresh_observables();
 }
 
 void IsingModel::init_lattice() {
-    std::uniform_int_distribution<int> spin_dist(0, 1);
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            lattice[i][j] = spin_dist(gen) == 0 ? -1 : +1;
-        }
+    for (auto& s : lattice) {
+        s = static_cast<spin_type>(uniform_index(gen, 2) == 0 ? -1 : +1);
     }
 }
 
-void IsingModel::metropolis_update() {
-    int i = dist_int(gen);
-    int j = dist_int(gen);
+// dE = 2 J s * neighbour_sum kann nur fünf Werte annehmen → exp() einmal pro Temperatur
+void IsingModel::build_acceptance_table() {
+    for (int k = 0; k < 5; ++k) {
+        const double deltaE = 2.0 * J * (2 * k - 4);
+        accept_prob[k] = std::exp(-deltaE / T);
+    }
+}
 
-    int spin = lattice[i][j];
-    int up    = lattice[(i - 1 + L) % L][j];
-    int down  = lattice[(i + 1) % L][j];
-    int left  = lattice[i][(j - 1 + L) % L];
-    int right = lattice[i][(j + 1) % L];
+void IsingModel::set_temperature(double new_T) {
+    T = new_T;
+    build_acceptance_table();
+}
 
-    int neighbor_sum = up + down + left + right;
-    double deltaE = 2.0 * J * spin * neighbor_sum;
+void IsingModel::update_site(int s, double r, Observables& delta) {
+    const int* nb = &nbr[4 * s];
+    int spin = lattice[s];
+    int local = spin * (lattice[nb[0]] + lattice[nb[1]] + lattice[nb[2]] + lattice[nb[3]]);
 
-    if (deltaE <= 0.0 || dist_real(gen) < std::exp(-deltaE / T)) {
-        lattice[i][j] = -spin;
+    // dE <= 0  <=>  J * local <= 0
+    if (J * local <= 0.0 || r < accept_prob[(local + 4) / 2]) {
+        lattice[s] = static_cast<spin_type>(-spin);
+        delta.energy += 2.0 * J * local;
+        delta.mx -= 2.0 * spin;
     }
 }
 
+// Unbedingter Flip (Cluster-Updates, deterministischer Debug-Pfad) inkl. Observablen
+void IsingModel::flip_spin(int s, Observables& delta) {
+    const int* nb = &nbr[4 * s];
+    int spin = lattice[s];
+    int local = spin * (lattice[nb[0]] + lattice[nb[1]] + lattice[nb[2]] + lattice[nb[3]]);
+    lattice[s] = static_cast<spin_type>(-spin);
+    delta.energy += 2.0 * J * local;
+    delta.mx -= 2.0 * spin;
+}
+
+void IsingModel::metropolis_update() {
+    const int s = static_cast<int>(uniform_index(gen, static_cast<std::uint32_t>(L * L)));
+    update_site(s, uniform01(gen), obs);
+}
+
 void IsingModel::metropolis_sweep() {
-    // Führe N = L*L Metropolis-Versuche durch → 1 Sweep
-    for (int n = 0; n < L * L; ++n) {
-        metropolis_update();
+    // N = L*L Metropolis-Versuche → 1 Sweep; Plätze und Zufallszahlen vorab in einem Block
+    const std::size_t n = lattice.size();
+    fill_index(gen, rand_sites.data(), n, static_cast<std::uint32_t>(n));
+    fill_uniform(gen, rand_accept.data(), n);
+    for (std::size_t k = 0; k < n; ++k) {
+        update_site(static_cast<int>(rand_sites[k]), rand_accept[k], obs);
+    }
+}
+
+void IsingModel::checkerboard_sweep() {
+    // Erst alle geraden (i+j), dann alle ungeraden Plätze; Zeilen werden auf Threads verteilt
+    const int threads = checkerboard_threads(n_threads, L);
+    Observables delta;
+    for (int parity = 0; parity < 2; ++parity) {
+        #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1) reduction(+ : delta)
+        for (int i = 0; i < L; ++i) {
+            const int t = current_thread_id();
+            Rng& rng = (t == 0) ? gen : thread_gens[t - 1];
+            for (int j = (i + parity) & 1; j < L; j += 2) {
+                update_site(i * L + j, uniform01(rng), delta);
+            }
+        }
     }
+    obs += delta;
+}
+
+void IsingModel::sweep() {
+    switch (algorithm) {
+        case Algorithm::Wolff:        wolff_sweep(); break;
+        case Algorithm::SwendsenWang: swendsen_wang_sweep(); break;
+        default:
+            if (sweep_mode == SweepMode::Checkerboard) checkerboard_sweep();
+            else metropolis_sweep();
+    }
+}
+
+void IsingModel::wolff_sweep() {
+    // Sweep-äquivalent: im Mittel ~N geflippte Spins (Clusteranzahl vorab festgelegt)
+    const int n_clusters = cluster_ws.clusters_per_sweep(L * L);
+    int flipped = 0;
+    for (int c = 0; c < n_clusters; ++c) flipped += wolff_update();
+    cluster_ws.record_clusters(n_clusters, flipped);
+}
+
+int IsingModel::wolff_update() {
+    return wolff_cluster(cluster_ws, nbr, L * L, J / T,
+                         [this](int s) { return static_cast<double>(lattice[s]); },
+                         [this](int s) { flip_spin(s, obs); }, gen);
+}
+
+int IsingModel::swendsen_wang_sweep() {
+    return swendsen_wang_step(cluster_ws, nbr, L * L, J / T,
+                              [this](int s) { return static_cast<double>(lattice[s]); },
+                              [this](int s) { flip_spin(s, obs); }, gen);
+}
+
+void IsingModel::set_threads(int n) {
+    n_threads = std::max(1, n);
+    thread_gens = split_thread_engines(gen, n_threads);  // the main stream stays independent of the thread count
 }
 
 double IsingModel::compute_energy() const {
     double energy = 0.0;
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            int spin = lattice[i][j];
-            int right = lattice[i][(j + 1) % L];
-            int down  = lattice[(i + 1) % L][j];
-            energy -= J * spin * (right + down);
-        }
+    for (int s = 0; s < L * L; ++s) {
+        int spin = lattice[s];
+        int right = lattice[nbr[4 * s + 3]];
+        int down  = lattice[nbr[4 * s + 1]];
+        energy -= J * spin * (right + down);
     }
     return energy;
 }
 
+double IsingModel::current_energy() const {
+    if (check_observables) check_tracked_observable("energy", obs.energy, compute_energy(), L * L);
+    return obs.energy;
+}
+
+double IsingModel::current_magnetization() const {
+    if (check_observables) check_tracked_observable("magnetization", obs.mx, compute_magnetization(), L * L);
+    return obs.mx;
+}
+
+void IsingModel::refresh_observables() {
+    for (int s : lattice) {
+        if (s != 1 && s != -1) throw std::invalid_argument("Ising spins must be -1 or +1");
+    }
+    obs.energy = compute_energy();
+    obs.mx = compute_magnetization();
+    obs.my = 0.0;
+}
+
 double IsingModel::compute_magnetization() const {
     double M = 0.0;
-    for (const auto& row : lattice) {
-        for (int s : row) {
-            M += s;
-        }
+    for (int s : lattice) {
+        M += s;
     }
     return M;
 }
@@ -76,7 +170,7 @@ void IsingModel::save_lattice(const std::string& filename) const {
     std::ofstream file(filename);
     for (int i = 0; i < L; ++i) {
         for (int j = 0; j < L; ++j) {
-            file << lattice[i][j];
+            file << +lattice[i * L + j];
             if (j < L - 1) file << ",";
         }
         file << "\n";
@@ -84,14 +178,28 @@ void IsingModel::save_lattice(const std::string& filename) const {
 }
 
 void IsingModel::set_lattice(const std::vector<std::vector<int>>& new_lattice) {
-    if (new_lattice.size() != L || new_lattice[0].size() != L) {
-        throw std::invalid_argument("Lattice size does not match model dimensions");
+    const std::vector<int> flat = flatten_lattice(new_lattice, L);
+    load_lattice(narrow_lattice<spin_type>(flat.data(), flat.size()).data());
+}
+
+void IsingModel::load_lattice(const spin_type* values) {
+    for (int s = 0; s < L * L; ++s) {
+        if (values[s] != 1 && values[s] != -1) {
+            throw std::invalid_argument("Ising spins must be -1 or +1");
+        }
     }
-    lattice = new_lattice;
+    std::copy(values, values + L * L, lattice.begin());
+    refresh_observables();
 }
 
-void IsingModel::set_seed(unsigned int seed) {
-    gen.seed(seed);
+void IsingModel::randomize_lattice() {
+    init_lattice();
+    refresh_observables();
+}
+
+void IsingModel::set_seed(std::uint64_t seed, int replica) {
+    gen = make_stream(seed, replica);
+    set_threads(n_threads);  // Thread-Engines aus dem neuen Seed ableiten
 }
 
 void IsingModel::set_forced_random(double r) {
@@ -99,11 +207,12 @@ void IsingModel::set_forced_random(double r) {
 }
 
 bool IsingModel::metropolis_update(int i, int j) {
-    int spin = lattice[i][j];
-    int up    = lattice[(i - 1 + L) % L][j];
-    int down  = lattice[(i + 1) % L][j];
-    int left  = lattice[i][(j - 1 + L) % L];
-    int right = lattice[i][(j + 1) % L];
+    const int s = i * L + j;
+    int spin = lattice[s];
+    int up    = lattice[nbr[4 * s + 0]];
+    int down  = lattice[nbr[4 * s + 1]];
+    int left  = lattice[nbr[4 * s + 2]];
+    int right = lattice[nbr[4 * s + 3]];
 
     int neighbor_sum = up + down + left + right;
     double deltaE = 2.0 * J * spin * neighbor_sum;
@@ -112,7 +221,7 @@ bool IsingModel::metropolis_update(int i, int j) {
     if (forced_random >= 0.0) {
         r = forced_random;
     } else {
-        r = dist_real(gen);
+        r = uniform01(gen);
     }
 
     double threshold = std::exp(-deltaE / T);
@@ -124,9 +233,8 @@ bool IsingModel::metropolis_update(int i, int j) {
               << std::endl;
 
     if (deltaE <= 0.0 || r < threshold) {
-        lattice[i][j] = -spin;
+        flip_spin(s, obs);
         return true;
     }
     return false;
 }
-
@@ -0,0 +1,214 @@
+// multispin_ising.cpp
+#include "../include/multispin_ising.hpp"
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+
+namespace {
+
+inline int popcount(std::uint64_t x) {
+#if defined(_MSC_VER)
+    return static_cast<int>(__popcnt64(x));
+#else
+    return __builtin_popcountll(x);
+#endif
+}
+
+inline std::uint64_t rotl1(std::uint64_t x) { return (x << 1) | (x >> 63); }
+inline std::uint64_t rotr1(std::uint64_t x) { return (x >> 1) | (x << 63); }
+
+}  // namespace
+
+MultiSpinIsingModel::MultiSpinIsingModel(int L, double T, double J)
+    : L(L), W(L / 64), T(T), J(J), gen(random_seed())
+{
+    if (L < 64 || L % 64 != 0) {
+        throw std::invalid_argument("Multi-spin coding needs L to be a multiple of 64, got L=" + std::to_string(L));
+    }
+    words.resize(static_cast<std::size_t>(L) * W);
+    build_acceptance_table();
+    randomize_lattice();
+}
+
+void MultiSpinIsingModel::build_acceptance_table() {
+    for (int m = 0; m < 5; ++m) {
+        const double deltaE = 2.0 * J * (4 - 2 * m);  // m anti-aligned Nachbarn
+        const double p = deltaE <= 0.0 ? 1.0 : std::exp(-deltaE / T);
+        const double scaled = std::ldexp(p, 64);
+        always[m] = scaled >= 18446744073709551615.0;  // p == 1 (bis auf Rundung)
+        accept[m] = always[m] ? 0 : static_cast<std::uint64_t>(scaled);
+    }
+    n_stochastic = 0;
+    for (int m = 0; m < 5; ++m) {
+        if (!always[m]) stochastic[n_stochastic++] = m;
+    }
+}
+
+void MultiSpinIsingModel::set_temperature(double new_T) {
+    T = new_T;
+    build_acceptance_table();
+}
+
+void MultiSpinIsingModel::set_algorithm(Algorithm a) {
+    if (a != Algorithm::Metropolis) {
+        throw std::invalid_argument("Multi-spin coding supports only the Metropolis algorithm");
+    }
+}
+
+std::uint64_t MultiSpinIsingModel::colour_mask(int i, int k, int parity) const {
+    // Farbe von Bit b: (i + k + b * W) % 2
+    const bool bit0 = ((i + k) & 1) == parity;
+    if (W % 2 == 0) return bit0 ? ~std::uint64_t(0) : 0;
+    return bit0 ? 0x5555555555555555ULL : 0xAAAAAAAAAAAAAAAAULL;
+}
+
+void MultiSpinIsingModel::update_row(int i, int parity, const std::uint64_t* neighbours, Rng& shared) {
+    std::uint64_t* row = &words[static_cast<std::size_t>(i) * W];
+    const std::uint64_t* up = &neighbours[static_cast<std::size_t>((i - 1 + L) % L) * W];
+    const std::uint64_t* down = &neighbours[static_cast<std::size_t>((i + 1) % L) * W];
+    Rng rng = shared;  // lokale Kopie: Zustand bleibt in Registern (row[] könnte ihn sonst aliasen)
+
+    for (int k = 0; k < W; ++k) {
+        const std::uint64_t mask = colour_mask(i, k, parity);
+        if (!mask) continue;
+        const std::uint64_t s = row[k];
+        // Nachbarn der anderen Farbe werden in diesem Halb-Sweep nicht verändert
+        const std::uint64_t left = k > 0 ? row[k - 1] : rotl1(row[W - 1]);
+        const std::uint64_t right = k < W - 1 ? row[k + 1] : rotr1(row[0]);
+        const std::uint64_t x1 = s ^ up[k], x2 = s ^ down[k], x3 = s ^ left, x4 = s ^ right;
+
+        // bit-sliced: m = Anzahl gesetzter Bits in x1..x4
+        const std::uint64_t s1 = x1 ^ x2, c1 = x1 & x2, s2 = x3 ^ x4, c2 = x3 & x4;
+        const std::uint64_t low = s1 ^ s2, carry = s1 & s2;
+        const std::uint64_t four = c1 & c2, two = c1 ^ c2 ^ carry;
+        const std::uint64_t eq[5] = {~(low | two | four), low & ~two, ~low & two, low & two, four};
+
+        std::uint64_t flip = 0, undecided = 0;
+        for (int m = 0; m < 5; ++m) {
+            if (always[m]) flip |= eq[m] & mask;
+            else undecided |= eq[m] & mask;
+        }
+        // u < accept[m] bitweise, höchstes Bit zuerst: jedes Bit ist entschieden, sobald sein
+        // Zufallsbit vom Schwellwert-Bit seiner Klasse abweicht
+        for (int b = 63; b >= 0 && undecided; --b) {
+            const std::uint64_t r = rng();
+            std::uint64_t p = 0;  // Schwellwert-Bit b jedes Spins
+            for (int c = 0; c < n_stochastic; ++c) {
+                const int m = stochastic[c];
+                p |= eq[m] & (~std::uint64_t(0) * ((accept[m] >> b) & 1));
+            }
+            flip |= undecided & ~r & p;  // u_b = 0 < p_b = 1
+            undecided &= ~(r ^ p);       // u_b == p_b → weiter
+        }
+        row[k] = s ^ flip;
+    }
+    shared = rng;
+}
+
+void MultiSpinIsingModel::sweep() {
+    const int threads = checkerboard_threads(n_threads, L);
+    for (int parity = 0; parity < 2; ++parity) {
+        // Mit Threads schreiben andere Threads ganze Wörter der Zeilen i±1, während diese Zeile sie
+        // liest: verschiedene Bits, aber ein Data Race auf demselben uint64_t. Die Nachbarzeilen
+        // kommen deshalb aus einer Kopie vom Anfang des Halb-Sweeps; ihre hier gelesenen Bits
+        // (andere Farbe) ändern sich darin nicht, das Ergebnis ist also dasselbe.
+        const std::uint64_t* neighbours = words.data();
+        if (threads > 1) {
+            frozen = words;
+            neighbours = frozen.data();
+        }
+        #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1)
+        for (int i = 0; i < L; ++i) {
+            const int t = current_thread_id();
+            update_row(i, parity, neighbours, t == 0 ? gen : thread_gens[t - 1]);
+        }
+    }
+    // Neuzählung per popcount (3 pro Wort) ist billiger als Differenzen pro aktualisiertem Wort
+    refresh_observables();
+}
+
+void MultiSpinIsingModel::set_threads(int n) {
+    n_threads = std::max(1, n);
+    thread_gens = split_thread_engines(gen, n_threads);
+}
+
+void MultiSpinIsingModel::set_seed(std::uint64_t seed, int replica) {
+    gen = make_stream(seed, replica);
+    set_threads(n_threads);
+}
+
+void MultiSpinIsingModel::randomize_lattice() {
+    for (auto& w : words) w = gen();
+    refresh_observables();
+}
+
+double MultiSpinIsingModel::compute_energy() const {
+    long anti = 0;  // anti-parallele Bindungen nach rechts und unten
+    for (int i = 0; i < L; ++i) {
+        const std::uint64_t* row = &words[static_cast<std::size_t>(i) * W];
+        const std::uint64_t* down = &words[static_cast<std::size_t>((i + 1) % L) * W];
+        for (int k = 0; k < W; ++k) {
+            const std::uint64_t right = k < W - 1 ? row[k + 1] : rotr1(row[0]);
+            anti += popcount(row[k] ^ right) + popcount(row[k] ^ down[k]);
+        }
+    }
+    const long bonds = 2L * L * L;
+    return -J * static_cast<double>(bonds - 2 * anti);
+}
+
+double MultiSpinIsingModel::compute_magnetization() const {
+    long up = 0;
+    for (std::uint64_t w : words) up += popcount(w);
+    return static_cast<double>(2 * up - static_cast<long>(L) * L);
+}
+
+double MultiSpinIsingModel::current_energy() const {
+    if (check_observables) check_tracked_observable("energy", obs.energy, compute_energy(), L * L);
+    return obs.energy;
+}
+
+double MultiSpinIsingModel::current_magnetization() const {
+    if (check_observables) check_tracked_observable("magnetization", obs.mx, compute_magnetization(), L * L);
+    return obs.mx;
+}
+
+void MultiSpinIsingModel::refresh_observables() {
+    obs.energy = compute_energy();
+    obs.mx = compute_magnetization();
+    obs.my = 0.0;
+}
+
+const std::vector<MultiSpinIsingModel::spin_type>& MultiSpinIsingModel::get_lattice() const {
+    unpacked.resize(static_cast<std::size_t>(L) * L);
+    for (int i = 0; i < L; ++i) {
+        for (int k = 0; k < W; ++k) {
+            const std::uint64_t w = words[static_cast<std::size_t>(i) * W + k];
+            for (int b = 0; b < 64; ++b) {
+                unpacked[static_cast<std::size_t>(i) * L + k + b * W] = ((w >> b) & 1) ? 1 : -1;
+            }
+        }
+    }
+    return unpacked;
+}
+
+void MultiSpinIsingModel::load_lattice(const spin_type* values) {
+    for (int s = 0; s < L * L; ++s) {
+        if (values[s] != 1 && values[s] != -1) {
+            throw std::invalid_argument("Ising spins must be -1 or +1");
+        }
+    }
+    for (int i = 0; i < L; ++i) {
+        for (int k = 0; k < W; ++k) {
+            std::uint64_t w = 0;
+            for (int b = 0; b < 64; ++b) {
+                if (values[static_cast<std::size_t>(i) * L + k + b * W] == 1) w |= std::uint64_t(1) << b;
+            }
+            words[static_cast<std::size_t>(i) * W + k] = w;
+        }
+    }
+    refresh_observables();
+}
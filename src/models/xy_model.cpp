@@ -3,86 +3,271 @@
 #include <cmath>
 #include <fstream>
 #include <iostream>
+#include <algorithm>
 
 XYModel::XYModel(int L, double T, double J)
     : L(L), T(T), J(J),
-      lattice(L, std::vector<double>(L)),
-      dist_site(0, L - 1),
-      dist_real(0.0, 1.0),
-      dist_angle(0.0, 2.0 * M_PI)
+      lattice(static_cast<std::size_t>(L) * L),
+      nbr(build_neighbor_table(L)),
+      cos_phi(lattice.size()),
+      sin_phi(lattice.size()),
+      gen(random_seed()),
+      rand_sites(lattice.size()),
+      rand_angle(lattice.size()),
+      rand_accept(lattice.size())
 {
-    std::random_device rd;
-    gen.seed(rd());
     init_lattice();
+    cluster_ws.resize(L * L);
+    refresh_observables();
 }
 
 void XYModel::init_lattice() {
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            lattice[i][j] = dist_angle(gen);
-            // lattice[i][j] = 0.0;  // all spins aligned (ordered state)
-        }
+    for (int s = 0; s < L * L; ++s) {
+        set_angle(s, 2.0 * M_PI * uniform01(gen));
+        // set_angle(s, 0.0);  // all spins aligned (ordered state)
     }
 }
 
-double XYModel::spin_dot(double phi1, double phi2) const {
-    return std::cos(phi1 - phi2);
+bool XYModel::update_site(int s, double new_phi, double r, Observables& delta) {
+    // new_phi: completely new angle in [0, 2π), rounded to the stored type before dE
+    const spin_type phi = static_cast<spin_type>(new_phi);
+    const double c_new = std::cos(static_cast<double>(phi));
+    const double s_new = std::sin(static_cast<double>(phi));
+
+    // sum_k cos(phi - phi_k) = cos(phi) * sum cos(phi_k) + sin(phi) * sum sin(phi_k)
+    const int* nb = &nbr[4 * s];
+    double hx = 0.0, hy = 0.0;
+    for (int k = 0; k < 4; ++k) {
+        hx += cos_phi[nb[k]];
+        hy += sin_phi[nb[k]];
+    }
+    double dbond = (c_new - cos_phi[s]) * hx + (s_new - sin_phi[s]) * hy;
+    const double deltaE = -J * dbond;  // compute_energy() zählt -J * cos pro Bindung
+
+    if (deltaE <= 0.0 || r < std::exp(-deltaE / T)) {
+        delta.energy += deltaE;
+        delta.mx += c_new - cos_phi[s];
+        delta.my += s_new - sin_phi[s];
+        lattice[s] = phi;
+        cos_phi[s] = c_new;
+        sin_phi[s] = s_new;
+        return true;
+    }
+    return false;
 }
 
-void XYModel::metropolis_update() {
-    int i = dist_site(gen);
-    int j = dist_site(gen);
+// Unbedingtes Setzen (Cluster-Updates, deterministischer Debug-Pfad) inkl. Observablen
+void XYModel::rotate_spin(int s, double new_phi, Observables& delta) {
+    const double c_old = cos_phi[s], s_old = sin_phi[s];
+    set_angle(s, new_phi);
+    const int* nb = &nbr[4 * s];
+    double hx = 0.0, hy = 0.0;
+    for (int k = 0; k < 4; ++k) {
+        hx += cos_phi[nb[k]];
+        hy += sin_phi[nb[k]];
+    }
+    delta.energy -= J * ((cos_phi[s] - c_old) * hx + (sin_phi[s] - s_old) * hy);
+    delta.mx += cos_phi[s] - c_old;
+    delta.my += sin_phi[s] - s_old;
+}
 
-    double old_phi = lattice[i][j];
-    double new_phi = dist_angle(gen); // propose completely new angle
+void XYModel::metropolis_update() {
+    const int s = static_cast<int>(uniform_index(gen, static_cast<std::uint32_t>(L * L)));
+    const double new_phi = propose(lattice[s], uniform01(gen));
+    accepted += update_site(s, new_phi, uniform01(gen), obs);
+    ++attempted;
+}
 
-    std::vector<std::pair<int, int>> neighbors = {
-        { (i - 1 + L) % L, j },
-        { (i + 1) % L, j },
-        { i, (j - 1 + L) % L },
-        { i, (j + 1) % L }
-    };
+double XYModel::compute_energy() const {
+    double energy = 0.0;
+    for (int s = 0; s < L * L; ++s) {
+        energy -= J * (spin_dot(s, nbr[4 * s + 3]) + spin_dot(s, nbr[4 * s + 1]));
+    }
+    return energy;
+}
 
-    double deltaE = 0.0;
-    for (const auto& [ni, nj] : neighbors) {
-        double neighbor_phi = lattice[ni][nj];
-        deltaE += J * (spin_dot(new_phi, neighbor_phi) - spin_dot(old_phi, neighbor_phi));
+void XYModel::metropolis_sweep() {
+    // Plätze, Winkel und Zufallszahlen eines Sweeps vorab in einem Block
+    const std::size_t n = lattice.size();
+    fill_index(gen, rand_sites.data(), n, static_cast<std::uint32_t>(n));
+    fill_uniform(gen, rand_angle.data(), n);
+    fill_uniform(gen, rand_accept.data(), n);
+    long acc = 0;
+    for (std::size_t k = 0; k < n; ++k) {
+        const int s = static_cast<int>(rand_sites[k]);
+        acc += update_site(s, propose(lattice[s], rand_angle[k]), rand_accept[k], obs);
     }
+    adapt_step_width(static_cast<long>(n), acc);
+}
 
-    if (deltaE <= 0.0 || dist_real(gen) < std::exp(-deltaE / T)) {
-        lattice[i][j] = new_phi;
+void XYModel::checkerboard_sweep() {
+    const int threads = checkerboard_threads(n_threads, L);
+    Observables delta;
+    long acc = 0;
+    for (int parity = 0; parity < 2; ++parity) {
+        #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1) reduction(+ : delta, acc)
+        for (int i = 0; i < L; ++i) {
+            const int t = current_thread_id();
+            Rng& rng = (t == 0) ? gen : thread_gens[t - 1];
+            for (int j = (i + parity) & 1; j < L; j += 2) {
+                const int s = i * L + j;
+                const double new_phi = propose(lattice[s], uniform01(rng));
+                acc += update_site(s, new_phi, uniform01(rng), delta);
+            }
+        }
     }
+    obs += delta;
+    adapt_step_width(static_cast<long>(L) * L, acc);
 }
 
-double XYModel::compute_energy() const {
-    double energy = 0.0;
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            double phi = lattice[i][j];
-            double right = lattice[i][(j + 1) % L];
-            double down  = lattice[(i + 1) % L][j];
+// Zählt die Vorschläge eines Sweeps und passt im Burn-in die Breite an: w *= acc / target,
+// pro Sweep höchstens um Faktor 2, begrenzt auf [1e-3, 2π]
+void XYModel::adapt_step_width(long sweep_attempted, long sweep_accepted) {
+    attempted += sweep_attempted;
+    accepted += sweep_accepted;
+    if (!in_burnin || target_acceptance <= 0.0 || sweep_attempted == 0) return;
+    const double rate = static_cast<double>(sweep_accepted) / sweep_attempted;
+    const double factor = std::clamp(rate / target_acceptance, 0.5, 2.0);
+    step_width = std::clamp(step_width * factor, 1e-3, 2.0 * M_PI);
+}
 
-            energy -= J * (spin_dot(phi, right) + spin_dot(phi, down));
+// Over-Relaxation: phi → 2 psi - phi mit psi = Winkel des lokalen Feldes (hx, hy).
+// h · s bleibt gleich → E unverändert, immer akzeptiert (mikrokanonisch); nur zusammen mit
+// Metropolis/Cluster-Updates ergodisch. Schachbrett-Reihenfolge, Zeilen auf Threads verteilt.
+void XYModel::overrelaxation_sweep() {
+    const int threads = checkerboard_threads(n_threads, L);
+    Observables delta;
+    for (int parity = 0; parity < 2; ++parity) {
+        #pragma omp parallel for num_threads(threads) schedule(static) if(threads > 1) reduction(+ : delta)
+        for (int i = 0; i < L; ++i) {
+            for (int j = (i + parity) & 1; j < L; j += 2) {
+                const int s = i * L + j;
+                const int* nb = &nbr[4 * s];
+                double hx = 0.0, hy = 0.0;
+                for (int k = 0; k < 4; ++k) {
+                    hx += cos_phi[nb[k]];
+                    hy += sin_phi[nb[k]];
+                }
+                if (hx == 0.0 && hy == 0.0) continue;
+                double phi = 2.0 * std::atan2(hy, hx) - lattice[s];  // in (-4π, 2π]
+                while (phi < 0.0) phi += 2.0 * M_PI;
+                if (phi >= 2.0 * M_PI) phi -= 2.0 * M_PI;
+                // Nachbarn haben die andere Farbe → (hx, hy) gilt auch für die Differenzen
+                const double c_old = cos_phi[s], s_old = sin_phi[s];
+                set_angle(s, phi);
+                delta.energy -= J * ((cos_phi[s] - c_old) * hx + (sin_phi[s] - s_old) * hy);
+                delta.mx += cos_phi[s] - c_old;
+                delta.my += sin_phi[s] - s_old;
+            }
         }
     }
-    return energy;
+    obs += delta;
 }
 
-void XYModel::metropolis_sweep() {
-    for (int n = 0; n < L*L; ++n) {
-        metropolis_update();
+void XYModel::set_step_width(double w) {
+    if (!(w > 0.0)) throw std::invalid_argument("step width must be > 0");
+    step_width = std::min(w, 2.0 * M_PI);
+}
+
+void XYModel::set_target_acceptance(double a) {
+    if (!(a >= 0.0 && a < 1.0)) throw std::invalid_argument("target acceptance must be in [0, 1)");
+    target_acceptance = a;
+}
+
+void XYModel::set_overrelaxation(int n) {
+    if (n < 0) throw std::invalid_argument("over-relaxation sweeps must be >= 0");
+    n_overrelax = n;
+}
+
+void XYModel::set_burnin(bool on) {
+    in_burnin = on;
+    if (!on) attempted = accepted = 0;  // Statistik ab Ende des Burn-ins (Messphase)
+}
+
+void XYModel::sweep() {
+    switch (algorithm) {
+        case Algorithm::Wolff:        wolff_sweep(); break;
+        case Algorithm::SwendsenWang: swendsen_wang_sweep(); break;
+        default:
+            if (sweep_mode == SweepMode::Checkerboard) checkerboard_sweep();
+            else metropolis_sweep();
     }
+    for (int k = 0; k < n_overrelax; ++k) overrelaxation_sweep();
+}
+
+void XYModel::wolff_sweep() {
+    // Sweep-äquivalent: im Mittel ~N geflippte Spins (Clusteranzahl vorab festgelegt)
+    const int n_clusters = cluster_ws.clusters_per_sweep(L * L);
+    int flipped = 0;
+    for (int c = 0; c < n_clusters; ++c) flipped += wolff_update();
+    cluster_ws.record_clusters(n_clusters, flipped);
+}
+
+// Embedded Ising: random mirror line at angle phi, theta -> 2 phi - theta,
+// the projection onto its normal is sin(theta - phi).
+static double reflect_angle(double theta, double phi) {
+    double t = std::fmod(2.0 * phi - theta, 2.0 * M_PI);
+    return t < 0.0 ? t + 2.0 * M_PI : t;
+}
+
+int XYModel::wolff_update() {
+    const double phi = M_PI * uniform01(gen);
+    const double c = std::cos(phi), sn = std::sin(phi);
+    return wolff_cluster(cluster_ws, nbr, L * L, J / T,
+                         [this, c, sn](int s) { return sin_phi[s] * c - cos_phi[s] * sn; },
+                         [this, phi](int s) { rotate_spin(s, reflect_angle(lattice[s], phi), obs); }, gen);
+}
+
+int XYModel::swendsen_wang_sweep() {
+    const double phi = M_PI * uniform01(gen);
+    const double c = std::cos(phi), sn = std::sin(phi);
+    return swendsen_wang_step(cluster_ws, nbr, L * L, J / T,
+                              [this, c, sn](int s) { return sin_phi[s] * c - cos_phi[s] * sn; },
+                              [this, phi](int s) { rotate_spin(s, reflect_angle(lattice[s], phi), obs); }, gen);
+}
+
+void XYModel::set_threads(int n) {
+    n_threads = std::max(1, n);
+    thread_gens = split_thread_engines(gen, n_threads);  // the main stream stays independent of the thread count
+}
+
+void XYModel::randomize_lattice() {
+    init_lattice();
+    refresh_observables();
+}
+
+void XYModel::set_seed(std::uint64_t seed, int replica) {
+    gen = make_stream(seed, replica);
+    set_threads(n_threads);
+}
+
+double XYModel::current_energy() const {
+    if (check_observables) check_tracked_observable("energy", obs.energy, compute_energy(), L * L);
+    return obs.energy;
+}
+
+double XYModel::current_magnetization() const {
+    const double m = std::sqrt(obs.mx * obs.mx + obs.my * obs.my);
+    if (check_observables) check_tracked_observable("magnetization", m, compute_magnetization(), L * L);
+    return m;
+}
+
+void XYModel::refresh_observables() {
+    obs.mx = obs.my = 0.0;
+    for (int s = 0; s < L * L; ++s) {
+        set_angle(s, lattice[s]);  // cos/sin-Cache neu aufbauen (Schreibzugriffe über die View)
+        obs.mx += cos_phi[s];
+        obs.my += sin_phi[s];
+    }
+    obs.energy = compute_energy();
 }
 
 // Ensure TOTAL |M| (no /N)
 double XYModel::compute_magnetization() const {
     double mx = 0.0, my = 0.0;
-    for (int i = 0; i < L; ++i) {
-        for (int j = 0; j < L; ++j) {
-            double angle = lattice[i][j]; // or however you store θ ∈ [0,2π)
-            mx += std::cos(angle);
-            my += std::sin(angle);
-        }
+    for (int s = 0; s < L * L; ++s) {  // θ ∈ [0,2π), cos/sin aus dem Cache
+        mx += cos_phi[s];
+        my += sin_phi[s];
     }
     return std::sqrt(mx*mx + my*my);  // <-- no /N
 }
@@ -92,7 +277,7 @@ void XYModel::save_lattice(const std::string& filename) const {
     std::ofstream file(filename);
     for (int i = 0; i < L; ++i) {
         for (int j = 0; j < L; ++j) {
-            file << lattice[i][j];
+            file << lattice[i * L + j];
             if (j < L - 1) file << ",";
         }
         file << "\n";
@@ -100,7 +285,13 @@ void XYModel::save_lattice(const std::string& filename) const {
 }
 
 void XYModel::set_lattice(const std::vector<std::vector<double>>& new_lattice) {
-    lattice = new_lattice;
+    const std::vector<double> flat = flatten_lattice(new_lattice, L);
+    load_lattice(narrow_lattice<spin_type>(flat.data(), flat.size()).data());
+}
+
+void XYModel::load_lattice(const spin_type* values) {
+    std::copy(values, values + L * L, lattice.begin());
+    refresh_observables();
 }
 
 void XYModel::set_forced_angle(double angle) {
@@ -112,21 +303,16 @@ void XYModel::set_forced_random(double value) {
 }
 
 bool XYModel::metropolis_update(int i, int j) {
-    double old_phi = lattice[i][j];
-    double new_phi = (forced_angle >= 0.0) ? forced_angle : dist_angle(gen);
-    double r = (forced_random >= 0.0) ? forced_random : dist_real(gen);
-
-    std::vector<std::pair<int, int>> neighbors = {
-        { (i - 1 + L) % L, j },
-        { (i + 1) % L, j },
-        { i, (j - 1 + L) % L },
-        { i, (j + 1) % L }
-    };
+    const int s = i * L + j;
+    double old_phi = lattice[s];
+    double new_phi = (forced_angle >= 0.0) ? forced_angle : 2.0 * M_PI * uniform01(gen);
+    double r = (forced_random >= 0.0) ? forced_random : uniform01(gen);
 
+    const int* nb = &nbr[4 * s];
     double deltaE = 0.0;
-    for (const auto& [ni, nj] : neighbors) {
-        double neighbor_phi = lattice[ni][nj];
-        deltaE += J * (cos(new_phi - neighbor_phi) - cos(old_phi - neighbor_phi));
+    for (int k = 0; k < 4; ++k) {
+        double neighbor_phi = lattice[nb[k]];
+        deltaE -= J * (cos(new_phi - neighbor_phi) - cos(old_phi - neighbor_phi));
     }
     
     double threshold = std::exp(-deltaE / T);
@@ -136,7 +322,7 @@ bool XYModel::metropolis_update(int i, int j) {
               << ", threshold = " << threshold << std::endl;
 
     if (deltaE <= 0.0 || r < threshold) {
-        lattice[i][j] = new_phi;
+        rotate_spin(s, new_phi, obs);
         return true;
     }
     return false;
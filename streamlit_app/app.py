@@ -1,6 +1,5 @@
 # app.py
 import os
-import subprocess
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -31,14 +30,15 @@ from infos import (
     render_gif_snippet,
     render_plot_snippet,
 )
-from mcmc_tools.db.models import Base  # enthält Simulation, Result, Lattice, Statistic
+from mcmc_tools.db.models import Base, add_missing_columns  # enthält Simulation, Result, Lattice, Statistic
 from mcmc_tools.db import get_engine, get_session, healthcheck
 from mcmc_tools.db.etl import import_all_from_results_folder
+from mcmc_tools.sim.sweep import build_jobs, run_sweep
 from mcmc_tools.analysis_utils.visualize_lattices import (
     generate_and_display_lattice_animations,
 )
-from mcmc_tools.analysis_utils.stat_runner import analyze_and_store_latest_statistics
-from mcmc_tools.analysis_utils.plots import plot_with_errorbars
+from mcmc_tools.analysis_utils.stat_runner import analyze_and_store_pending_statistics
+from mcmc_tools.analysis_utils.plots import plot_reweighted, plot_with_errorbars
 
 
 # =========================
@@ -67,7 +67,10 @@ MAX_L     = 32     if SAFE else 128
 
 @st.cache_resource
 def _engine_cached():
-    return get_engine()
+    eng = get_engine()
+    # ORM-Abfragen lesen alle Modellspalten → fehlende (ältere DB) einmal pro Prozess ergänzen
+    add_missing_columns(eng)
+    return eng
 
 engine = _engine_cached()
 
@@ -81,7 +84,8 @@ def ensure_schema():
     missing = sorted(want - have)
     if missing:
         Base.metadata.create_all(engine)
-    return missing
+    # neue Spalten in bestehenden Tabellen (z.B. statistics.last_result_id) – create_all ergänzt sie nicht
+    return missing + add_missing_columns(engine)
 
 def get_available_temperatures_and_models():
     with engine.connect() as conn:
@@ -191,50 +195,36 @@ if start_pressed and not SAFE:
 
     temperatures = np.arange(temp_range[0], temp_range[1] + temp_step_val / 2, temp_step_val)
     temperatures = [round(float(T), 2) for T in temperatures]
-    total_tasks = max(1, len(models) * len(temperatures))
-
-    current = 0
-    success = True
 
     # Wichtig: cwd = DATA_DIR, damit das Binary in DATA_DIR/results schreibt
-    for T in temperatures:
-        for model in models:
-            cmd = [
-                str(mcmc_path),
-                "--model", model,
-                "--L", str(L),
-                "--T", f"{T:.2f}",
-                "--steps", str(steps),
-            ]
-            try:
-                completed = subprocess.run(
-                    cmd, check=True, capture_output=True, text=True,
-                    cwd=str(DATA_DIR)
-                )
-                # Debug-Ausgabe optional
-                # st.write(completed.stdout)
-            except subprocess.CalledProcessError as e:
-                st.error(f"❌ Error for {model}, T={T:.2f}: {e.stderr.strip()}")
-                success = False
-
-            current += 1
-            frac = current / total_tasks
-            progress_bar.progress(frac)
-            st.session_state.simulation_progress_final = frac
+    # Jobs laufen parallel (ein mcmc-Prozess pro Kern), Fortschritt pro fertigem Job
+    jobs = build_jobs(models, L, temperatures, steps)
+    failed = []
+
+    def _on_job_done(res, done, total):
+        if not res.ok:
+            msg = (res.error or res.stderr).strip()
+            st.error(f"❌ Error for {res.job.model}, T={res.job.T:.2f}: {msg}")
+            failed.append(res)
+        frac = done / total
+        progress_bar.progress(frac)
+        st.session_state.simulation_progress_final = frac
+
+    run_sweep(mcmc_path, jobs, cwd=str(DATA_DIR), on_complete=_on_job_done)
+    success = not failed
 
     st.session_state.simulation_running = False
     st.session_state.simulation_done = True
     st.session_state.show_sim_success = success
 
     # ---- Neue Ergebnisse in DB importieren ----
-    n_simulations = len(models) * len(temperatures)
     import_all_from_results_folder(
         folder=str(RESULTS_DIR),  # <— wichtig: nicht ins Repo schreiben
         models=models,
         L=L,
         temperatures=temperatures,
     )
-    analyze_and_store_latest_statistics(n_simulations)
+    analyze_and_store_pending_statistics()  # nur Simulationen ohne Statistik
 
     st.success("✅ Simulation, Import & Statistics done")
 
@@ -277,8 +267,16 @@ if st.session_state.simulation_done:
     temperatures = [round(float(T), 2) for T in temperatures]
 
     render_plot_snippet()
+    reweight = st.checkbox(
+        "Reweight to a dense T grid (multi-histogram)",
+        value=False,
+        help="Interpolates between the simulated temperatures from the stored E/M series – no extra simulation.",
+    )
     if st.button("Generate Plots with Errorbars"):
-        plot_with_errorbars(analysis_models, L, steps, temperatures)
+        if reweight:
+            plot_reweighted(analysis_models, L, temperatures)
+        else:
+            plot_with_errorbars(analysis_models, L, steps, temperatures)
 
 
 # =========================
@@ -0,0 +1,91 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from mcmc_tools.sim.benchmark import (
+    BenchCase, compare, default_matrix, load_baseline, parse_bench_line, run_case, run_matrix, save_baseline,
+)
+
+
+def test_default_matrix_covers_models_algorithms_and_threads():
+    cases = default_matrix(sizes=(32, 64), threads=(1, 4), quick=True)
+    keys = {c.key for c in cases}
+    assert "Clock/L32/T0.9/heatbath/random/t1" in keys
+    assert "XY/L64/T0.9/sw/random/t1" in keys
+    assert "Ising/L64/T2.27/metropolis/checkerboard/t4" in keys
+    assert "Ising/L64/T2.27/metropolis/msc/t1" in keys
+    assert "Ising/L32/T2.27/metropolis/msc/t1" not in keys       # msc braucht L % 64 == 0
+    assert not any(c.threads > 1 and c.algorithm != "metropolis" for c in cases)
+    assert len(default_matrix(models=("XY",), sizes=(32,))) == 3 * 3  # 3 T × 3 Algorithmen
+
+
+def test_benchmark_binding_reports_throughput_costs_and_memory():
+    for case in (BenchCase("Ising", 16, 2.27), BenchCase("Clock", 16, 0.9, "heatbath"),
+                 BenchCase("XY", 16, 0.9, "wolff"), BenchCase("Ising", 64, 2.27, sweep="msc")):
+        res = run_case(case, sweeps=30, warmup=5, repeats=3)
+        assert res.sweeps == 30 and res.seconds > 0
+        assert res.sweeps_per_sec > 0 and res.updates_per_sec == pytest.approx(res.sweeps_per_sec * case.L ** 2)
+        assert res.measure_ns > 0 and res.snapshot_us > 0
+        assert res.memory_bytes >= case.L ** 2  # mindestens das Gitter (msc: 1 Bit pro Spin + Cache)
+
+
+def test_memory_bytes_follows_lattice_size():
+    import xy
+    small, large = xy.XYModel(16, 1.0, 1.0), xy.XYModel(64, 1.0, 1.0)
+    assert large.memory_bytes() > 8 * small.memory_bytes()
+
+
+def test_compare_flags_only_regressions_beyond_threshold(tmp_path):
+    cases = [BenchCase("Ising", 16, 2.27), BenchCase("XY", 16, 0.9)]
+    results = run_matrix(cases, sweeps=20, warmup=0, repeats=1)
+    path = str(tmp_path / "baseline.json")
+    save_baseline(path, results)
+    baseline = load_baseline(path)
+    assert set(baseline) == {c.key for c in cases}
+    assert compare(results, baseline, threshold=0.0) == []
+
+    faster = {k: dict(v) for k, v in baseline.items()}
+    faster[cases[0].key]["sweeps_per_sec"] *= 2.0   # Baseline doppelt so schnell → 50 % langsamer
+    faster[cases[1].key]["memory_bytes"] //= 2      # doppelt so viel Speicher wie die Baseline
+    faster[cases[1].key]["measure_ns"] /= 2.0       # nicht in den Standard-Kennzahlen
+    faster[cases[0].key]["snapshot_us"] *= 2.0      # Snapshot heute schneller → keine Regression
+    regressions = compare(results, faster, threshold=0.2)
+    assert {(r.key, r.metric) for r in regressions} == {
+        (cases[0].key, "sweeps_per_sec"), (cases[1].key, "memory_bytes")}
+    assert regressions[0].change == pytest.approx(0.5)
+    assert [(r.key, r.metric) for r in compare(results, faster, 0.2, metrics=("measure_ns", "snapshot_us"))] == [
+        (cases[1].key, "measure_ns")]
+    assert compare(results, faster, threshold=1.5) == []
+    assert compare(results, {}, threshold=0.0) == []  # neue Cases ohne Baseline
+
+
+def test_parse_bench_line_of_the_executable():
+    out = ('{"event": "bench", "model": "Ising", "L": 64, "sweeps": 600, "seconds": 0.05, "sweeps_per_sec": 12000.5, '
+           '"updates_per_sec": 49000000, "measure_ns": 20.5, "snapshot_us": 0.05, "memory_bytes": 205208, '
+           '"peak_rss_kb": 4384}\n')
+    assert parse_bench_line("Warm start ...\n" + out)["sweeps_per_sec"] == 12000.5
+    with pytest.raises(ValueError):
+        parse_bench_line("nothing here\n")
+    assert BenchCase("Clock", 32, 0.9, "heatbath").command("mcmc", 500, 50, 3)[:2] == ["mcmc", "--bench"]
+
+
+# opt-in: absolute Durchsatzzahlen sind rechnerspezifisch, z. B.
+# MCMC_BENCH_BASELINE=benchmarks/baseline.json auf dem Rechner, der sie aufgenommen hat
+BASELINE = os.getenv("MCMC_BENCH_BASELINE", "")
+
+
+@pytest.mark.skipif(not BASELINE, reason="MCMC_BENCH_BASELINE nicht gesetzt")
+def test_no_regression_against_stored_baseline():
+    assert os.path.exists(BASELINE), f"Baseline {BASELINE} nicht gefunden"
+    baseline = load_baseline(BASELINE)
+    threshold = float(os.getenv("MCMC_BENCH_THRESHOLD", "0.3"))
+    cases = default_matrix(quick=True)
+    regressions = compare(run_matrix(cases), baseline, threshold)
+    if regressions:
+        # einzelne Ausreißer durch fremde Last: auffällige Cases ein zweites Mal messen
+        flagged = {r.key for r in regressions}
+        regressions = compare(run_matrix([c for c in cases if c.key in flagged]), baseline, threshold)
+    assert not regressions, "\n".join(
+        f"{r.key} {r.metric}: {r.baseline:.4g} → {r.current:.4g} ({r.change:+.0%})" for r in regressions)
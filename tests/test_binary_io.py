@@ -0,0 +1,92 @@
+import os
+import shutil
+import struct
+import subprocess
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pytest
+
+from mcmc_tools.sim.binary_io import open_lattices, open_results, read_bin_header, results_frame
+
+MCMC = os.getenv("MCMC_PATH", "mcmc")
+
+
+def _write_bin(path, kind, dtype, itemsize, count, dim, payload=b""):
+    # Layout wie write_bin_header (output_writer.hpp): magic, version, kind, dtype, itemsize, count, dim, Padding
+    path.write_bytes(struct.pack("<4sBccBQI12x", b"MCMC", 1, kind, dtype, itemsize, count, dim) + payload)
+
+
+def test_bin_header_layout_and_memmap_readers(tmp_path):
+    rows = np.arange(15, dtype="<f8").reshape(3, 5)
+    _write_bin(tmp_path / "results.bin", b"S", b"f", 8, 3, 5, rows.tobytes())
+    h = read_bin_header(str(tmp_path / "results.bin"))
+    assert h == dict(kind="S", dtype=np.dtype("<f8"), count=3, dim=5, offset=32)
+    arr = open_results(str(tmp_path / "results.bin"))
+    assert isinstance(arr, np.memmap) and not arr.flags.writeable
+    np.testing.assert_array_equal(arr, rows)
+    assert results_frame(str(tmp_path / "results.bin"))["step"].tolist() == [0, 5, 10]
+
+    rec = np.array([(7, np.full((4, 4), 3, np.uint8)), (14, np.eye(4, dtype=np.uint8))],
+                   dtype=[("step", "<i8"), ("lattice", "u1", (4, 4))])
+    _write_bin(tmp_path / "lattice.bin", b"L", b"u", 1, 2, 4, rec.tobytes())
+    steps, lattices = open_lattices(str(tmp_path / "lattice.bin"))
+    assert steps.tolist() == [7, 14] and lattices.shape == (2, 4, 4) and lattices.dtype == np.uint8
+    np.testing.assert_array_equal(lattices[1], np.eye(4))
+
+    # leere Dateien (count = 0) und falsche Art/Magic
+    _write_bin(tmp_path / "empty.bin", b"S", b"f", 8, 0, 5)
+    assert open_results(str(tmp_path / "empty.bin")).shape == (0, 5)
+    with pytest.raises(ValueError):
+        open_lattices(str(tmp_path / "results.bin"))
+    (tmp_path / "bad.bin").write_bytes(b"NOPE" + bytes(28))
+    with pytest.raises(ValueError):
+        read_bin_header(str(tmp_path / "bad.bin"))
+
+
+@pytest.mark.skipif(shutil.which(MCMC) is None, reason="mcmc-Executable nicht gefunden (MCMC_PATH)")
+def test_npy_and_bin_output_round_trip(tmp_path):
+    def run(fmt, steps, *extra):
+        subprocess.run([MCMC, "--model", "Ising", "--L", "8", "--T", "2.0", "--steps", str(steps), "--seed", "3",
+                        "--format", fmt, "--checkpoint-out", f"cp_{fmt}.txt", *extra],
+                       cwd=tmp_path, check=True, capture_output=True)
+
+    def path(kind, fmt):
+        return str(tmp_path / "results" / f"{kind}_Ising_L8_T2.00.{fmt}")
+
+    for fmt in ("npy", "bin"):
+        run(fmt, 100)
+
+    # Header nach close(): Zeilenzahl eingetragen, Dateigröße = Header + Zeilen
+    with open(path("results", "npy"), "rb") as f:
+        raw = f.read(128)
+    assert raw[:8] == b"\x93NUMPY\x01\x00" and raw.endswith(b"\n")
+    assert b"'descr': '<f8'" in raw and b"'shape': (100, 5)" in raw
+    assert os.path.getsize(path("results", "npy")) == 128 + 100 * 5 * 8
+    h = read_bin_header(path("results", "bin"))
+    assert (h["kind"], h["dtype"], h["count"], h["dim"]) == ("S", np.dtype("<f8"), 100, 5)
+    assert os.path.getsize(path("results", "bin")) == 32 + 100 * 5 * 8
+
+    res_npy, res_bin = open_results(path("results", "npy")), open_results(path("results", "bin"))
+    assert isinstance(res_npy, np.memmap) and isinstance(res_bin, np.memmap)
+    np.testing.assert_array_equal(res_npy, res_bin)  # gleicher Seed → gleiche Kette
+    assert res_npy[:, 0].tolist() == list(range(100))
+    np.testing.assert_array_equal(res_npy[:, 3], res_npy[:, 1] ** 2)
+
+    steps_npy, lat_npy = open_lattices(path("lattice", "npy"))
+    steps_bin, lat_bin = open_lattices(path("lattice", "bin"))
+    assert steps_npy.tolist() == steps_bin.tolist() == list(range(5, 101, 5))
+    assert lat_npy.shape == (20, 8, 8) and set(np.unique(lat_npy)) <= {-1, 1}
+    np.testing.assert_array_equal(lat_npy, lat_bin)
+    assert read_bin_header(path("lattice", "bin"))["count"] == 20
+
+    # Fortsetzung vom Checkpoint: Zeilen werden angehängt, der Header zählt neu
+    for fmt in ("npy", "bin"):
+        run(fmt, 50, "--resume-from", f"cp_{fmt}.txt")
+        res = open_results(path("results", fmt))
+        assert res.shape == (150, 5) and res[:, 0].tolist() == list(range(150))
+        np.testing.assert_array_equal(res[:100], res_bin[:100])
+        # Snapshot-Abstand folgt dem neuen --steps (50 // 20 = 2)
+        assert open_lattices(path("lattice", fmt))[0].tolist() == list(range(5, 101, 5)) + list(range(102, 151, 2))
+    np.testing.assert_array_equal(open_results(path("results", "npy")), open_results(path("results", "bin")))
@@ -49,15 +49,183 @@ def test_clock_magnetization_ordered():
     assert model.compute_magnetization() == pytest.approx(expected_magnetization, abs=1e-6)
 
 
-def test_clock_metropolis_rejects_favorable_flip():
+def test_clock_metropolis_rejects_unfavorable_flip():
     model = clock.ClockModel(3, 8, 1.0, 1.0)
 
     # Alle Spins auf Zustand 0
     aligned = [[0 for _ in range(3)] for _ in range(3)]
     model.set_lattice(aligned)
 
-    model.set_forced_state(4)      # gegenüberliegend bei M=8 (π)
-    model.set_forced_random(0.9)   # irrelevant bei ΔE < 0, sollte akzeptiert werden
+    model.set_forced_state(4)      # gegenüberliegend bei M=8 (π): ΔE = +8J
+    model.set_forced_random(0.9)   # > exp(-8) → abgelehnt
 
     accepted = model.metropolis_update_deterministic(1, 1)
-    assert accepted is True
+    assert accepted is False
+    assert model.compute_energy() == pytest.approx(-18.0)
+
+
+def test_clock_metropolis_accepts_favorable_flip():
+    model = clock.ClockModel(3, 8, 1.0, 1.0)
+    lattice = [[0 for _ in range(3)] for _ in range(3)]
+    lattice[1][1] = 4              # Zentrum antiparallel zu allen 4 Nachbarn
+    model.set_lattice(lattice)
+
+    model.set_forced_state(0)      # zurück in die Ausrichtung: ΔE = -8J < 0
+    model.set_forced_random(0.9)   # irrelevant bei ΔE < 0
+
+    assert model.metropolis_update_deterministic(1, 1) is True
+    assert model.compute_energy() == pytest.approx(-18.0)
+
+
+@pytest.mark.parametrize("algorithm", ["metropolis", "wolff", "sw"])
+def test_clock_algorithms_match_exact_enumeration(algorithm):
+    import itertools
+    L, M, T = 2, 3, 1.0
+    model = clock.ClockModel(L, M, T, 1.0)
+    energies = []
+    for states in itertools.product(range(M), repeat=L * L):
+        model.set_lattice(np.array(states).reshape(L, L))
+        energies.append(model.compute_energy())
+    energies = np.array(energies)
+    weights = np.exp(-(energies - energies.min()) / T)  # alle Verfahren tasten exp(-E/T) ab
+    exact = np.sum(energies * weights) / np.sum(weights)
+
+    model.set_seed(1)
+    model.set_algorithm(algorithm)
+    out = model.run(20000)
+    assert out["energy"].mean() == pytest.approx(exact, abs=0.05)  # ~4 Standardfehler
+
+
+def test_clock_checkerboard_sweep_disorders_at_high_T():
+    L = 8
+    model = clock.ClockModel(L, 6, 50.0, 1.0)
+    model.set_seed(3)
+    model.set_lattice([[0] * L for _ in range(L)])
+    model.set_sweep_mode("checkerboard")
+    for _ in range(50):
+        model.sweep()
+    # bei T >> J ist |M| weit unter dem geordneten Wert N
+    assert model.compute_magnetization() < 0.5 * L * L
+
+
+@pytest.mark.parametrize("algorithm", ["wolff", "sw"])
+def test_clock_cluster_update_keeps_aligned_state_at_low_T(algorithm):
+    L = 6
+    model = clock.ClockModel(L, 6, 0.01, 1.0)
+    model.set_seed(11)
+    model.set_lattice([[2] * L for _ in range(L)])
+    model.set_algorithm(algorithm)
+    for _ in range(5):
+        model.sweep()
+    # Spiegelung des ganzen Clusters erhält die Ausrichtung → Grundzustandsenergie
+    assert model.compute_energy() == pytest.approx(-2 * L * L)
+    assert model.compute_magnetization() == pytest.approx(L * L)
+
+
+def test_clock_set_lattice_rejects_state_out_of_range():
+    model = clock.ClockModel(2, 4, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        model.set_lattice([[0, 4], [0, 0]])
+
+
+@pytest.mark.parametrize("algorithm", ["metropolis", "wolff", "sw", "heatbath"])
+def test_clock_tracked_observables_match_recomputation(algorithm):
+    model = clock.ClockModel(8, 6, 0.9, 1.0)
+    model.set_seed(8)
+    model.set_sweep_mode("checkerboard")
+    model.set_threads(2)
+    model.set_algorithm(algorithm)
+    model.set_check_observables(True)
+    for _ in range(50):
+        model.sweep()
+    assert model.current_energy() == pytest.approx(model.compute_energy(), abs=1e-9)
+    assert model.current_magnetization() == pytest.approx(model.compute_magnetization(), abs=1e-9)
+
+def test_warm_start_checkpoint_from_python(tmp_path):
+    import ising
+    from mcmc_tools.sim.checkpoint import read_checkpoint, write_checkpoint
+    L, M = 6, 6
+    lattice = np.arange(L * L).reshape(L, L) % M
+    path = write_checkpoint(str(tmp_path / "warm.ckpt"), "Clock", 0.7, lattice.astype(float))
+    model = clock.ClockModel(L, M, 1.5, 1.0)
+    assert model.load_checkpoint(path) == 0
+    assert np.array_equal(model.get_lattice(), lattice)
+    assert model.get_temperature() == 0.7
+    # Rückrichtung: vom Modell geschriebener Checkpoint enthält den RNG-Zustand
+    model.save_checkpoint(path, step=3)
+    cp = read_checkpoint(path)
+    assert cp["model"] == "Clock" and cp["step"] == 3 and cp["rng"]
+    assert np.array_equal(cp["lattice"], lattice)
+    with pytest.raises(ValueError):
+        ising.IsingModel(L, 1.0, 1.0).load_checkpoint(path)
+
+def test_compact_lattice_dtype_and_wide_checkpoints(tmp_path):
+    from mcmc_tools.sim.binary_io import _BIN_HEADER
+    L, M = 4, 6
+    model = clock.ClockModel(L, M, 1.0, 1.0)
+    assert model.get_lattice().dtype == np.uint8 and np.asarray(model).dtype == np.uint8
+    # Werte außerhalb des 1-Byte-Typs werden abgelehnt statt umgebrochen (259 → 3)
+    with pytest.raises(ValueError):
+        model.set_lattice(np.full((L, L), 259))
+    with pytest.raises(ValueError):
+        clock.ClockModel(L, 300, 1.0, 1.0)
+    # ältere Checkpoints mit int32-Zuständen werden beim Laden konvertiert
+    lattice = (np.arange(L * L).reshape(L, L) % M).astype("<i4")
+    path = tmp_path / "old.ckpt"
+    path.write_bytes(_BIN_HEADER.pack(b"MCMC", 1, b"C", b"i", 4, 1, L) + lattice.tobytes() + b"model=Clock\nT=1.2\nstep=0\n")
+    assert model.load_checkpoint(str(path)) == 0
+    assert np.array_equal(model.get_lattice(), lattice)
+
+
+@pytest.mark.parametrize("mode", ["random", "checkerboard"])
+def test_clock_heat_bath_matches_exact_enumeration(mode):
+    import itertools
+    L, M, T = 2, 3, 1.0
+    model = clock.ClockModel(L, M, T, 1.0)
+    energies = []
+    for states in itertools.product(range(M), repeat=L * L):
+        model.set_lattice(np.array(states).reshape(L, L))
+        energies.append(model.compute_energy())
+    energies = np.array(energies)
+    weights = np.exp(-(energies - energies.min()) / T)
+    exact = np.sum(energies * weights) / np.sum(weights)
+
+    model.set_seed(1)
+    model.set_algorithm("heatbath")
+    model.set_sweep_mode(mode)
+    out = model.run(20000)
+    assert out["energy"].mean() == pytest.approx(exact, abs=0.04)  # ~4 Standardfehler
+
+
+@pytest.mark.parametrize("T", [0.7, 1.5])
+def test_clock_heat_bath_and_metropolis_agree_on_mean_energy(T):
+    L, M = 8, 6
+    means = {}
+    for algorithm in ("metropolis", "heatbath"):
+        e = []
+        for seed in range(3):
+            model = clock.ClockModel(L, M, T, 1.0)
+            model.set_seed(seed)
+            model.set_algorithm(algorithm)
+            e.append(model.run(4000, burnin=500)["energy"].mean() / (L * L))
+        means[algorithm] = (np.mean(e), np.std(e, ddof=1) / np.sqrt(len(e)))
+    (e_met, se_met), (e_hb, se_hb) = means["metropolis"], means["heatbath"]
+    assert e_met < 0  # ferromagnetisches Gewicht
+    assert abs(e_met - e_hb) < 5 * np.hypot(se_met, se_hb) + 0.01
+
+
+def test_clock_heat_bath_at_very_low_T_and_only_for_clock():
+    import ising
+    import xy
+    model = clock.ClockModel(4, 6, 1e-3, 1.0)  # alle Tabellengewichte unterlaufen → exp relativ zum Maximum
+    model.set_seed(2)
+    model.set_algorithm("heatbath")
+    model.set_check_observables(True)
+    for _ in range(200):
+        model.sweep()
+    assert model.current_energy() == pytest.approx(model.compute_energy(), abs=1e-9)
+    assert model.compute_energy() < -20  # geordnet bis auf wenige Domänenwände
+    with pytest.raises(ValueError):
+        ising.IsingModel(4, 1.0, 1.0).set_algorithm("heatbath")
+    with pytest.raises(ValueError):
+        xy.XYModel(4, 1.0, 1.0).set_algorithm("heatbath")
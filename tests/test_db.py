@@ -0,0 +1,141 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Module-Engines (connection.py, analysis_utils/io.py) werden beim Import aus DATABASE_URL gebaut →
+# nie gegen eine echte DB aus der Umgebung testen
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import mcmc_tools.db.connection as connection
+from mcmc_tools.db.models import Base, Result, Simulation, Statistic
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Frische SQLite-Datei; get_session() (ETL, stat_runner, io) schreibt dorthin."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", future=True)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(connection, "SessionLocal", sessionmaker(bind=engine, autoflush=False, future=True))
+    yield connection.get_session
+    engine.dispose()
+
+
+def _simulation(session, n: int, seed: int) -> int:
+    rng = np.random.default_rng(seed)
+    sim = Simulation(model="Ising", temperature=2.0 + seed / 10, steps=n, lattice_size=8)
+    session.add(sim)
+    session.flush()
+    e = rng.normal(-100.0, 5.0, n)
+    m = rng.normal(40.0, 3.0, n)
+    session.execute(Result.__table__.insert(), [
+        dict(simulation_id=sim.id, step=k, energy=e[k], magnetization=m[k], energy_squared=e[k] ** 2,
+             magnetization_squared=m[k] ** 2)
+        for k in range(n)])
+    return sim.id
+
+
+def test_pending_statistics_new_processed_stale_and_empty(db):
+    from mcmc_tools.analysis_utils.stat_runner import (
+        analyze_and_store_pending_statistics, find_pending_simulation_ids,
+    )
+
+    with db() as s:
+        processed = _simulation(s, 200, 1)
+        stale = _simulation(s, 200, 2)
+        new = _simulation(s, 200, 3)
+        legacy = _simulation(s, 200, 4)
+        empty = Simulation(model="Ising", temperature=3.0, steps=0, lattice_size=8)  # ohne Results
+        s.add(empty)
+        s.flush()
+        empty = empty.id
+        last_ids = dict(s.execute(select(Result.simulation_id, func.max(Result.id))
+                                  .group_by(Result.simulation_id)).all())
+        for sim_id in (processed, stale):
+            s.add(Statistic(simulation_id=sim_id, temperature=0.0, last_result_id=last_ids[sim_id]))
+        s.add(Statistic(simulation_id=legacy, temperature=0.0))  # vor last_result_id geschrieben
+        # nach der Statistik nachgeladene Messung → veraltet (auch in derselben Sekunde)
+        s.execute(Result.__table__.insert(), [dict(simulation_id=stale, step=200, energy=-50.0, magnetization=-60.0,
+                                                   energy_squared=2500.0, magnetization_squared=3600.0)])
+
+    assert find_pending_simulation_ids() == [stale, new]
+    assert find_pending_simulation_ids(include_stale=False) == [new]
+
+    assert analyze_and_store_pending_statistics(use_abs_magnetization=False) == 2
+    with db() as s:
+        counts = dict(s.execute(select(Statistic.simulation_id, func.count())
+                                .group_by(Statistic.simulation_id)).all())
+        stats = {r.simulation_id: r for r in s.execute(
+            select(Statistic.simulation_id, Statistic.temperature, Statistic.magnetization_per_spin)).all()}
+        m_stale = s.execute(select(func.avg(Result.magnetization)).where(Result.simulation_id == stale)).scalar()
+        covered = dict(s.execute(select(Statistic.simulation_id, Statistic.last_result_id)).all())
+    assert counts == {processed: 1, stale: 1, new: 1, legacy: 1}   # alte Zeile ersetzt, keine Duplikate
+    assert stats[processed].temperature == 0.0           # unverändert
+    assert stats[new].temperature == pytest.approx(2.3)
+    assert stats[stale].magnetization_per_spin == pytest.approx(m_stale / 64)  # mit Vorzeichen (-60 zählt)
+    assert covered[stale] == last_ids[legacy] + 1 and covered[new] == last_ids[new]
+
+    # alles ausgewertet; die Simulation ohne Results bleibt nicht offen
+    assert find_pending_simulation_ids() == []
+    assert analyze_and_store_pending_statistics() == 0
+
+
+def test_bulk_insert_results_round_trip_via_executemany(db):
+    from mcmc_tools.db.etl import RESULT_COLUMNS, bulk_insert_results
+
+    rng = np.random.default_rng(0)
+    n = 1000
+    e = rng.normal(-120.0, 8.0, n)
+    m = rng.normal(10.0, 30.0, n).astype(np.float32)  # float32 wie aus results_*.bin
+    df = pd.DataFrame({"step": np.arange(n, dtype=np.int64)[::-1], "energy": e, "magnetization": m,
+                       "energy_squared": e ** 2, "magnetization_squared": m.astype(np.float64) ** 2,
+                       "ignored": "x"})
+
+    with db() as s:
+        sim = Simulation(model="XY", temperature=0.9, steps=n, lattice_size=16)
+        s.add(sim)
+        s.flush()
+        sim_id = sim.id
+        assert bulk_insert_results(s, sim_id, df)[0] == n
+        assert bulk_insert_results(s, sim_id, df.iloc[:0]) == (0, 0.0)
+
+    with db() as s:
+        rows = s.execute(select(Result.simulation_id, *(getattr(Result, c) for c in RESULT_COLUMNS))
+                         .order_by(Result.step)).all()
+    assert len(rows) == n and {r.simulation_id for r in rows} == {sim_id}
+    back = pd.DataFrame(rows).set_index("step").sort_index()
+    expected = df.set_index("step").sort_index()
+    assert back.index.tolist() == list(range(n))
+    for c in RESULT_COLUMNS[1:]:
+        np.testing.assert_array_equal(back[c].to_numpy(), expected[c].to_numpy(np.float64))
+
+    # gehört zur Transaktion der Session: Rollback verwirft die Zeilen
+    with pytest.raises(RuntimeError):
+        with db() as s:
+            bulk_insert_results(s, sim_id, df)
+            raise RuntimeError("abort")
+    with db() as s:
+        assert s.execute(select(func.count()).select_from(Result)).scalar() == n
+
+
+def test_add_missing_columns_upgrades_existing_statistics_table(tmp_path):
+    from sqlalchemy import inspect, text
+    from mcmc_tools.db.models import add_missing_columns
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}", future=True)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:  # Schema vor statistics.last_result_id
+        conn.execute(text("ALTER TABLE statistics DROP COLUMN last_result_id"))
+        conn.execute(text("INSERT INTO statistics (simulation_id, temperature) VALUES (1, 2.0)"))
+
+    assert add_missing_columns(engine) == ["statistics.last_result_id"]
+    assert "last_result_id" in {c["name"] for c in inspect(engine).get_columns("statistics")}
+    with sessionmaker(bind=engine, future=True)() as s:
+        assert s.query(Statistic).one().last_result_id is None  # ORM-Abfrage läuft wieder
+    assert add_missing_columns(engine) == []
+    engine.dispose()
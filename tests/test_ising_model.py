@@ -3,6 +3,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import ising
+import pytest
 
 def test_energy_consistency():
     model = ising.IsingModel(4, 1.0, 1.0)
@@ -83,3 +84,270 @@ def test_metropolis_rejects_large_positive_dE_deterministic():
 
     assert accepted is False
 
+
+def test_checkerboard_sweep_keeps_ordered_state_at_low_T():
+    L = 8
+    model = ising.IsingModel(L, 0.5, 1.0)
+    model.set_seed(1)
+    model.set_lattice([[1] * L for _ in range(L)])
+    model.set_sweep_mode("checkerboard")
+    model.set_threads(2)
+    for _ in range(20):
+        model.sweep()
+    # exp(-8/0.5) ≈ 1e-7 → praktisch kein Flip
+    assert model.compute_magnetization() == L * L
+    assert model.compute_energy() == -2 * L * L
+
+def test_unknown_sweep_mode_raises():
+    model = ising.IsingModel(4, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        model.set_sweep_mode("diagonal")
+
+def test_wolff_cluster_covers_aligned_lattice_at_low_T():
+    L = 6
+    model = ising.IsingModel(L, 0.01, 1.0)
+    model.set_seed(2)
+    model.set_lattice([[1] * L for _ in range(L)])
+    # p_add = 1 - exp(-2J/T) ≈ 1 → der Cluster umfasst das ganze Gitter
+    assert model.wolff_update() == L * L
+    assert model.compute_magnetization() == -L * L
+
+def test_wolff_cluster_is_single_spin_at_infinite_T():
+    model = ising.IsingModel(6, 1e9, 1.0)
+    model.set_seed(2)
+    assert model.wolff_update() == 1
+
+def test_cluster_algorithms_keep_ground_state_energy():
+    L = 8
+    for algorithm in ("wolff", "sw"):
+        model = ising.IsingModel(L, 0.5, 1.0)
+        model.set_seed(4)
+        model.set_lattice([[1] * L for _ in range(L)])
+        model.set_algorithm(algorithm)
+        for _ in range(10):
+            model.sweep()
+        assert model.compute_energy() == -2 * L * L
+        assert abs(model.compute_magnetization()) == L * L
+
+def test_unknown_algorithm_raises():
+    model = ising.IsingModel(4, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        model.set_algorithm("heatbath")
+
+def test_set_temperature_rebuilds_acceptance_table():
+    L = 8
+    model = ising.IsingModel(L, 0.1, 1.0)
+    model.set_seed(6)
+    model.set_lattice([[1] * L for _ in range(L)])
+    model.sweep()
+    assert model.compute_magnetization() == L * L  # bei T=0.1 friert alles ein
+
+    model.set_temperature(1e9)  # exp(-dE/T) ≈ 1 → fast jeder Vorschlag wird angenommen
+    assert model.get_temperature() == 1e9
+    model.sweep()
+    assert model.compute_magnetization() < 0.8 * L * L
+
+@pytest.mark.parametrize("algorithm", ["metropolis", "wolff", "sw"])
+def test_tracked_observables_match_recomputation(algorithm):
+    model = ising.IsingModel(10, 2.3, 1.0)
+    model.set_seed(8)
+    model.set_algorithm(algorithm)
+    model.set_check_observables(True)  # wirft bei Abweichung
+    for _ in range(50):
+        model.sweep()
+        assert model.current_energy() == model.compute_energy()
+        assert model.current_magnetization() == model.compute_magnetization()
+
+def test_tracked_observables_follow_set_lattice():
+    L = 4
+    model = ising.IsingModel(L, 1.0, 1.0)
+    model.set_lattice([[1] * L for _ in range(L)])
+    assert model.current_energy() == -2 * L * L
+    assert model.current_magnetization() == L * L
+
+def test_run_returns_numpy_series_and_snapshots():
+    import numpy as np
+    L = 6
+    model = ising.IsingModel(L, 2.0, 1.0)
+    model.set_seed(3)
+    out = model.run(100, thin=5, burnin=10, lattice_every=4)
+    assert out["energy"].shape == (20,) and out["energy"].dtype == np.float64
+    assert out["magnetization"].shape == (20,)
+    assert out["lattices"].shape == (5, L, L)
+    assert list(out["lattice_steps"]) == [4, 8, 12, 16, 20]
+    # Arrays zeigen auf den C++-Speicher (kein Kopieren)
+    assert not out["energy"].flags.owndata
+    # letzte Messung = Zustand nach dem Lauf (100 % 5 == 0 → kein Rest-Sweep)
+    assert out["energy"][-1] == model.compute_energy()
+    assert set(np.unique(out["lattices"])) <= {-1, 1}
+
+def test_run_without_measurement_and_invalid_thin():
+    model = ising.IsingModel(4, 2.0, 1.0)
+    assert model.run(10, measure=False)["energy"].size == 0
+    with pytest.raises(ValueError):
+        model.run(10, thin=0)
+
+def test_anneal_walks_temperatures_with_one_chain():
+    L = 8
+    model = ising.IsingModel(L, 5.0, 1.0)
+    model.set_seed(4)
+    runs = model.anneal([3.0, 2.0, 1.0], 200, thin=2, burnin=100, anneal_burnin=20, lattice_every=50)
+    assert [r["T"] for r in runs] == [3.0, 2.0, 1.0]
+    assert [r["burnin"] for r in runs] == [100, 20, 20]
+    assert all(r["energy"].shape == (100,) and r["lattices"].shape == (2, L, L) for r in runs)
+    assert model.get_temperature() == 1.0
+    assert runs[-1]["energy"][-1] == model.compute_energy()  # Kette endet im Zustand des Modells
+    assert runs[-1]["energy"].mean() < runs[0]["energy"].mean()
+    with pytest.raises(ValueError):
+        model.anneal([1.0], 10, anneal_burnin=-1)
+
+def test_lattice_view_shares_model_memory():
+    import numpy as np
+    L = 4
+    model = ising.IsingModel(L, 2.0, 1.0)
+    view = model.lattice
+    assert view.shape == (L, L) and view.flags.writeable
+    assert np.shares_memory(view, np.asarray(model))
+
+    view[:] = 1  # direkter Schreibzugriff, danach Observablen neu aufbauen
+    model.refresh_observables()
+    assert model.current_energy() == -2 * L * L
+    assert (model.get_lattice() == 1).all()
+
+    view[0, 0] = 0
+    with pytest.raises(ValueError):
+        model.refresh_observables()
+
+def test_set_lattice_accepts_arrays_and_get_lattice_copies():
+    import numpy as np
+    L = 4
+    model = ising.IsingModel(L, 2.0, 1.0)
+    model.set_lattice(np.full((L, L), -1, dtype=np.int64))
+    snapshot = model.get_lattice()
+    assert snapshot.dtype == np.int8 and snapshot.sum() == -L * L
+    model.set_lattice(np.ones((L, L)))
+    assert snapshot.sum() == -L * L  # Kopie, nicht View
+    with pytest.raises(ValueError):
+        model.set_lattice(np.ones((L - 1, L)))
+
+def test_run_replicas_returns_independent_chains():
+    import numpy as np
+    out = ising.run_replicas(8, 2.5, 1.0, replicas=4, sweeps=60, thin=3, burnin=10, workers=2, seed=7)
+    assert out["energy"].shape == (4, 20) and out["magnetization"].shape == (4, 20)
+    # eigene RNG-Streams → keine zwei Replikas mit identischer Messreihe
+    assert len({tuple(row) for row in out["energy"]}) == 4
+    # Niedrige T mit Cluster-Updates: jede Replika ordnet sich
+    cold = ising.run_replicas(8, 0.5, 1.0, replicas=3, sweeps=20, workers=3, algorithm="wolff")
+    assert np.all(cold["energy"][:, -1] == -2.0 * 64)
+    with pytest.raises(ValueError):
+        ising.run_replicas(8, 2.0, 1.0, replicas=0, sweeps=10)
+
+def test_checkpoint_continues_chain_exactly(tmp_path):
+    path = str(tmp_path / "ising.ckpt")
+    model = ising.IsingModel(8, 2.3, 1.0)
+    model.set_seed(11)
+    model.run(50)
+    model.save_checkpoint(path, step=50)
+    expected = model.run(40)["energy"]
+
+    other = ising.IsingModel(8, 1.0, 1.0)
+    assert other.load_checkpoint(path) == 50
+    assert other.get_temperature() == 2.3
+    assert list(other.run(40)["energy"]) == list(expected)
+    with pytest.raises(ValueError):
+        ising.IsingModel(6, 2.3, 1.0).load_checkpoint(path)
+
+def test_equilibrate_respects_bounds():
+    model = ising.IsingModel(8, 4.0, 1.0)
+    model.set_seed(3)
+    sweeps, stationary = model.equilibrate(min_sweeps=100, max_sweeps=5000)
+    assert stationary and 100 <= sweeps < 5000
+    # hohe T: Heiß- und Kaltstart treffen sich sofort
+    sweeps, stationary = model.equilibrate(min_sweeps=100, max_sweeps=5000, cold_start=True)
+    assert stationary and 100 <= sweeps < 5000
+    assert model.equilibrate(min_sweeps=30, max_sweeps=30)[0] == 30
+    assert model.current_energy() == pytest.approx(model.compute_energy())
+
+def test_equilibrate_cold_start_is_opt_in():
+    # T << T_c vom Zufallsstart: der Drifttest allein (Standard) endet beim ersten lokal
+    # stationären Zustand, mit Kaltstart läuft der Burn-in weiter, bis beide Ketten übereinstimmen
+    def make():
+        model = ising.IsingModel(32, 0.5, 1.0)
+        model.set_seed(0)
+        model.randomize_lattice()
+        return model
+    sweeps, stationary = make().equilibrate(min_sweeps=100, max_sweeps=3000)
+    assert stationary and sweeps < 1000
+    assert make().equilibrate(min_sweeps=100, max_sweeps=3000, cold_start=True)[0] > sweeps
+
+def test_run_reports_integrated_autocorrelation_time():
+    hot = ising.IsingModel(16, 5.0, 1.0)
+    hot.set_seed(5)
+    fast = hot.run(4000, thin=4, burnin=200)
+    assert 0.5 <= fast["tau_int_energy"] < 3 and 0.5 <= fast["tau_int_magnetization"] < 3
+    critical = ising.IsingModel(16, 2.27, 1.0)
+    critical.set_seed(5)
+    slow = critical.run(4000, burnin=500)
+    assert slow["tau_int_magnetization"] > 3 * fast["tau_int_magnetization"]
+    assert "tau_int_energy" not in hot.run(10, measure=False)
+
+def test_seeded_streams_are_reproducible_per_replica_and_thread():
+    def chain(seed, replica=0, threads=1, mode="random"):
+        model = ising.IsingModel(8, 2.3, 1.0)
+        model.set_threads(threads)
+        model.set_sweep_mode(mode)
+        model.set_seed(seed, replica)
+        model.randomize_lattice()
+        return list(model.run(30)["energy"])
+
+    assert chain(42) == chain(42)
+    assert chain(42, replica=1) == chain(42, replica=1) != chain(42)
+    assert chain(42, threads=2, mode="checkerboard") == chain(42, threads=2, mode="checkerboard")
+    # Replika r hat ihren eigenen Stream, egal auf welchem Worker-Thread sie läuft
+    a = ising.run_replicas(8, 2.3, 1.0, replicas=3, sweeps=20, workers=1, seed=9)["energy"]
+    b = ising.run_replicas(8, 2.3, 1.0, replicas=3, sweeps=20, workers=3, seed=9)["energy"]
+    assert (a == b).all()
+
+def test_multispin_model_matches_reference_observables():
+    import numpy as np
+    L = 64
+    rng = np.random.default_rng(0)
+    spins = rng.choice([-1, 1], size=(L, L))
+    msc, ref = ising.MultiSpinIsingModel(L, 2.3, 1.0), ising.IsingModel(L, 2.3, 1.0)
+    msc.set_lattice(spins)
+    ref.set_lattice(spins)
+    assert (msc.get_lattice() == spins).all()
+    assert msc.compute_energy() == ref.compute_energy()
+    assert msc.compute_magnetization() == ref.compute_magnetization()
+    msc.set_seed(4)
+    msc.set_check_observables(True)
+    for _ in range(20):
+        msc.sweep()
+        ref.set_lattice(msc.get_lattice())
+        assert msc.current_energy() == ref.compute_energy()
+    # tiefe T: geordneter Zustand bleibt erhalten (exp(-8/0.5) ≈ 1e-7)
+    cold = ising.MultiSpinIsingModel(128, 0.5, 1.0)
+    cold.set_lattice(np.ones((128, 128)))
+    cold.run(20, measure=False)
+    assert cold.current_energy() == -2 * 128 * 128
+
+def test_multispin_threaded_sweep_matches_serial():
+    import numpy as np
+    # T → 0: Flips (m ≥ 2) sind deterministisch, die Zufallsbits entscheiden nichts → mit und
+    # ohne Threads dieselbe Kette (Nachbarzeilen aus der Kopie vom Anfang des Halb-Sweeps)
+    spins = np.random.default_rng(1).choice([-1, 1], size=(128, 128))
+    chains = []
+    for threads in (1, 4):
+        model = ising.MultiSpinIsingModel(128, 0.01, 1.0)
+        model.set_threads(threads)
+        model.set_lattice(spins)
+        model.set_check_observables(True)
+        model.run(10, measure=False)
+        chains.append(model.get_lattice().copy())
+    assert (chains[0] == chains[1]).all() and not (chains[0] == spins).all()
+
+def test_multispin_model_needs_multiple_of_64():
+    with pytest.raises(ValueError):
+        ising.MultiSpinIsingModel(48, 2.0, 1.0)
+    out = ising.run_replicas(64, 2.5, 1.0, replicas=2, sweeps=20, sweep_mode="msc", seed=1)
+    assert out["energy"].shape == (2, 20)
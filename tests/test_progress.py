@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcmc_tools.sim.progress import parse_progress_line, stream_progress, with_progress_args
+
+
+def test_parse_progress_line_maps_nulls_and_skips_other_output():
+    rec = parse_progress_line('{"event": "progress", "model": "XY", "L": 16, "T": 0.9, "phase": "burnin", '
+                              '"sweeps": 40, "total": null, "samples": 0, "samples_total": null, '
+                              '"sweeps_per_sec": 2000.5, "energy": -300.25, "magnetization": 12.0, "eta_s": null}\n')
+    assert rec.event == "progress" and rec.phase == "burnin" and rec.L == 16
+    assert rec.sweeps == 40 and rec.total is None and rec.eta_s is None and rec.fraction is None
+    assert rec.energy == -300.25 and rec.data["model"] == "XY"
+    done = parse_progress_line('{"event": "progress", "phase": "measure", "sweeps": 10, "total": 100, '
+                               '"samples": 5, "samples_total": 20}')
+    assert done.fraction == 0.25
+    assert parse_progress_line("Continuing c.ckpt (T=1, step 100)") is None
+    assert parse_progress_line('{"no_event": 1}') is None
+    assert parse_progress_line("{broken") is None
+
+
+def test_with_progress_args_keeps_explicit_flags():
+    assert with_progress_args(["mcmc", "--L", "8"], every=0.5) == [
+        "mcmc", "--L", "8", "--progress", "jsonl", "--progress-every", "0.5"]
+    assert with_progress_args(["mcmc", "--progress", "jsonl"]) == ["mcmc", "--progress", "jsonl"]
+
+
+_FAKE_MCMC = (
+    "import json, sys, time\n"
+    "print('Warm start from x.ckpt', flush=True)\n"
+    "print(json.dumps({'event': 'start', 'model': 'Ising', 'L': 8, 'T': 2.0}), flush=True)\n"
+    "for k in range(3):\n"
+    "    print(json.dumps({'event': 'progress', 'phase': 'measure', 'sweeps': k}), flush=True)\n"
+    "print(json.dumps({'event': 'done', 'sweeps': 3, 'seconds': 0.1}), flush=True)\n"
+    "if '--forever' in sys.argv:\n"
+    "    time.sleep(60)\n"
+    "sys.stderr.write('bye')\n"
+)
+
+
+def test_stream_progress_yields_records_and_exit_status():
+    async def collect():
+        return [rec async for rec in stream_progress([sys.executable, "-c", _FAKE_MCMC])]
+
+    records = asyncio.run(collect())
+    assert [r.event for r in records] == ["start", "progress", "progress", "progress", "done", "exit"]
+    assert records[-1].returncode == 0 and records[-1].stderr == "bye"
+
+
+def test_stream_progress_aclose_kills_the_process():
+    async def stop_early():
+        records = stream_progress([sys.executable, "-c", _FAKE_MCMC, "--forever"])
+        async for rec in records:
+            if rec.event == "done":
+                await records.aclose()
+                break
+        return rec
+
+    last = asyncio.run(asyncio.wait_for(stop_early(), timeout=30))
+    assert last.event == "done"
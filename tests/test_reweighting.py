@@ -0,0 +1,77 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mcmc_tools.analysis_utils.reweighting import multi_histogram, single_histogram
+
+
+def _ising_states(L=4, J=1.0):
+    """Alle 2^(L*L) Zustände: Gesamtenergie und Magnetisierung (exakte Referenz)."""
+    n = L * L
+    bits = (np.arange(2 ** n)[:, None] >> np.arange(n)) & 1
+    s = (2 * bits - 1).reshape(-1, L, L)
+    E = -J * (s * np.roll(s, 1, axis=1) + s * np.roll(s, 1, axis=2)).sum(axis=(1, 2))
+    return E.astype(float), s.sum(axis=(1, 2)).astype(float)
+
+
+def _exact(E, M, T, N):
+    w = np.exp(-(E - E.min()) / T)
+    w /= w.sum()
+    e = w @ E
+    return e / N, (w @ np.abs(M)) / N, (w @ E ** 2 - e ** 2) / (N * T ** 2)
+
+
+def _sample(E, M, T, n, rng):
+    w = np.exp(-(E - E.min()) / T)
+    idx = rng.choice(E.size, size=n, p=w / w.sum())
+    return E[idx], M[idx]
+
+
+def test_single_histogram_at_simulated_temperature_is_plain_average():
+    rng = np.random.default_rng(0)
+    E = rng.normal(-20.0, 3.0, 500)
+    M = rng.normal(5.0, 2.0, 500)
+    out = single_histogram(E, M, 2.0, [2.0], lattice_size=4)
+    assert out["energy_per_spin"].iloc[0] == pytest.approx(E.mean() / 16)
+    assert out["magnetization_per_spin"].iloc[0] == pytest.approx(np.abs(M).mean() / 16)
+    assert out["heat_capacity"].iloc[0] == pytest.approx(E.var() / (16 * 4.0))
+    assert out["error_energy"].iloc[0] > 0
+
+
+def test_multi_histogram_matches_exact_ising_between_temperatures():
+    rng = np.random.default_rng(1)
+    E_all, M_all = _ising_states()
+    parts = []
+    for sim_id, T in enumerate([1.8, 2.4, 3.0]):
+        E, M = _sample(E_all, M_all, T, 20_000, rng)
+        parts.append(pd.DataFrame(dict(simulation_id=sim_id, temperature=T, lattice_size=4,
+                                       step=np.arange(E.size), energy=E, magnetization=M)))
+    targets = [2.1, 2.7]
+    out = multi_histogram(pd.concat(parts, ignore_index=True), targets)
+    for row, T in zip(out.itertuples(), targets):
+        e, m, cv = _exact(E_all, M_all, T, 16)
+        assert abs(row.energy_per_spin - e) < 5 * row.error_energy
+        assert abs(row.magnetization_per_spin - m) < 5 * row.error_magnetization
+        assert abs(row.heat_capacity - cv) < 5 * row.error_cv
+
+
+def test_multi_histogram_with_one_run_equals_single_histogram():
+    rng = np.random.default_rng(2)
+    E = rng.normal(-20.0, 3.0, 400)
+    M = rng.normal(5.0, 2.0, 400)
+    df = pd.DataFrame(dict(temperature=2.0, lattice_size=4, energy=E, magnetization=M))
+    a = multi_histogram(df, [1.9, 2.1])
+    b = single_histogram(E, M, 2.0, [1.9, 2.1], lattice_size=4)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_input_validation():
+    df = pd.DataFrame(dict(temperature=[1.0, 2.0], lattice_size=[4, 8], energy=[0.0, 0.0], magnetization=[0.0, 0.0]))
+    with pytest.raises(ValueError):
+        multi_histogram(df, [1.5])
+    with pytest.raises(ValueError):
+        multi_histogram(df.drop(columns="energy"), [1.5])
@@ -0,0 +1,73 @@
+import os
+import shutil
+import subprocess
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from mcmc_tools.sim.sweep import build_anneal_jobs, build_jobs, build_tempering_jobs, temperature_grid
+
+MCMC = os.getenv("MCMC_PATH", "mcmc")
+
+
+def test_build_jobs_one_process_per_point():
+    jobs = build_jobs(["Ising", "XY"], 16, [1.0, 2.0], 500, extra_args=("--format", "npy"))
+    assert len(jobs) == 4
+    assert jobs[0].command("mcmc") == [
+        "mcmc", "--model", "Ising", "--L", "16", "--T", "1.00", "--steps", "500", "--format", "npy",
+    ]
+
+
+def test_build_tempering_jobs_one_process_per_model():
+    temps = temperature_grid(2.0, 3.5, 0.5)  # 2.0, 2.5, 3.0, 3.5 → unsortiert übergeben
+    jobs = build_tempering_jobs(["Clock"], 8, list(reversed(temps)), 100)
+    assert len(jobs) == 1
+    cmd = jobs[0].command("mcmc")
+    assert cmd[cmd.index("--T-list") + 1] == "2.00,2.50,3.00,3.50"
+    assert jobs[0].T == 2.0
+
+    # gleichzeitige Prozesse teilen sich die Kerne (nicht jeder alle)
+    jobs = build_tempering_jobs(["Ising", "Clock", "XY"], 8, temps, 100, cores=8)
+    assert [j.command("mcmc")[j.command("mcmc").index("--workers") + 1] for j in jobs] == ["2", "2", "2"]
+    assert build_tempering_jobs(["Ising", "XY"], 8, temps, 100, cores=1)[0].extra_args[3] == "1"
+
+
+def test_build_anneal_jobs_cool_down_in_one_process():
+    jobs = build_anneal_jobs(["Ising", "XY"], 8, [2.0, 3.0, 2.5], 100, extra_args=("--anneal-burnin", "50"))
+    assert len(jobs) == 2
+    cmd = jobs[0].command("mcmc")
+    assert cmd[cmd.index("--T-list") + 1] == "3.00,2.50,2.00"
+    assert "--anneal" in cmd and cmd[cmd.index("--anneal-burnin") + 1] == "50"
+    assert jobs[0].T == 3.0
+
+
+def test_read_meta_finds_sidecar_of_results_file(tmp_path):
+    import json
+    from mcmc_tools.sim.binary_io import read_meta
+
+    (tmp_path / "meta_Ising_L16_T2.50.json").write_text(json.dumps({"thin": 3, "tau_int_energy": 1.5}))
+    assert read_meta(str(tmp_path / "results_Ising_L16_T2.50.npy"))["tau_int_energy"] == 1.5
+    assert read_meta(str(tmp_path / "meta_Ising_L16_T2.50.json"))["thin"] == 3
+    assert read_meta(str(tmp_path / "results_XY_L16_T2.50.csv")) == {}
+
+
+@pytest.mark.skipif(shutil.which(MCMC) is None, reason="mcmc-Executable nicht gefunden (MCMC_PATH)")
+def test_thin_auto_stays_within_sweep_budget(tmp_path):
+    import json
+    import numpy as np
+
+    # T=0.5: tau_int > 5 → das Budget (--max-sweeps) begrenzt, nicht --steps
+    subprocess.run([MCMC, "--model", "XY", "--L", "16", "--T", "0.5", "--steps", "2000", "--thin", "auto",
+                    "--max-sweeps", "3000", "--seed", "1", "--format", "npy"],
+                   cwd=tmp_path, check=True, capture_output=True)
+    meta = json.loads((tmp_path / "results" / "meta_XY_L16_T0.50.json").read_text())
+    assert meta["thin_mode"] == "auto" and meta["measurement_sweeps"] <= 3000
+    assert 0 < meta["samples"] < 2000
+    assert len(np.load(tmp_path / "results" / "results_XY_L16_T0.50.npy")) == meta["samples"]
+
+    # hohe T: tau_int < 5 → nach --steps Messungen fertig, vor dem Budget (Standard steps × 5)
+    subprocess.run([MCMC, "--model", "Ising", "--L", "16", "--T", "5.0", "--steps", "500", "--thin", "auto",
+                    "--seed", "1", "--format", "npy"], cwd=tmp_path, check=True, capture_output=True)
+    meta = json.loads((tmp_path / "results" / "meta_Ising_L16_T5.00.json").read_text())
+    assert meta["samples"] == 500 and meta["measurement_sweeps"] < 500 * 5
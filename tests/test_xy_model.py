@@ -61,7 +61,7 @@ def test_xy_magnetization_reduces_with_opposite_spin():
     assert M == pytest.approx(expected, abs=1e-6)
 
 
-def test_xy_metropolis_rejects_favorable_flip():
+def test_xy_metropolis_rejects_unfavorable_flip():
     model = xy.XYModel(3, 1.0, 1.0)
 
     lattice = [
@@ -71,9 +71,160 @@ def test_xy_metropolis_rejects_favorable_flip():
     ]
     model.set_lattice(lattice)
 
-    # Erzwinge Flip des Zentrums auf π; alle 4 Nachbarn sind bei 0 -> ΔE < 0 (günstig) -> akzeptiert
+    # Erzwinge Flip des Zentrums auf π; alle 4 Nachbarn sind bei 0 -> ΔE = +8J -> bei r = 0.9 abgelehnt
     model.set_forced_angle(np.pi)
     model.set_forced_random(0.9)
 
     accepted = model.metropolis_update_deterministic(1, 1)
-    assert accepted is True
+    assert accepted is False
+
+
+def test_xy_metropolis_accepts_favorable_flip():
+    model = xy.XYModel(3, 1.0, 1.0)
+    lattice = [[0.0] * 3 for _ in range(3)]
+    lattice[1][1] = np.pi  # Zentrum antiparallel zu allen 4 Nachbarn
+    model.set_lattice(lattice)
+
+    model.set_forced_angle(0.0)   # zurück in die Ausrichtung: ΔE = -8J < 0
+    model.set_forced_random(0.9)  # irrelevant bei ΔE < 0
+
+    assert model.metropolis_update_deterministic(1, 1) is True
+
+
+def test_xy_metropolis_and_cluster_updates_sample_the_same_ensemble():
+    L, T = 8, 0.5
+    means = {}
+    for algorithm in ("metropolis", "wolff"):
+        model = xy.XYModel(L, T, 1.0)
+        model.set_seed(4)
+        model.set_algorithm(algorithm)
+        out = model.run(4000, burnin=1000)
+        means[algorithm] = out["energy"].mean() / (L * L)
+        assert out["magnetization"].mean() / (L * L) > 0.7  # quasi-geordnet bei T = 0.5
+    assert means["metropolis"] < -1.5
+    assert means["metropolis"] == pytest.approx(means["wolff"], abs=0.03)
+
+
+def test_xy_checkerboard_sweep_with_odd_L_runs_sequentially():
+    L = 5  # ungerades L: Farben berühren sich über den Rand → kein Thread-Split
+    lattices = []
+    for threads in (1, 4):
+        model = xy.XYModel(L, 0.5, 1.0)
+        model.set_seed(7)
+        model.set_lattice([[0.0] * L for _ in range(L)])
+        model.set_sweep_mode("checkerboard")
+        model.set_threads(threads)
+        for _ in range(10):
+            model.sweep()
+        lattices.append((model.compute_energy(), model.compute_magnetization()))
+    # sequentiell → gleiche Zufallsfolge, unabhängig von der Thread-Anzahl
+    assert lattices[0] == lattices[1]
+
+
+@pytest.mark.parametrize("algorithm", ["wolff", "sw"])
+def test_xy_cluster_update_keeps_aligned_state_at_low_T(algorithm):
+    L = 6
+    model = xy.XYModel(L, 1e-4, 1.0)
+    model.set_seed(11)
+    model.set_lattice([[1.0] * L for _ in range(L)])
+    model.set_algorithm(algorithm)
+    for _ in range(5):
+        model.sweep()
+    assert model.compute_energy() == pytest.approx(-2 * L * L, abs=1e-6)
+    assert model.compute_magnetization() == pytest.approx(L * L, abs=1e-6)
+
+
+def test_xy_cached_energy_matches_direct_sum():
+    L = 5
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(0.0, 2 * np.pi, (L, L))
+    model = xy.XYModel(L, 1.0, 1.0)
+    model.set_lattice(angles.tolist())
+    angles = model.get_lattice().astype(float)  # gespeichert als float32
+    expected = -np.sum(np.cos(angles - np.roll(angles, -1, axis=1))
+                       + np.cos(angles - np.roll(angles, -1, axis=0)))
+    assert model.compute_energy() == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize("algorithm", ["metropolis", "wolff", "sw"])
+def test_xy_tracked_observables_match_recomputation(algorithm):
+    model = xy.XYModel(8, 0.9, 1.0)
+    model.set_seed(8)
+    model.set_algorithm(algorithm)
+    model.set_check_observables(True)
+    for _ in range(50):
+        model.sweep()
+    assert model.current_energy() == pytest.approx(model.compute_energy(), abs=1e-9)
+    assert model.current_magnetization() == pytest.approx(model.compute_magnetization(), abs=1e-9)
+
+
+def test_xy_run_in_parallel_threads():
+    import threading
+    models = [xy.XYModel(8, 0.8, 1.0) for _ in range(2)]
+    results = [None, None]
+
+    def work(i):
+        models[i].set_seed(i)
+        results[i] = models[i].run(200, thin=2, lattice_every=50)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for r in results:
+        assert r["energy"].shape == (100,)
+        assert r["lattices"].shape == (2, 8, 8)
+
+
+def test_xy_lattice_view_roundtrip():
+    L = 3
+    model = xy.XYModel(L, 1.0, 1.0)
+    model.lattice[:] = 0.0
+    model.refresh_observables()  # baut cos/sin-Cache und Observablen neu auf
+    assert model.current_energy() == pytest.approx(-2 * L * L)
+    angles = np.linspace(0.0, 1.0, L * L).reshape(L, L)
+    model.set_lattice(angles)
+    np.testing.assert_array_equal(model.get_lattice(), angles)
+
+
+def test_xy_step_width_tunes_to_target_acceptance_during_burnin():
+    model = xy.XYModel(16, 0.5, 1.0)
+    model.set_seed(3)
+    model.set_sweep_mode("checkerboard")
+    model.set_target_acceptance(0.5)
+    model.run(0, measure=False, burnin=300)
+    width = model.get_step_width()
+    assert width < 2 * np.pi  # bei tiefem T werden volle Vorschläge meist abgelehnt
+
+    model.run(500)  # Messphase: Breite fest, Statistik ab Ende des Burn-ins
+    assert model.get_step_width() == width
+    accepted, attempted = model.acceptance_stats()
+    assert attempted == 500 * 16 * 16
+    assert model.acceptance_rate() == pytest.approx(0.5, abs=0.05)
+
+
+def test_xy_overrelaxation_keeps_energy_and_tracked_observables():
+    model = xy.XYModel(8, 0.9, 1.0)
+    model.set_seed(5)
+    model.set_check_observables(True)
+    for _ in range(20):
+        model.sweep()
+    E = model.compute_energy()
+    before = model.get_lattice().copy()
+    for _ in range(10):
+        model.overrelaxation_sweep()
+    assert not np.array_equal(model.get_lattice(), before)
+    assert model.compute_energy() == pytest.approx(E, abs=1e-4)  # nur float32-Rundung
+    assert model.current_energy() == pytest.approx(model.compute_energy(), abs=1e-9)
+    assert model.current_magnetization() == pytest.approx(model.compute_magnetization(), abs=1e-9)
+
+
+def test_xy_invalid_proposal_settings_raise():
+    model = xy.XYModel(4, 1.0, 1.0)
+    with pytest.raises(ValueError):
+        model.set_step_width(0.0)
+    with pytest.raises(ValueError):
+        model.set_target_acceptance(1.0)
+    with pytest.raises(ValueError):
+        model.set_overrelaxation(-1)